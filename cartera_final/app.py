@@ -1,4 +1,5 @@
 import os
+import importlib.util
 import json
 import smtplib
 import webbrowser
@@ -12,6 +13,20 @@ from dotenv import load_dotenv
 import pandas as pd
 from io import BytesIO
 
+# Lector de Excel compartido del proyecto (usa calamine si está instalado).
+# Se carga por ruta para no agregar src/ al sys.path (sus módulos config,
+# main, etc. ocultarían a otros con el mismo nombre). Si la app se ejecuta
+# fuera del repositorio se usa pandas directamente.
+try:
+    _spec = importlib.util.spec_from_file_location(
+        'excel_reader', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'excel_reader.py')
+    )
+    _excel_reader = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(_excel_reader)
+    read_excel = _excel_reader.read_excel
+except (ImportError, OSError):
+    read_excel = pd.read_excel
+
 # Cargar variables de entorno desde .env
 load_dotenv()
 
@@ -98,7 +113,7 @@ def leer_excel_terceros(archivo_bytes):
     """
     Lee el Excel de Terceros y retorna un diccionario { nombre_normalizado → email }
     """
-    df = pd.read_excel(BytesIO(archivo_bytes))
+    df = read_excel(BytesIO(archivo_bytes))
 
     # Buscar columnas
     col_nombre = buscar_columna(df, ["Nombre", "Cliente", "Tercero", "Razon Social"])
@@ -132,7 +147,7 @@ def leer_excel_cartera(archivo_bytes, diccionario_terceros):
     - Se encuentra el email en diccionario_terceros
     - Dias < 5 (próximos a vencer o vencidos)
     """
-    df = pd.read_excel(BytesIO(archivo_bytes))
+    df = read_excel(BytesIO(archivo_bytes))
 
     # Buscar columnas
     col_nombre_tercero = buscar_columna(df, ["Nombre tercero", "Nombre Tercero", "Tercero", "Cliente", "Nombre"])
@@ -561,8 +576,8 @@ def procesar_excel():
         contenido2 = file2.read()
 
         # Detectar qué archivo es cuál
-        df1 = pd.read_excel(BytesIO(contenido1))
-        df2 = pd.read_excel(BytesIO(contenido2))
+        df1 = read_excel(BytesIO(contenido1))
+        df2 = read_excel(BytesIO(contenido2))
 
         tipo1 = detectar_tipo_excel(df1)
         tipo2 = detectar_tipo_excel(df2)
@@ -1,6 +1,17 @@
+import os
+import importlib.util
 import pandas as pd
 from datetime import timedelta
 
+# Lector de Excel compartido (usa calamine si está instalado). Se carga por
+# ruta para no agregar src/ al sys.path y ocultar otros módulos
+_spec = importlib.util.spec_from_file_location(
+    'excel_reader', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'excel_reader.py')
+)
+_excel_reader = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_excel_reader)
+read_excel = _excel_reader.read_excel
+
 # ========= 1. Cargar data de proveedores (archivo "8") =========
 # - Hoja: "Proveedores"
 # - Saltar primera fila basura (header real está en la segunda fila)
@@ -10,7 +21,7 @@ from datetime import timedelta
 #   Correo -> email para enviar recordatorio
 proveedores_path = "8. PlantillaBaseTerceros_vr2.xlsx"
 
-df_prov = pd.read_excel(
+df_prov = read_excel(
     proveedores_path,
     sheet_name="Proveedores",
     skiprows=1  # saltar la primera fila
@@ -38,7 +49,7 @@ df_prov["nit"] = df_prov["nit"].astype(str).str.strip()
 #   Fecha -> fecha de la factura
 consolidado_path = "consolidado.xlsx"
 
-df_fact = pd.read_excel(
+df_fact = read_excel(
     consolidado_path,
     sheet_name="sheet1"
 )
@@ -1,12 +1,13 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from excel_reader import read_excel
 
 # Cargar las hojas del archivo Excel
 archivo = 'INV FISICO 31 AGOSTO PLANTA GALAN[1].xlsx'  # Cambia por tu archivo
-df_congeladores = pd.read_excel(archivo, sheet_name=0)  # Primera hoja
-df_mostradores = pd.read_excel(archivo, sheet_name=1)   # Segunda hoja
-df_consolidado = pd.read_excel(archivo, sheet_name=2)   # Tercera hoja
+df_congeladores = read_excel(archivo, sheet_name=0)  # Primera hoja
+df_mostradores = read_excel(archivo, sheet_name=1)   # Segunda hoja
+df_consolidado = read_excel(archivo, sheet_name=2)   # Tercera hoja
 
 # === ANÁLISIS DE STOCK ===
 def analizar_stock(df, nombre_ubicacion):
@@ -0,0 +1,119 @@
+"""
+Módulo de Categorización de Productos - Dashboard Inventario Lomarosa
+Las categorías se definen como una tabla de reglas (config o CSV) que se
+compila en una sola expresión regular y se evalúa vectorizada sobre toda la
+columna de productos, con memoria de los nombres ya clasificados
+"""
+
+import csv
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+def load_rules(csv_path=None):
+    """
+    Carga la tabla de reglas de categorización
+
+    El CSV (si existe) tiene columnas 'categoria' y 'palabra', una fila por
+    palabra clave; el orden de las filas es la prioridad. Si no hay CSV se
+    usa config.REGLAS_CATEGORIA_PRODUCTO.
+
+    Returns:
+        Lista de (categoría, [palabras clave]) en orden de prioridad
+    """
+    csv_path = Path(csv_path or config.REGLAS_CATEGORIA_CSV)
+    if not csv_path.exists():
+        return [(categoria, list(palabras)) for categoria, palabras in config.REGLAS_CATEGORIA_PRODUCTO]
+
+    reglas = {}
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for fila in csv.DictReader(f):
+            categoria = fila['categoria'].strip()
+            palabra = fila['palabra'].strip().upper()
+            if categoria and palabra:
+                reglas.setdefault(categoria, []).append(palabra)
+    return list(reglas.items())
+
+
+def compile_rules(reglas):
+    """
+    Compila las reglas en una sola regex con un grupo por categoría
+
+    Cada alternativa es un lookahead anclado al inicio, de modo que gana la
+    primera regla (en orden de prioridad) que aparezca en cualquier parte del
+    nombre, igual que una cadena de if/elif, y no la que aparezca más a la
+    izquierda.
+    """
+    alternativas = []
+    for _, palabras in reglas:
+        patron = '|'.join(re.escape(palabra.upper()) for palabra in palabras)
+        alternativas.append(f"(?=.*?({patron}))")
+    return re.compile(r'^(?:' + '|'.join(alternativas) + ')', re.DOTALL)
+
+
+class ProductCategorizer:
+    """Clasifica nombres de producto según la tabla de reglas"""
+
+    def __init__(self, reglas=None, default=None):
+        """
+        Args:
+            reglas: Lista de (categoría, [palabras clave]); por defecto load_rules()
+            default: Categoría para productos sin regla (por defecto config.CATEGORIA_PRODUCTO_DEFAULT)
+        """
+        self.reglas = reglas if reglas is not None else load_rules()
+        self.default = default or config.CATEGORIA_PRODUCTO_DEFAULT
+        self.categorias = np.array([categoria for categoria, _ in self.reglas] + [self.default], dtype=object)
+        self.patron = compile_rules(self.reglas) if self.reglas else None
+        # Cambia cuando cambian las reglas o la categoría por defecto
+        self.version = hashlib.sha1(
+            json.dumps([self.reglas, self.default], ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:12]
+        self._memo = {}
+
+    def categorize(self, productos):
+        """
+        Categoriza una serie de nombres de producto
+
+        Solo se evalúan los nombres únicos que no se hayan visto antes.
+
+        Returns:
+            Serie de categorías con el mismo índice que productos
+        """
+        unicos = pd.unique(productos.dropna())
+        nuevos = [nombre for nombre in unicos if nombre not in self._memo]
+
+        if nuevos:
+            nombres = pd.Series(nuevos, dtype=object)
+            if self.patron is None:
+                indices = np.full(len(nombres), len(self.reglas))
+            else:
+                encontrados = nombres.astype(str).str.upper().str.extract(self.patron).notna().to_numpy()
+                indices = np.where(encontrados.any(axis=1), encontrados.argmax(axis=1), len(self.reglas))
+            self._memo.update(zip(nuevos, self.categorias[indices]))
+
+        return productos.map(self._memo).fillna(self.default)
+
+    def categorize_one(self, nombre):
+        """Categoriza un solo nombre de producto"""
+        return self.categorize(pd.Series([nombre], dtype=object)).iloc[0]
+
+
+if __name__ == "__main__":
+    import time
+
+    categorizador = ProductCategorizer()
+    print(f"📋 {len(categorizador.reglas)} reglas: {[c for c, _ in categorizador.reglas]}")
+
+    base = ['CHULETA DE LOMO', 'COSTILLA BABY BACK', 'CANASTO', 'MERMA DE PROCESO', 'PIG WINGS']
+    productos = pd.Series([f"{base[i % len(base)]} {i}" for i in range(50000)])
+    inicio = time.perf_counter()
+    categorias = categorizador.categorize(productos)
+    print(f"⏱️ {len(productos)} productos clasificados en {time.perf_counter() - inicio:.3f}s")
+    print(categorias.value_counts().to_string())
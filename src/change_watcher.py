@@ -0,0 +1,210 @@
+"""
+Módulo de Detección de Cambios - Dashboard Inventario Lomarosa
+Consulta el feed de cambios (delta) de la biblioteca de SharePoint en vez de
+listar la carpeta completa: cada sondeo es una sola petición barata que
+devuelve solo lo que cambió desde el último token. Las ráfagas de guardados
+se agrupan (debounce) en una sola ejecución del pipeline.
+
+Variables de entorno (.env):
+    SHAREPOINT_DELTA_URL
+        URL delta de Microsoft Graph de la carpeta, p. ej.
+        https://graph.microsoft.com/v1.0/drives/{drive-id}/root/delta
+    SHAREPOINT_TENANT_ID
+        Tenant de Azure AD para obtener el token de Graph con
+        SHAREPOINT_CLIENT_ID / SHAREPOINT_CLIENT_SECRET
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import requests
+
+import config
+
+
+HTTP_TIMEOUT = (10, 60)
+
+# Nombre reportado cuando el token delta expiró y hay que asumir que todo cambió
+RESINCRONIZAR = '*'
+
+
+class GraphTokenProvider:
+    """Obtiene y renueva el token de aplicación para Microsoft Graph"""
+
+    def __init__(self, tenant_id, client_id, client_secret, session=None):
+        self.token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.session = session or requests.Session()
+        self._token = None
+        self._expira = 0
+
+    def __call__(self):
+        """Devuelve un token vigente (lo renueva un minuto antes de expirar)"""
+        if self._token is None or time.time() > self._expira - 60:
+            response = self.session.post(self.token_url, data={
+                'grant_type': 'client_credentials',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'scope': 'https://graph.microsoft.com/.default',
+            }, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            datos = response.json()
+            self._token = datos['access_token']
+            self._expira = time.time() + int(datos.get('expires_in', 3600))
+        return self._token
+
+
+class DeltaChangeFeed:
+    """Feed de cambios basado en la consulta delta de Microsoft Graph"""
+
+    def __init__(self, delta_url, session=None, token_provider=None, state_path=None, extension='.xlsx'):
+        """
+        Args:
+            delta_url: URL delta inicial de la carpeta a vigilar
+            session: requests.Session a usar
+            token_provider: Función que devuelve el token Bearer (None = sin autenticación)
+            state_path: JSON donde se guarda el último deltaLink
+            extension: Solo se reportan archivos con esta extensión
+        """
+        self.delta_url = delta_url
+        self.session = session or requests.Session()
+        self.token_provider = token_provider
+        self.state_path = Path(state_path or Path(config.PROCESSED_DIR) / 'sharepoint_delta.json')
+        self.extension = extension.lower()
+        self.delta_link = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                estado = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if estado.get('delta_url') != self.delta_url:
+            return None
+        return estado.get('delta_link')
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'delta_url': self.delta_url, 'delta_link': self.delta_link}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _get(self, url, params=None):
+        headers = {}
+        if self.token_provider is not None:
+            headers['Authorization'] = f"Bearer {self.token_provider()}"
+        response = self.session.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def poll(self):
+        """
+        Devuelve los nombres de los archivos que cambiaron desde el último sondeo
+
+        La primera vez solo obtiene el token actual (token=latest) sin
+        enumerar la carpeta, así que no reporta cambios.
+        """
+        if self.delta_link is None:
+            pagina = self._get(self.delta_url, params={'token': 'latest'})
+            self.delta_link = pagina['@odata.deltaLink']
+            self._save_state()
+            return []
+
+        cambios = set()
+        url = self.delta_link
+        while url:
+            try:
+                pagina = self._get(url)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 410:
+                    # Token delta expirado: Graph exige una resincronización completa
+                    print("⚠️ El token de cambios expiró, se reconstruirá todo")
+                    self.delta_link = None
+                    self._save_state()
+                    return [RESINCRONIZAR]
+                raise
+            for item in pagina.get('value', []):
+                nombre = item.get('name', '')
+                if 'file' in item or 'deleted' in item:
+                    if nombre.lower().endswith(self.extension):
+                        cambios.add(nombre)
+            url = pagina.get('@odata.nextLink')
+            if '@odata.deltaLink' in pagina:
+                self.delta_link = pagina['@odata.deltaLink']
+
+        self._save_state()
+        return sorted(cambios)
+
+
+class ChangeWatcher:
+    """Sondea un feed de cambios y agrupa las ráfagas en una sola llamada"""
+
+    def __init__(self, feed, callback, interval=30, debounce=90, clock=time.monotonic, sleep=time.sleep):
+        """
+        Args:
+            feed: Objeto con poll() -> lista de archivos cambiados
+            callback: Función que recibe la lista de archivos de cada ráfaga
+            interval: Segundos entre sondeos
+            debounce: Segundos sin cambios nuevos antes de disparar el callback
+            clock, sleep: Reloj y espera (reemplazables para pruebas)
+        """
+        self.feed = feed
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        self.clock = clock
+        self.sleep = sleep
+        self.pendientes = set()
+        self.ultimo_cambio = None
+
+    def step(self):
+        """
+        Hace un sondeo y dispara el callback si la ráfaga terminó
+
+        Si el callback falla, los archivos vuelven a pendientes y se
+        reintentan al cerrar la siguiente ráfaga (otro periodo de debounce).
+
+        Returns:
+            Lista de archivos procesados por el callback (vacía si no se
+            disparó o si falló)
+        """
+        cambios = self.feed.poll()
+        ahora = self.clock()
+        if cambios:
+            for nombre in cambios:
+                print(f"🔄 Detectado cambio en {nombre}")
+            self.pendientes.update(cambios)
+            self.ultimo_cambio = ahora
+
+        if self.pendientes and ahora - self.ultimo_cambio >= self.debounce:
+            archivos = sorted(self.pendientes)
+            self.pendientes.clear()
+            try:
+                self.callback(archivos)
+            except Exception as e:
+                print(f"❌ Error al procesar los cambios, se reintentará: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                self.pendientes.update(archivos)
+                self.ultimo_cambio = ahora
+                return []
+            return archivos
+        return []
+
+    def run(self, max_iterations=None):
+        """Bucle de monitoreo; se detiene con Ctrl+C"""
+        iteracion = 0
+        try:
+            while max_iterations is None or iteracion < max_iterations:
+                try:
+                    self.step()
+                except requests.RequestException as e:
+                    print(f"⚠️ Error consultando cambios, se reintentará: {str(e)}")
+                iteracion += 1
+                self.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n⏹️ Monitoreo detenido")
@@ -64,11 +64,26 @@ if IS_GITHUB_ACTIONS:
 # ====== MODO DE CARGA ======
 USE_SHAREPOINT = os.getenv('USE_SHAREPOINT', 'False').lower() == 'true'
 
+# ====== MONITOREO DE CAMBIOS (python src/main.py --watch) ======
+WATCH_INTERVAL = int(os.getenv('WATCH_INTERVAL', '30'))    # segundos entre consultas
+WATCH_DEBOUNCE = int(os.getenv('WATCH_DEBOUNCE', '90'))    # segundos sin cambios antes de regenerar
+
+# ====== CACHÉ DE DATOS PROCESADOS ======
+# Los libros ya parseados se guardan como Parquet en data/processed/
+PROCESSED_DIR = PROJECT_ROOT / 'data' / 'processed'
+USE_CACHE = os.getenv('USE_CACHE', 'True').lower() == 'true'
+# Foto diaria de stock y estado por producto (data/processed/snapshots/fecha=...)
+GUARDAR_HISTORIAL = os.getenv('GUARDAR_HISTORIAL', 'True').lower() == 'true'
+
 # ====== CONFIGURACIÓN DE EXCEL ======
 SHEET_NAME = "CONSOLIDADO"
 CONSOLIDADO_SHEET = "Sheet1"
 HEADER_ROW = 8
 
+# Filas a saltar antes del encabezado en cada libro
+SKIPROWS_INVENTARIO = 9
+SKIPROWS_CONSOLIDADO = 0
+
 # ====== CONFIGURACIÓN DE COLUMNAS ======
 COL_CODIGO = "Codigo"
 COL_PRODUCTO = "Productos"
@@ -79,15 +94,67 @@ COL_COMENTARIOS = "Comentarios"
 # ====== FILTROS PARA PROCESAR VENTAS ======
 FILTRO_DOC_TIPO = "VENTA"
 FILTRO_LOCAL = "PLANTA GALAN"
+# Plantas para el dashboard multi-planta (main.py --plantas); vacío = todas las del consolidado
+LOCALES = [local.strip().upper() for local in os.getenv('LOCALES', '').split(',') if local.strip()]
 
 COL_KG_VENDIDOS = "Kg totales2"
 COL_FECHA = "Fecha"
 COL_COD_HISTORICO = "Cod"
 
+# Columnas que se validan en los encabezados antes de leer los libros
+# (el inventario además necesita una columna que contenga "cod")
+COLUMNAS_REQUERIDAS_INVENTARIO = [COL_TOTAL, "Productos"]
+COLUMNAS_REQUERIDAS_CONSOLIDADO = ["Doc", "Local", COL_COD_HISTORICO, COL_KG_VENDIDOS, COL_FECHA, "Macropieza"]
+
+# Modo de lectura del consolidado:
+#   'pandas'    -> carga la hoja completa en un DataFrame
+#   'streaming' -> lee fila por fila y acumula por código (memoria acotada)
+#   'incremental' -> lee la hoja con la caché Parquet y solo acumula las
+#                    filas nuevas desde la última ejecución (estado en PROCESSED_DIR)
+#   'sqlite'    -> ingiere el consolidado una vez en una base SQLite local
+#                  y calcula los promedios con SQL
+HISTORICAL_MODE = os.getenv('HISTORICAL_MODE', 'pandas').lower()
+
+# Cargar inventario y consolidado en procesos separados (solo modo local + 'pandas')
+PARALLEL_LOAD = os.getenv('PARALLEL_LOAD', 'False').lower() == 'true'
+
+# Ventanas (en semanas) del cubo semanal de ventas: promedio y desviación
+# de las últimas N semanas para cada producto
+VENTANAS_SEMANALES = (4, 8, 13, 52)
+# Ventana usada como Promedio_Semanal; 0 = todo el histórico (fecha mínima a máxima)
+VENTANA_PROMEDIO = int(os.getenv('VENTANA_PROMEDIO', '0'))
+# Semanas completas más recientes usadas para ajustar el pronóstico de demanda
+PRONOSTICO_SEMANAS = 52
+
+# ====== PLOTLY.JS ======
+# 'cdn' carga plotly.js desde internet; 'inline' lo incrusta una sola vez en el
+# HTML para abrir el dashboard sin conexión (equipos de planta)
+PLOTLY_JS = os.getenv('PLOTLY_JS', 'cdn').lower()
+PLOTLY_CDN_URL = "https://cdn.plot.ly/plotly-2.26.0.min.js"
+# Bundle minificado propio para el modo 'inline' (p. ej. un bundle parcial de
+# plotly.js con solo las trazas usadas); vacío = el bundle completo del paquete plotly
+PLOTLY_JS_PATH = os.getenv('PLOTLY_JS_PATH', '')
+
 # ====== CONFIGURACIÓN DE ANÁLISIS ======
 STOCK_CRITICO = 50
 STOCK_BAJO = 100
 
+# ====== CATEGORÍAS DE PRODUCTO ======
+# Reglas en orden de prioridad: (categoría, palabras clave en el nombre).
+# Se pueden reemplazar con un CSV (columnas: categoria,palabra) en REGLAS_CATEGORIA_CSV
+REGLAS_CATEGORIA_PRODUCTO = [
+    ('Chuletas', ['CHULETA']),
+    ('Costillas', ['COSTILLA', 'COSTILOMO']),
+    ('Canastos', ['CANASTO']),
+    ('Mermas', ['MERMA']),
+    ('Sillas', ['SILLA']),
+    ('Sparry', ['SPARRY']),
+    ('Matambrito', ['MATAMBRITO']),
+    ('Costipiel', ['COSTIPIEL']),
+]
+CATEGORIA_PRODUCTO_DEFAULT = 'Otros'
+REGLAS_CATEGORIA_CSV = DATA_DIR / 'reglas_categorias.csv'
+
 # ====== CONFIGURACIÓN VISUAL ======
 COLOR_PRIMARY = "#1f77b4"
 COLOR_SUCCESS = "#2ca02c"
@@ -0,0 +1,148 @@
+"""
+Módulo de Cobertura de Stock - Dashboard Inventario Lomarosa
+Cálculos vectorizados (NumPy) de semanas de stock, categoría de stock y
+estado por ubicación, compartidos por DataProcessor y DashboardVisualizations
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Códigos especiales de Semanas_Stock
+SEMANAS_ERROR = -999        # Stock negativo
+SEMANAS_AGOTADO = -1        # Stock en cero
+SEMANAS_SIN_DATOS = -2      # Sin promedio de ventas
+
+CATEGORIAS_STOCK = ('Sin Stock', 'Crítico', 'Bajo', 'Normal')
+
+
+def _a_float(valores):
+    return pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+
+
+def _redondear_1(valores):
+    """
+    np.round(x, 1) redondeando igual que round() de Python
+
+    np.round escala por 10 y redondea al par, así que difiere de round() cuando
+    x * 10 cae casi exactamente en .5 (p. ej. 0.15). Esos pocos valores se
+    recalculan con round() para que el resultado sea idéntico.
+    """
+    redondeados = np.round(valores, 1)
+    escalados = valores * 10
+    dudosos = np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6
+    if dudosos.any():
+        redondeados[dudosos] = [round(valor, 1) for valor in valores[dudosos]]
+    return redondeados
+
+
+def semanas_stock(stock, promedio):
+    """
+    Semanas de stock con los códigos especiales del dashboard
+
+    Returns:
+        Array float: -999 si stock < 0, -1 si stock == 0, -2 si el promedio
+        es 0 o vacío, y round(stock / promedio, 1) en otro caso
+    """
+    stock = _a_float(stock)
+    promedio = _a_float(promedio)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        semanas = _redondear_1(stock / promedio)
+
+    return np.select(
+        [stock < 0, stock == 0, (promedio == 0) | np.isnan(promedio)],
+        [SEMANAS_ERROR, SEMANAS_AGOTADO, SEMANAS_SIN_DATOS],
+        default=semanas
+    )
+
+
+def categoria_stock(stock):
+    """
+    Categoriza el nivel de stock contra config.STOCK_CRITICO / STOCK_BAJO
+
+    Returns:
+        Array de 'Sin Stock', 'Crítico', 'Bajo' o 'Normal'
+    """
+    stock = _a_float(stock)
+    return np.select(
+        [stock == 0, stock <= config.STOCK_CRITICO, stock <= config.STOCK_BAJO],
+        list(CATEGORIAS_STOCK[:3]),
+        default=CATEGORIAS_STOCK[3]
+    ).astype(object)
+
+
+def semanas_cobertura(stock, promedio):
+    """Stock / promedio semanal, infinito si no hay ventas positivas"""
+    stock = _a_float(stock)
+    promedio = _a_float(promedio)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(promedio > 0, stock / promedio, np.inf)
+
+
+def estado_cobertura(stock, promedio, umbral_sobrestock):
+    """
+    Estado de cobertura por producto
+
+    Args:
+        umbral_sobrestock: Semanas a partir de las cuales hay sobre stock
+            (escalar o array por fila, p. ej. distinto por cava)
+
+    Returns:
+        Array de 'Sin Ventas', 'Sobre Stock', 'Stock Adecuado' o 'Stock Bajo'
+    """
+    promedio = _a_float(promedio)
+    semanas = semanas_cobertura(stock, promedio)
+    return np.select(
+        [np.isnan(promedio) | (promedio == 0), semanas >= umbral_sobrestock, semanas > 0],
+        ['Sin Ventas', 'Sobre Stock', 'Stock Adecuado'],
+        default='Stock Bajo'
+    ).astype(object)
+
+
+if __name__ == "__main__":
+    import time
+
+    n = 100_000
+    rng = np.random.default_rng(0)
+    stock = rng.choice([-5.0, 0.0, 30.0, 75.0, 250.0], n) + rng.random(n).round(2)
+    stock[rng.random(n) < 0.1] = 0
+    promedio = np.where(rng.random(n) < 0.2, 0.0, rng.random(n) * 100)
+    df = pd.DataFrame({'Stock_Actual': stock, 'Promedio_Semanal': promedio})
+
+    def semanas_fila(row):
+        if row['Stock_Actual'] < 0:
+            return -999
+        if row['Stock_Actual'] == 0:
+            return -1
+        if row['Promedio_Semanal'] == 0 or pd.isna(row['Promedio_Semanal']):
+            return -2
+        return round(row['Stock_Actual'] / row['Promedio_Semanal'], 1)
+
+    def categoria_fila(cantidad):
+        if cantidad == 0:
+            return "Sin Stock"
+        elif cantidad <= config.STOCK_CRITICO:
+            return "Crítico"
+        elif cantidad <= config.STOCK_BAJO:
+            return "Bajo"
+        return "Normal"
+
+    print(f"📊 Benchmark de cobertura con {n} SKUs")
+    inicio = time.perf_counter()
+    semanas_antes = df.apply(semanas_fila, axis=1)
+    categorias_antes = df['Stock_Actual'].apply(categoria_fila)
+    t_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    semanas_despues = semanas_stock(df['Stock_Actual'], df['Promedio_Semanal'])
+    categorias_despues = categoria_stock(df['Stock_Actual'])
+    t_vector = time.perf_counter() - inicio
+
+    assert np.array_equal(semanas_antes.to_numpy(dtype=float), semanas_despues)
+    assert (categorias_antes.to_numpy() == categorias_despues).all()
+    print(f"   Por fila:    {t_filas:.3f}s")
+    print(f"   Vectorizado: {t_vector:.4f}s ({t_filas / t_vector:.0f}x)")
+    print("✅ Resultados idénticos")
@@ -4,12 +4,30 @@ Incluye análisis con datos históricos de ventas
 ACTUALIZADO: Carga datos desde SharePoint/OneDrive usando enlaces compartidos
 """
 
+import copy
+import functools
+import inspect
 import os
+import re
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import config
 import warnings
+from parquet_cache import ParquetCache, read_excel_cached
+from sales_stream import stream_sales
+from sales_incremental import update_sales
+from parallel_loader import load_workbooks_parallel
+from sales_store import SalesStore
+from schema import apply_schema, normalize_text
+from categorizer import ProductCategorizer
+from coverage import semanas_stock, categoria_stock
+from product_dimension import ProductDimension
+from sales_cube import WeeklySalesCube, update_cube
+from pipeline import Pipeline, Step
+from forecast import forecast_cube
+from header_probe import SchemaError, probe_inventario, probe_consolidado
+from snapshot_store import SnapshotStore
 
 # Importar SharePointLoader solo si está habilitado
 if config.USE_SHAREPOINT:
@@ -22,25 +40,74 @@ if config.USE_SHAREPOINT:
 warnings.filterwarnings('ignore')
 
 
+def slug_local(local):
+    """Nombre apto para archivos a partir del nombre de un Local ('PLANTA GALAN' -> 'planta_galan')"""
+    return re.sub(r'[^0-9a-z]+', '_', str(local).lower()).strip('_') or 'sin_local'
+
+
+
+def _memoizado(metodo):
+    """
+    Guarda el resultado de un getter por argumentos hasta que cambien los
+    datos (ver DataProcessor.invalidate_cache). Los resultados se comparten
+    entre llamadas: no deben modificarse.
+
+    La clave se normaliza con la firma del método, así get_top_deficit(),
+    get_top_deficit(10) y get_top_deficit(n=10) comparten la misma entrada.
+    """
+    firma = inspect.signature(metodo)
+
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        argumentos = firma.bind(self, *args, **kwargs)
+        argumentos.apply_defaults()
+        clave = (metodo.__name__, tuple(argumentos.arguments.items())[1:])
+        if clave in self._memo:
+            self.memo_hits += 1
+            return self._memo[clave]
+        self.memo_misses += 1
+        resultado = self._memo[clave] = metodo(self, *args, **kwargs)
+        return resultado
+    return envoltura
+
+
 class DataProcessor:
     """Clase para procesar los datos del inventario y ventas históricas"""
     
-    def __init__(self, excel_path=None):
+    def __init__(self, excel_path=None, historical_mode=None):
         """
         Inicializa el procesador de datos
         
         Args:
             excel_path: Ruta local del Excel (solo para modo local)
+            historical_mode: Modo de lectura del consolidado (por defecto config.HISTORICAL_MODE)
         """
         self.excel_path = excel_path or config.EXCEL_PATH
         self.use_sharepoint = config.USE_SHAREPOINT
         self.sharepoint_loader = None
+        self.cache = ParquetCache() if config.USE_CACHE else None
+        self.historical_mode = historical_mode or config.HISTORICAL_MODE
+        self.parallel_load = config.PARALLEL_LOAD
+        self.tiempos_carga = {}
+        self.pipeline_log = []
+        self.categorizador = ProductCategorizer()
+        self.productos = ProductDimension(categorizador=self.categorizador)
+        self.historial = SnapshotStore() if config.GUARDAR_HISTORIAL else None
         
         self.df = None
         self.df_processed = None
         self.df_historical = None
         self.promedios = None
+        self.macropiezas = None
+        self.cubo = None
         self.analisis = None
+        self.local = config.FILTRO_LOCAL
+        self.plantas = {}
+        
+        # Resultados memorizados de los getters
+        self._memo = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
         
         # Inicializar SharePoint si está habilitado
         if self.use_sharepoint:
@@ -66,7 +133,7 @@ class DataProcessor:
                 self.df = self.sharepoint_loader.load_excel_from_sharepoint(
                     file_type='inventario',
                     sheet_name=config.SHEET_NAME,
-                    skiprows=9
+                    skiprows=config.SKIPROWS_INVENTARIO
                 )
                 
             else:
@@ -78,11 +145,14 @@ class DataProcessor:
                     print(f"❌ El archivo no existe en la ruta: {self.excel_path}")
                     return False
                 
-                self.df = pd.read_excel(
+                # Validar encabezados antes de parsear el libro completo
+                probe_inventario(self.excel_path)
+                
+                self.df = read_excel_cached(
+                    self.cache,
                     self.excel_path,
                     sheet_name=config.SHEET_NAME,
-                    skiprows=9,
-                    engine='openpyxl'
+                    skiprows=config.SKIPROWS_INVENTARIO
                 )
             
             self.df.columns = self.df.columns.str.strip()
@@ -91,6 +161,9 @@ class DataProcessor:
             print(f"📋 Columnas: {list(self.df.columns)}")
             return True
             
+        except SchemaError as e:
+            print(f"❌ Encabezados del inventario inválidos: {str(e)}")
+            return False
         except Exception as e:
             print(f"❌ Error al cargar inventario: {str(e)}")
             import traceback
@@ -107,7 +180,7 @@ class DataProcessor:
                 self.df_historical = self.sharepoint_loader.load_excel_from_sharepoint(
                     file_type='consolidado',
                     sheet_name=config.CONSOLIDADO_SHEET,
-                    skiprows=0
+                    skiprows=config.SKIPROWS_CONSOLIDADO
                 )
                 
             else:
@@ -118,21 +191,84 @@ class DataProcessor:
                     print(f"⚠️ No se encontró archivo histórico: {config.CONSOLIDADO_PATH}")
                     return False
                 
-                self.df_historical = pd.read_excel(
+                # Validar encabezados antes de parsear el libro completo
+                probe_consolidado(config.CONSOLIDADO_PATH)
+                
+                if self._usa_backend_historico():
+                    # El consolidado se lee en process_historical_sales
+                    print(f"   Modo '{self.historical_mode}': se leerá al procesar las ventas")
+                    return True
+                
+                self.df_historical = read_excel_cached(
+                    self.cache,
                     config.CONSOLIDADO_PATH,
                     sheet_name=config.CONSOLIDADO_SHEET,
-                    engine='openpyxl'
+                    skiprows=config.SKIPROWS_CONSOLIDADO
                 )
             
+            self.df_historical = apply_schema(self.df_historical)
             print(f"✅ Consolidado cargado: {len(self.df_historical)} registros")
             return True
             
+        except SchemaError as e:
+            print(f"⚠️ Encabezados del consolidado inválidos: {str(e)}")
+            return False
         except Exception as e:
             print(f"⚠️ Error al cargar consolidado: {str(e)}")
             import traceback
             traceback.print_exc()
             return False
     
+    def load_data_parallel(self):
+        """
+        Carga inventario y consolidado en paralelo (modo local)
+        
+        Returns:
+            (inventario_ok, historico_ok)
+        """
+        print(f"\n📂 Cargando inventario y consolidado en paralelo...")
+        
+        if not os.path.exists(self.excel_path):
+            print(f"❌ El archivo no existe en la ruta: {self.excel_path}")
+            return False, False
+        
+        # Validar encabezados antes de lanzar la carga completa
+        try:
+            probe_inventario(self.excel_path)
+        except SchemaError as e:
+            print(f"❌ Encabezados del inventario inválidos: {str(e)}")
+            return False, False
+        
+        tareas = {'inventario': (self.excel_path, config.SHEET_NAME, config.SKIPROWS_INVENTARIO)}
+        if not os.path.exists(config.CONSOLIDADO_PATH):
+            print(f"⚠️ No se encontró archivo histórico: {config.CONSOLIDADO_PATH}")
+        else:
+            try:
+                probe_consolidado(config.CONSOLIDADO_PATH)
+                tareas['consolidado'] = (config.CONSOLIDADO_PATH, config.CONSOLIDADO_SHEET, config.SKIPROWS_CONSOLIDADO)
+            except SchemaError as e:
+                print(f"⚠️ Encabezados del consolidado inválidos: {str(e)}")
+        
+        try:
+            frames, self.tiempos_carga = load_workbooks_parallel(tareas)
+        except Exception as e:
+            print(f"❌ Error en la carga paralela: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False, False
+        
+        self.df = frames['inventario']
+        self.df.columns = self.df.columns.str.strip()
+        print(f"✅ Inventario cargado: {len(self.df)} filas")
+        print(f"📋 Columnas: {list(self.df.columns)}")
+        
+        if 'consolidado' not in frames:
+            return True, False
+        
+        self.df_historical = apply_schema(frames['consolidado'])
+        print(f"✅ Consolidado cargado: {len(self.df_historical)} registros")
+        return True, True
+    
     def clean_data(self):
         """Limpia y prepara los datos de inventario"""
         if self.df is None:
@@ -174,11 +310,16 @@ class DataProcessor:
             })
             
             # Crear categorías de stock
-            inventario_procesado['categoria_stock'] = inventario_procesado['Stock_Actual'].apply(self._categorizar_stock)
-            inventario_procesado['categoria_producto'] = inventario_procesado['Producto'].apply(self._categorizar_producto)
+            inventario_procesado['categoria_stock'] = categoria_stock(inventario_procesado['Stock_Actual'])
+            # Atributos del producto desde la dimensión persistente
+            self.productos.update(inventario_procesado['Codigo'], inventario_procesado['Producto'])
+            inventario_procesado['categoria_producto'] = self.productos.lookup(
+                inventario_procesado['Codigo'], 'categoria_producto'
+            ).to_numpy()
             inventario_procesado['disponible'] = inventario_procesado['Stock_Actual'] > 0
             
             self.df_processed = inventario_procesado
+            self.invalidate_cache()
             print(f"✅ Datos limpiados: {len(inventario_procesado)} productos procesados")
             return True
             
@@ -188,8 +329,20 @@ class DataProcessor:
             traceback.print_exc()
             return False
     
+    def _usa_backend_historico(self):
+        """
+        Indica si el consolidado se procesa sin cargarlo en un DataFrame
+        (modos 'streaming', 'incremental' y 'sqlite'; solo en modo local)
+        """
+        return self.historical_mode in ('streaming', 'incremental', 'sqlite') and not self.use_sharepoint
+    
     def process_historical_sales(self):
         """Procesa datos históricos de ventas"""
+        if self._usa_backend_historico():
+            if self.historical_mode == 'sqlite':
+                return self._process_historical_sqlite()
+            return self._process_historical_streaming()
+        
         if self.df_historical is None:
             print("⚠️ No hay datos históricos para procesar")
             return False
@@ -197,50 +350,206 @@ class DataProcessor:
         try:
             print("🔄 Procesando ventas históricas...")
             
-            df_hist = self.df_historical.copy()
+            df_hist = self.df_historical
             
-            # Normalizar columnas
-            df_hist['Doc'] = df_hist['Doc'].astype(str).str.strip().str.upper()
-            df_hist['Local'] = df_hist['Local'].astype(str).str.strip().str.upper()
+            # Filtrar por VENTA y PLANTA GALAN (Doc y Local ya vienen
+            # normalizados si se aplicó el esquema; normalize_text es barato
+            # sobre categorías)
+            mascara = (
+                (normalize_text(df_hist['Doc']) == config.FILTRO_DOC_TIPO) & 
+                (normalize_text(df_hist['Local']) == self.local)
+            ).to_numpy()
             
-            # Filtrar por VENTA y PLANTA GALAN
-            ventas = df_hist[
-                (df_hist['Doc'] == config.FILTRO_DOC_TIPO) & 
-                (df_hist['Local'] == config.FILTRO_LOCAL)
-            ].copy()
+            # Solo se copian las filas filtradas de las tres columnas necesarias
+            ventas = df_hist.loc[mascara, [config.COL_FECHA, config.COL_COD_HISTORICO, config.COL_KG_VENDIDOS]]
             
             print(f"📌 Registros después de filtros: {len(ventas)}")
             
-            # Normalizar códigos
-            ventas[config.COL_COD_HISTORICO] = pd.to_numeric(ventas[config.COL_COD_HISTORICO], errors='coerce')
-            ventas[config.COL_COD_HISTORICO] = ventas[config.COL_COD_HISTORICO].astype('Int64')
-            ventas = ventas[ventas[config.COL_COD_HISTORICO].notna()]
-            
-            # Seleccionar columnas relevantes
-            ventas_procesadas = ventas[[config.COL_FECHA, config.COL_COD_HISTORICO, config.COL_KG_VENDIDOS]].copy()
-            ventas_procesadas = ventas_procesadas.rename(columns={
-                config.COL_FECHA: 'fecha',
-                config.COL_COD_HISTORICO: 'Cod',
-                config.COL_KG_VENDIDOS: 'Kg_Vendidos'
-            })
+            promedios = self._promedios_por_codigo(self._normalizar_ventas(ventas), self.local)
+            self.promedios = promedios
+            self.macropiezas = self._macropiezas_historico(df_hist)
             
-            # Calcular número de semanas
-            fecha_min = ventas_procesadas['fecha'].min()
-            fecha_max = ventas_procesadas['fecha'].max()
-            num_semanas = (fecha_max - fecha_min).days / 7
+            print(f"✅ Promedios calculados para {len(promedios)} productos")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error al procesar ventas: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def _normalizar_ventas(self, ventas):
+        """Normaliza códigos y kilos y renombra a fecha / Cod / Kg_Vendidos"""
+        # Normalizar códigos
+        ventas[config.COL_COD_HISTORICO] = pd.to_numeric(ventas[config.COL_COD_HISTORICO], errors='coerce')
+        ventas[config.COL_COD_HISTORICO] = ventas[config.COL_COD_HISTORICO].astype('Int64')
+        ventas = ventas[ventas[config.COL_COD_HISTORICO].notna()]
+        
+        # Acumular en float64 aunque el esquema guarde los kilos en float32
+        ventas[config.COL_KG_VENDIDOS] = ventas[config.COL_KG_VENDIDOS].astype('float64')
+        
+        # Renombrar columnas relevantes
+        return ventas.rename(columns={
+            config.COL_FECHA: 'fecha',
+            config.COL_COD_HISTORICO: 'Cod',
+            config.COL_KG_VENDIDOS: 'Kg_Vendidos'
+        })
+    
+    def _promedios_por_codigo(self, ventas_procesadas, local):
+        """Calcula total, número de ventas, promedio semanal y ventanas por código"""
+        # Calcular número de semanas
+        fecha_min = ventas_procesadas['fecha'].min()
+        fecha_max = ventas_procesadas['fecha'].max()
+        num_semanas = (fecha_max - fecha_min).days / 7
+        
+        print(f"📅 Período: {fecha_min.strftime('%d/%m/%Y')} a {fecha_max.strftime('%d/%m/%Y')}")
+        print(f"📊 Total semanas: {num_semanas:.1f}")
+        
+        # Calcular promedios semanales
+        promedios = ventas_procesadas.groupby('Cod').agg({
+            'Kg_Vendidos': ['sum', 'count']
+        }).reset_index()
+        
+        promedios.columns = ['Cod', 'Total_Vendido', 'Num_Ventas']
+        promedios['Promedio_Semanal'] = promedios['Total_Vendido'] / num_semanas
+        
+        # Cubo semanal: solo se acumulan las ventas posteriores a las ya guardadas
+        cubo, filas_nuevas, reconstruido = update_cube(
+            ventas_procesadas['Cod'],
+            ventas_procesadas['fecha'],
+            ventas_procesadas['Kg_Vendidos'],
+            clave=f"{config.FILTRO_DOC_TIPO}|{local}",
+            path=os.path.join(config.PROCESSED_DIR, f"ventas_semanales_{slug_local(local)}.npz")
+        )
+        print(f"🧊 Cubo semanal: {cubo.matriz.shape[0]} productos x {cubo.num_semanas} semanas "
+              f"({'reconstruido' if reconstruido else f'{filas_nuevas} ventas nuevas'})")
+        return self._aplicar_ventanas(promedios, cubo)
+    
+    def _macropiezas_historico(self, df_hist):
+        """Primera Macropieza no vacía por código sobre todo el histórico"""
+        if 'Macropieza' not in df_hist.columns:
+            return None
+        codigos = pd.to_numeric(df_hist[config.COL_COD_HISTORICO], errors='coerce')
+        codigos = codigos.where(codigos % 1 == 0).astype('Int64')
+        return df_hist['Macropieza'].groupby(codigos, observed=True).first().dropna().to_dict()
+    
+    def process_all_plants(self, locales=None):
+        """
+        Analiza todas las plantas (columna Local) del consolidado en una sola pasada
+        
+        Requiere el inventario procesado y el consolidado cargado en memoria
+        (modo 'pandas'). Cada planta queda en self.plantas como una vista del
+        procesador con sus propios promedios y análisis.
+        
+        Args:
+            locales: Locales a analizar (por defecto todos los que tienen ventas)
+        
+        Returns:
+            dict Local -> DataProcessor
+        """
+        if self.df_historical is None and self.df_processed is not None and not self._usa_backend_historico():
+            # process() no carga el consolidado si reutilizó las ventas guardadas
+            self.load_historical_data()
+        if self.df_processed is None or self.df_historical is None:
+            print("⚠️ Se necesita el inventario procesado y el consolidado en memoria (modo 'pandas')")
+            return {}
+        
+        try:
+            print("🏭 Procesando ventas de todas las plantas...")
+            df_hist = self.df_historical
+            
+            # Un solo filtro por tipo de documento y una sola normalización
+            # para todas las plantas
+            mascara = (normalize_text(df_hist['Doc']) == config.FILTRO_DOC_TIPO).to_numpy()
+            ventas = df_hist.loc[mascara, [config.COL_FECHA, config.COL_COD_HISTORICO, config.COL_KG_VENDIDOS]]
+            ventas['Local'] = normalize_text(df_hist['Local'])[mascara]
+            ventas_procesadas = self._normalizar_ventas(ventas)
+            macropiezas = self._macropiezas_historico(df_hist)
+            
+            seleccion = {str(local).strip().upper() for local in locales} if locales else None
+            plantas = {}
+            for local, grupo in ventas_procesadas.groupby('Local', observed=True, sort=True):
+                if seleccion is not None and local not in seleccion:
+                    continue
+                print(f"\n🏭 {local}: {len(grupo)} registros")
+                
+                vista = copy.copy(self)
+                vista.invalidate_cache(reiniciar_contadores=True)
+                vista.df = None
+                vista.df_historical = None
+                vista.sharepoint_loader = None
+                vista.plantas = {}
+                vista.local = local
+                vista.promedios = vista._promedios_por_codigo(grupo, local)
+                vista.macropiezas = macropiezas
+                if vista.merge_with_historical():
+                    vista.forecast_demand()
+                    plantas[local] = vista
+            
+            self.plantas = plantas
+            print(f"\n✅ Análisis generado para {len(plantas)} plantas")
+            return plantas
+            
+        except Exception as e:
+            print(f"❌ Error al procesar plantas: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return {}
+    
+    def _process_historical_streaming(self):
+        """Procesa ventas históricas leyendo el consolidado en streaming"""
+        try:
+            print("🔄 Procesando ventas históricas (streaming)...")
+            
+            if self.historical_mode == 'incremental':
+                ventas, _, _ = update_sales(config.CONSOLIDADO_PATH, sheet_name=config.CONSOLIDADO_SHEET, cache=self.cache)
+            else:
+                ventas = stream_sales(config.CONSOLIDADO_PATH, sheet_name=config.CONSOLIDADO_SHEET)
+            
+            print(f"📌 Registros después de filtros: {ventas.filas_filtradas} de {ventas.filas_leidas}")
+            if ventas.fecha_min is None:
+                print("⚠️ No hay ventas que cumplan los filtros")
+                return False
+            
+            print(f"📅 Período: {ventas.fecha_min.strftime('%d/%m/%Y')} a {ventas.fecha_max.strftime('%d/%m/%Y')}")
+            print(f"📊 Total semanas: {ventas.num_semanas:.1f}")
             
+            self.promedios = self._aplicar_ventanas(ventas.to_promedios(), ventas.to_cube())
+            self.macropiezas = dict(ventas.macropiezas)
+            print(f"✅ Promedios calculados para {len(self.promedios)} productos")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error al procesar ventas: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def _process_historical_sqlite(self):
+        """Procesa ventas históricas con consultas sobre la base SQLite local"""
+        try:
+            print("🔄 Procesando ventas históricas (SQLite)...")
+            
+            store = SalesStore()
+            store.ingest(config.CONSOLIDADO_PATH, sheet_name=config.CONSOLIDADO_SHEET)
+            
+            promedios, fecha_min, fecha_max, num_registros = store.promedios()
+            print(f"📌 Registros después de filtros: {num_registros}")
+            if fecha_min is None:
+                print("⚠️ No hay ventas que cumplan los filtros")
+                return False
+            
+            num_semanas = (fecha_max - fecha_min).days / 7
             print(f"📅 Período: {fecha_min.strftime('%d/%m/%Y')} a {fecha_max.strftime('%d/%m/%Y')}")
             print(f"📊 Total semanas: {num_semanas:.1f}")
             
-            # Calcular promedios semanales
-            promedios = ventas_procesadas.groupby('Cod').agg({
-                'Kg_Vendidos': ['sum', 'count']
-            }).reset_index()
-            
-            promedios.columns = ['Cod', 'Total_Vendido', 'Num_Ventas']
-            promedios['Promedio_Semanal'] = promedios['Total_Vendido'] / num_semanas
+            semanal = store.semanal()
+            cubo = WeeklySalesCube()
+            cubo.add_sales(semanal['Cod'], semanal['Semana'], semanal['Kg'])
+            cubo.fecha_max = pd.Timestamp(fecha_max)
             
-            self.promedios = promedios
+            self.promedios = self._aplicar_ventanas(promedios, cubo)
+            self.macropiezas = store.macropiezas()
             print(f"✅ Promedios calculados para {len(promedios)} productos")
             return True
             
@@ -250,6 +559,23 @@ class DataProcessor:
             traceback.print_exc()
             return False
     
+    def _aplicar_ventanas(self, promedios, cubo):
+        """
+        Agrega a los promedios el promedio y la desviación de cada ventana de
+        config.VENTANAS_SEMANALES; si config.VENTANA_PROMEDIO > 0 esa ventana
+        reemplaza a Promedio_Semanal
+        """
+        self.cubo = cubo
+        ventanas = list(config.VENTANAS_SEMANALES)
+        if config.VENTANA_PROMEDIO and config.VENTANA_PROMEDIO not in ventanas:
+            ventanas.append(config.VENTANA_PROMEDIO)
+        
+        promedios = promedios.merge(cubo.window_stats(ventanas), on='Cod', how='left')
+        if config.VENTANA_PROMEDIO:
+            promedios['Promedio_Semanal'] = promedios[f'Promedio_{config.VENTANA_PROMEDIO}s'].fillna(0)
+            print(f"📐 Promedio semanal calculado sobre las últimas {config.VENTANA_PROMEDIO} semanas")
+        return promedios
+    
     def merge_with_historical(self):
         """Une inventario actual con promedios de ventas"""
         if self.df_processed is None or self.promedios is None:
@@ -259,21 +585,14 @@ class DataProcessor:
         try:
             print("🔗 Combinando inventario con ventas...")
             
-            # Convertir códigos a string para merge
-            inventario = self.df_processed.copy()
-            promedios = self.promedios.copy()
+            # Join por código entero (Int64 en ambos lados): cada código del
+            # inventario se busca en el índice de promedios
+            analisis = self.df_processed.reset_index(drop=True)
+            promedios = self.promedios.set_index(self.promedios['Cod'].astype('Int64'))
+            ventas = promedios.reindex(pd.Index(analisis['Codigo'].astype('Int64')))
             
-            inventario['Codigo'] = inventario['Codigo'].astype(str).str.strip().str.upper()
-            promedios['Cod'] = promedios['Cod'].astype(str).str.strip().str.upper()
-            
-            # Merge con how='left' para mantener todos los productos
-            analisis = pd.merge(
-                inventario,
-                promedios[['Cod', 'Total_Vendido', 'Num_Ventas', 'Promedio_Semanal']],
-                left_on='Codigo',
-                right_on='Cod',
-                how='left'
-            )
+            for col in ['Total_Vendido', 'Num_Ventas', 'Promedio_Semanal']:
+                analisis[col] = ventas[col].to_numpy(dtype=float)
             
             # Rellenar NaN con 0
             analisis['Promedio_Semanal'] = analisis['Promedio_Semanal'].fillna(0)
@@ -290,35 +609,24 @@ class DataProcessor:
             # Calcular diferencia
             analisis['Diferencia'] = analisis['Stock_Actual'] - analisis['Promedio_Semanal']
             
-            # Calcular semanas de stock con casos especiales
-            def calcular_semanas(row):
-                stock = row['Stock_Actual']
-                promedio = row['Promedio_Semanal']
-                
-                if stock < 0:
-                    return -999
-                if stock == 0:
-                    return -1
-                if promedio == 0 or pd.isna(promedio):
-                    return -2
-                return round(stock / promedio, 1)
-            
-            analisis['Semanas_Stock'] = analisis.apply(calcular_semanas, axis=1)
-            
-            # Agregar Macropieza desde el consolidado
-            if self.df_historical is not None:
-                df_hist = self.df_historical.copy()
-                df_hist['Cod'] = df_hist['Cod'].astype(str).str.strip().str.upper()
-                macropieza_map = df_hist.groupby('Cod')['Macropieza'].first().to_dict()
-                analisis['Macropieza'] = analisis['Codigo'].map(macropieza_map)
+            # Calcular semanas de stock con casos especiales (-999, -1, -2)
+            analisis['Semanas_Stock'] = semanas_stock(analisis['Stock_Actual'], analisis['Promedio_Semanal'])
+            
+            # Agregar Macropieza desde la dimensión de productos (se completa
+            # con el mapa por código calculado al agregar las ventas)
+            if self.macropiezas is not None:
+                self.productos.update(analisis['Codigo'], macropiezas=self.macropiezas)
+                analisis['Macropieza'] = self.productos.lookup(analisis['Codigo'], 'Macropieza').to_numpy()
                 analisis['Macropieza'] = analisis['Macropieza'].fillna('Sin clasificar')
                 print(f"✅ Macropiezas agregadas: {analisis['Macropieza'].nunique()} categorías")
             
-            # Eliminar columna duplicada
-            if 'Cod' in analisis.columns:
-                analisis = analisis.drop('Cod', axis=1)
+            # Promedios y desviaciones por ventana del cubo semanal
+            for col in self.promedios.columns:
+                if col.startswith(('Promedio_', 'Desv_')) and col != 'Promedio_Semanal':
+                    analisis[col] = np.nan_to_num(ventas[col].to_numpy(dtype=float))
             
             self.analisis = analisis
+            self.invalidate_cache()
             print(f"✅ Datos combinados exitosamente: {len(analisis)} productos")
             return True
             
@@ -328,42 +636,69 @@ class DataProcessor:
             traceback.print_exc()
             return False
     
+    def forecast_demand(self):
+        """
+        Pronostica la demanda de la próxima semana de cada producto (SES/Holt
+        vectorizado sobre el cubo semanal) y agrega al análisis
+        Pronostico_Semanal, Modelo_Pronostico y Semanas_Stock_Pronostico
+        """
+        if self.analisis is None or self.cubo is None:
+            print("⚠️ No hay datos para pronosticar")
+            return False
+        
+        try:
+            print("📈 Pronosticando demanda semanal...")
+            pronostico = forecast_cube(self.cubo).set_index('Cod')
+            codigos = pd.Index(self.analisis['Codigo'].astype('Int64'))
+            
+            analisis = self.analisis
+            analisis['Pronostico_Semanal'] = np.nan_to_num(
+                pronostico['Pronostico_Semanal'].reindex(codigos).to_numpy(dtype=float)
+            )
+            analisis['Modelo_Pronostico'] = pronostico['Modelo_Pronostico'].reindex(codigos).fillna('Sin ventas').to_numpy()
+            analisis['Semanas_Stock_Pronostico'] = semanas_stock(analisis['Stock_Actual'], analisis['Pronostico_Semanal'])
+            
+            self.invalidate_cache()
+            print(f"✅ Pronóstico calculado para {len(pronostico)} productos "
+                  f"({(pronostico['Modelo_Pronostico'] == 'Holt').sum()} con tendencia)")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error al pronosticar demanda: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
     def _categorizar_stock(self, cantidad):
-        """Categoriza el nivel de stock"""
-        if cantidad == 0:
-            return "Sin Stock"
-        elif cantidad <= config.STOCK_CRITICO:
-            return "Crítico"
-        elif cantidad <= config.STOCK_BAJO:
-            return "Bajo"
-        else:
-            return "Normal"
+        """Categoriza el nivel de stock (ver coverage.categoria_stock)"""
+        return categoria_stock([cantidad])[0]
     
     def _categorizar_producto(self, nombre):
-        """Categoriza productos por tipo"""
-        nombre = nombre.upper()
-        
-        if 'CHULETA' in nombre:
-            return 'Chuletas'
-        elif 'COSTILLA' in nombre or 'COSTILOMO' in nombre:
-            return 'Costillas'
-        elif 'CANASTO' in nombre:
-            return 'Canastos'
-        elif 'MERMA' in nombre:
-            return 'Mermas'
-        elif 'SILLA' in nombre:
-            return 'Sillas'
-        elif 'SPARRY' in nombre:
-            return 'Sparry'
-        elif 'MATAMBRITO' in nombre:
-            return 'Matambrito'
-        elif 'COSTIPIEL' in nombre:
-            return 'Costipiel'
-        else:
-            return 'Otros'
+        """Categoriza productos por tipo (ver config.REGLAS_CATEGORIA_PRODUCTO)"""
+        return self.categorizador.categorize_one(nombre)
+    
+    def invalidate_cache(self, reiniciar_contadores=False):
+        """Descarta los resultados memorizados (se llama al cambiar los datos)"""
+        self._memo = {}
+        if reiniciar_contadores:
+            self.memo_hits = 0
+            self.memo_misses = 0
+    
+    def memo_info(self):
+        """Aciertos, fallos y entradas de la memoria de getters"""
+        return {'hits': self.memo_hits, 'misses': self.memo_misses, 'entradas': len(self._memo)}
     
     def get_statistics(self):
         """Calcula estadísticas del inventario"""
+        stats = self._estadisticas()
+        if stats is None:
+            return None
+        # La fecha se toma en cada llamada: no forma parte del resultado memorizado
+        return {**stats, 'fecha_actualizacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    
+    @_memoizado
+    def _estadisticas(self):
+        """Estadísticas del inventario que solo cambian con los datos"""
         if self.df_processed is None:
             return None
         
@@ -377,7 +712,6 @@ class DataProcessor:
             'stock_total_kilos': df['Stock_Actual'].sum(),
             'productos_criticos': (df['categoria_stock'] == 'Crítico').sum(),
             'productos_bajo_stock': (df['categoria_stock'] == 'Bajo').sum(),
-            'fecha_actualizacion': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
         if self.analisis is not None:
@@ -387,6 +721,7 @@ class DataProcessor:
         
         return stats
     
+    @_memoizado
     def get_data_by_category(self):
         """Obtiene datos agrupados por categoría"""
         if self.df_processed is None:
@@ -401,6 +736,7 @@ class DataProcessor:
         category_data = category_data.reset_index()
         return category_data
     
+    @_memoizado
     def get_critical_products(self):
         """Obtiene productos críticos o sin stock"""
         if self.df_processed is None:
@@ -415,24 +751,28 @@ class DataProcessor:
         cols_to_show = ['Codigo', 'Producto', 'Stock_Actual', 'categoria_stock']
         return critical[cols_to_show]
     
+    @_memoizado
     def get_top_sobrestock(self, n=10):
         """Obtiene productos con mayor sobrestock"""
         if self.analisis is None:
             return None
         return self.analisis.nlargest(n, 'Diferencia')
     
+    @_memoizado
     def get_top_deficit(self, n=10):
         """Obtiene productos con mayor déficit"""
         if self.analisis is None:
             return None
         return self.analisis.nsmallest(n, 'Diferencia')
     
+    @_memoizado
     def get_top_rotacion(self, n=10):
         """Obtiene productos con mayor rotación"""
         if self.analisis is None:
             return None
         return self.analisis.nlargest(n, 'Num_Ventas')
     
+    @_memoizado
     def get_productos_criticos_ventas(self, n=5):
         """Obtiene productos más críticos según ratio de cobertura"""
         if self.analisis is None:
@@ -445,20 +785,152 @@ class DataProcessor:
         criticos['Ratio_Cobertura'] = criticos['Stock_Actual'] / criticos['Promedio_Semanal']
         return criticos.sort_values('Ratio_Cobertura').head(n)
     
-    def process(self):
-        """Ejecuta todo el proceso completo"""
-        if not self.load_data():
+    def save_snapshot(self, fecha=None):
+        """
+        Guarda la foto del inventario procesado en el historial
+
+        Usa el análisis si existe (con Estado y Semanas_Stock); si no, solo el
+        stock. Un error aquí no hace fallar el proceso.
+        """
+        if self.historial is None:
             return False
-        if not self.clean_data():
+        
+        datos = self.analisis if self.analisis is not None else self.df_processed
+        if datos is None:
             return False
         
-        if self.load_historical_data():
-            if self.process_historical_sales():
-                self.merge_with_historical()
+        try:
+            filas = self.historial.append(datos, fecha)
+            if filas:
+                print(f"🗂️ Historial: {filas} productos guardados")
+            return bool(filas)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el historial de inventario: {str(e)}")
+            return False
+    
+    def get_stock_history(self, desde=None, hasta=None, codigos=None):
+        """Fotos guardadas entre dos fechas (solo lee las particiones del rango)"""
+        if self.historial is None:
+            return None
+        return self.historial.read(desde, hasta, codigos)
+    
+    def _pipeline(self):
+        """
+        Declara el proceso como DAG: inventario y ventas son independientes
+        y el análisis depende de ambos
+
+        Al reutilizar una salida guardada solo se repone lo que usan los
+        pasos siguientes y los getters: df_processed, promedios, macropiezas,
+        cubo, analisis y la dimensión de productos. Los datos crudos (df y
+        df_historical) quedan en None; process_all_plants carga el
+        consolidado si lo necesita.
+        """
+        def modulos(*objetos):
+            return [inspect.getmodule(objeto) for objeto in objetos]
+        
+        origen_inventario = None if self.use_sharepoint else self.excel_path
+        origen_consolidado = None if self.use_sharepoint else config.CONSOLIDADO_PATH
+        
+        def paso_inventario():
+            if not (self.load_data() and self.clean_data()):
+                return None
+            return self.df_processed
+        
+        def paso_ventas():
+            if not (self.load_historical_data() and self.process_historical_sales()):
+                return None
+            return {'promedios': self.promedios, 'macropiezas': self.macropiezas, 'cubo': self.cubo}
         
+        def paso_analisis(inventario, ventas):
+            self.df_processed = inventario
+            self.promedios = ventas['promedios']
+            self.macropiezas = ventas['macropiezas']
+            self.cubo = ventas['cubo']
+            return self.analisis if self.merge_with_historical() else None
+        
+        def paso_pronostico(analisis, ventas):
+            self.analisis = analisis.copy()
+            self.cubo = ventas['cubo']
+            return self.analisis if self.forecast_demand() else None
+        
+        # Efectos secundarios sobre la dimensión de productos (clean_data y
+        # merge_with_historical): update solo toca los códigos que falten
+        def restaurar_inventario(inventario):
+            self.productos.update(inventario['Codigo'], inventario['Producto'])
+        
+        def restaurar_analisis(analisis, inventario, ventas):
+            if ventas['macropiezas'] is not None:
+                self.productos.update(analisis['Codigo'], macropiezas=ventas['macropiezas'])
+        
+        return Pipeline([
+            Step(
+                'inventario', paso_inventario,
+                archivos=[origen_inventario],
+                codigo=modulos(DataProcessor, read_excel_cached, probe_inventario, apply_schema,
+                               categoria_stock, ProductDimension, ProductCategorizer),
+                restaurar=restaurar_inventario,
+                config={
+                    'hoja': config.SHEET_NAME,
+                    'skiprows': config.SKIPROWS_INVENTARIO,
+                    'stock_critico': config.STOCK_CRITICO,
+                    'stock_bajo': config.STOCK_BAJO,
+                    'reglas': self.categorizador.version,
+                }
+            ),
+            Step(
+                'ventas', paso_ventas,
+                archivos=[origen_consolidado],
+                codigo=modulos(DataProcessor, read_excel_cached, probe_consolidado, apply_schema,
+                               stream_sales, update_sales, SalesStore, WeeklySalesCube),
+                config={
+                    'hoja': config.CONSOLIDADO_SHEET,
+                    'skiprows': config.SKIPROWS_CONSOLIDADO,
+                    'doc': config.FILTRO_DOC_TIPO,
+                    'local': self.local,
+                    'modo': self.historical_mode,
+                    'columnas': [config.COL_FECHA, config.COL_COD_HISTORICO, config.COL_KG_VENDIDOS],
+                    'ventanas': list(config.VENTANAS_SEMANALES),
+                    'ventana_promedio': config.VENTANA_PROMEDIO,
+                }
+            ),
+            Step('analisis', paso_analisis, dependencias=['inventario', 'ventas'],
+                 codigo=modulos(DataProcessor, semanas_stock, ProductDimension),
+                 restaurar=restaurar_analisis),
+            Step('pronostico', paso_pronostico, dependencias=['analisis', 'ventas'],
+                 config={'semanas': config.PRONOSTICO_SEMANAS},
+                 codigo=modulos(DataProcessor, forecast_cube)),
+        ], usar_cache=config.USE_CACHE)
+    
+    def process(self):
+        """Ejecuta todo el proceso completo"""
+        self.invalidate_cache()
+        
+        if self.parallel_load and not self.use_sharepoint and not self._usa_backend_historico():
+            inventario_ok, historico_ok = self.load_data_parallel()
+            if not inventario_ok or not self.clean_data():
+                return False
+            if historico_ok and self.process_historical_sales() and self.merge_with_historical():
+                self.forecast_demand()
+            self.save_snapshot()
+            return True
+        
+        # Cada paso se omite si sus entradas no cambiaron desde la última ejecución
+        pipeline = self._pipeline()
+        salidas = pipeline.run()
+        self.pipeline_log = pipeline.log
+        if 'inventario' not in salidas:
+            return False
+        
+        self.df_processed = salidas['inventario']
+        if 'ventas' in salidas:
+            self.promedios = salidas['ventas']['promedios']
+            self.macropiezas = salidas['ventas']['macropiezas']
+            self.cubo = salidas['ventas']['cubo']
+        self.analisis = salidas.get('pronostico', salidas.get('analisis'))
+        self.invalidate_cache()
+        self.save_snapshot()
         return True
 
-
 if __name__ == "__main__":
     processor = DataProcessor()
     if processor.process():
@@ -0,0 +1,145 @@
+"""
+Módulo Lector de Excel - Dashboard Inventario Lomarosa
+Punto único para leer libros de Excel con el motor más rápido disponible:
+usa calamine (python-calamine) si está instalado y openpyxl si no.
+
+No depende de config.py para poder usarse también desde facturas.py y
+cartera_final/app.py. El motor se puede forzar con la variable de entorno
+EXCEL_ENGINE ('auto', 'calamine' u 'openpyxl').
+"""
+
+import importlib.util
+import os
+import time
+
+import pandas as pd
+
+
+# Orden de preferencia: el primero disponible es el que se usa en modo 'auto'
+ENGINE_PREFERENCE = ('calamine', 'openpyxl')
+
+
+def _pandas_soporta_calamine():
+    """pandas agregó engine='calamine' en la versión 2.2"""
+    version = tuple(int(parte) for parte in pd.__version__.split('.')[:2])
+    return version >= (2, 2)
+
+
+def available_engines():
+    """Devuelve los motores instalados, en orden de preferencia"""
+    motores = []
+    for engine in ENGINE_PREFERENCE:
+        if engine == 'calamine':
+            if _pandas_soporta_calamine() and importlib.util.find_spec('python_calamine'):
+                motores.append(engine)
+        elif importlib.util.find_spec(engine):
+            motores.append(engine)
+    return motores
+
+
+def select_engine(preferred=None):
+    """
+    Elige el motor de lectura
+
+    Args:
+        preferred: Motor solicitado; None o 'auto' usa EXCEL_ENGINE o el más rápido
+    """
+    preferred = (preferred or os.getenv('EXCEL_ENGINE', 'auto')).lower()
+    motores = available_engines()
+    if not motores:
+        raise ImportError("No hay motor de Excel instalado (instala openpyxl o python-calamine)")
+
+    if preferred != 'auto':
+        if preferred in motores:
+            return preferred
+        print(f"⚠️ Motor de Excel '{preferred}' no disponible, usando '{motores[0]}'")
+    return motores[0]
+
+
+def _es_error_del_motor(error):
+    """
+    Indica si vale la pena reintentar con openpyxl
+
+    Un archivo inexistente o sin permisos (OSError) y una hoja que no existe
+    fallan igual con cualquier motor, así que esos errores se propagan tal cual.
+    """
+    if isinstance(error, OSError):
+        return False
+    if isinstance(error, ValueError) and str(error).startswith('Worksheet '):
+        return False
+    return True
+
+
+def read_excel(source, sheet_name=0, skiprows=None, engine=None, **kwargs):
+    """
+    Lee una hoja de Excel con el motor elegido y cae a openpyxl si el motor
+    no puede parsear el archivo (los errores de archivo u hoja se propagan)
+
+    Args:
+        source: Ruta, bytes en BytesIO o cualquier objeto aceptado por pd.read_excel
+        sheet_name: Hoja a leer (nombre o índice)
+        skiprows: Filas a saltar antes del encabezado
+        engine: Motor a usar; None elige automáticamente
+        **kwargs: Argumentos adicionales para pd.read_excel
+    """
+    engine = select_engine(engine)
+    posicion = source.tell() if hasattr(source, 'seek') else None
+
+    try:
+        return pd.read_excel(source, sheet_name=sheet_name, skiprows=skiprows, engine=engine, **kwargs)
+    except Exception as e:
+        if engine == 'openpyxl' or 'openpyxl' not in available_engines() or not _es_error_del_motor(e):
+            raise
+        print(f"⚠️ El motor '{engine}' no pudo leer el archivo ({str(e)}), reintentando con openpyxl")
+        if posicion is not None:
+            source.seek(posicion)
+        return pd.read_excel(source, sheet_name=sheet_name, skiprows=skiprows, engine='openpyxl', **kwargs)
+
+
+def benchmark_engines(path, sheet_name=0, skiprows=None, repeticiones=3):
+    """
+    Compara el tiempo de lectura de cada motor y verifica que todos
+    devuelvan exactamente el mismo DataFrame que openpyxl
+
+    Returns:
+        dict motor -> mejor tiempo en segundos
+    """
+    resultados = {}
+    referencia = None
+
+    for engine in available_engines()[::-1]:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            df = pd.read_excel(path, sheet_name=sheet_name, skiprows=skiprows, engine=engine)
+            tiempos.append(time.perf_counter() - inicio)
+
+        if referencia is None:
+            referencia = df
+        else:
+            pd.testing.assert_frame_equal(df, referencia)
+
+        resultados[engine] = min(tiempos)
+        print(f"   {engine:<10} {resultados[engine]:.3f}s  ({len(df)} filas x {len(df.columns)} columnas)")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import config
+
+    print(f"🔎 Motores disponibles: {available_engines()} (se usará '{select_engine()}')")
+    for path, sheet_name, skiprows in [
+        (config.EXCEL_PATH, config.SHEET_NAME, config.SKIPROWS_INVENTARIO),
+        (config.CONSOLIDADO_PATH, config.CONSOLIDADO_SHEET, config.SKIPROWS_CONSOLIDADO),
+    ]:
+        if not os.path.exists(path):
+            print(f"⚠️ No existe {path}, se omite")
+            continue
+        print(f"\n📊 {os.path.basename(path)} [{sheet_name}]")
+        tiempos = benchmark_engines(path, sheet_name, skiprows)
+        print("✅ Todos los motores devolvieron DataFrames idénticos")
+        if len(tiempos) > 1:
+            print(f"⚡ calamine es {tiempos['openpyxl'] / tiempos['calamine']:.1f}x más rápido")
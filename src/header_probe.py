@@ -0,0 +1,134 @@
+"""
+Módulo de Verificación de Encabezados - Dashboard Inventario Lomarosa
+Abre los libros en modo read-only y lee solo la fila de encabezados para
+validar las columnas requeridas antes de parsear el archivo completo. Si
+alguien renombra o mueve columnas, el error aparece en milisegundos y dice
+exactamente qué falta y dónde.
+"""
+
+import difflib
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+import config
+
+
+# Filas (a partir del encabezado esperado) en las que se busca el encabezado
+# si hay filas vacías de por medio, igual que hace pandas al leer
+FILAS_BUSQUEDA = 5
+
+
+class SchemaError(ValueError):
+    """Faltan columnas requeridas en un libro de Excel"""
+
+
+def _normalizar(valor):
+    return str(valor).strip().upper() if valor is not None else ''
+
+
+def read_header(path, sheet_name, header_row=1):
+    """
+    Lee solo la fila de encabezados de una hoja
+
+    Args:
+        path: Ruta del libro
+        sheet_name: Nombre de la hoja
+        header_row: Fila del encabezado (1 = primera fila de la hoja)
+
+    Returns:
+        (fila, encabezados) con la primera fila no vacía desde header_row
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            raise SchemaError(
+                f"{Path(path).name}: no existe la hoja '{sheet_name}' (hojas: {wb.sheetnames})"
+            )
+        ws = wb[sheet_name]
+        filas = ws.iter_rows(min_row=header_row, max_row=header_row + FILAS_BUSQUEDA - 1, values_only=True)
+        for fila, valores in enumerate(filas, start=header_row):
+            encabezados = [str(valor).strip() for valor in valores if valor is not None and str(valor).strip()]
+            if encabezados:
+                return fila, encabezados
+    finally:
+        wb.close()
+
+    raise SchemaError(
+        f"{Path(path).name} [{sheet_name}]: no hay encabezados entre las filas "
+        f"{header_row} y {header_row + FILAS_BUSQUEDA - 1}"
+    )
+
+
+def probe_headers(path, sheet_name, header_row=1, requeridas=(), contiene=()):
+    """
+    Valida que la hoja tenga las columnas requeridas
+
+    Args:
+        requeridas: Nombres exactos (se ignoran mayúsculas y espacios)
+        contiene: Textos que deben aparecer en al menos un encabezado
+            (p. ej. 'cod' para la columna de código del inventario)
+
+    Returns:
+        Lista de encabezados encontrados
+
+    Raises:
+        SchemaError con las columnas faltantes, la fila leída y sugerencias
+    """
+    fila, encabezados = read_header(path, sheet_name, header_row)
+    normalizados = {_normalizar(col) for col in encabezados}
+
+    faltantes = [col for col in requeridas if _normalizar(col) not in normalizados]
+    faltantes += [
+        f"*{texto}*" for texto in contiene
+        if not any(texto.upper() in col for col in normalizados)
+    ]
+    if not faltantes:
+        return encabezados
+
+    sugerencias = []
+    for col in faltantes:
+        parecidas = difflib.get_close_matches(col.strip('*'), encabezados, n=1, cutoff=0.6)
+        if parecidas:
+            sugerencias.append(f"'{col}' -> ¿'{parecidas[0]}'?")
+
+    mensaje = (
+        f"{Path(path).name} [{sheet_name}] fila {fila}: faltan las columnas {faltantes}. "
+        f"Encabezados encontrados: {encabezados}"
+    )
+    if sugerencias:
+        mensaje += f". Posibles renombres: {', '.join(sugerencias)}"
+    raise SchemaError(mensaje)
+
+
+def probe_inventario(path=None):
+    """Valida los encabezados del inventario (hoja config.SHEET_NAME)"""
+    return probe_headers(
+        path or config.EXCEL_PATH,
+        config.SHEET_NAME,
+        header_row=config.SKIPROWS_INVENTARIO + 1,
+        requeridas=config.COLUMNAS_REQUERIDAS_INVENTARIO,
+        contiene=('cod',)
+    )
+
+
+def probe_consolidado(path=None):
+    """Valida los encabezados del consolidado (hoja config.CONSOLIDADO_SHEET)"""
+    return probe_headers(
+        path or config.CONSOLIDADO_PATH,
+        config.CONSOLIDADO_SHEET,
+        header_row=config.SKIPROWS_CONSOLIDADO + 1,
+        requeridas=config.COLUMNAS_REQUERIDAS_CONSOLIDADO
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    for nombre, probe in [('Inventario', probe_inventario), ('Consolidado', probe_consolidado)]:
+        inicio = time.perf_counter()
+        try:
+            columnas = probe()
+            print(f"✅ {nombre}: {columnas} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+        except SchemaError as e:
+            print(f"❌ {nombre}: {str(e)} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
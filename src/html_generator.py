@@ -3,16 +3,138 @@ Módulo Generador de HTML - Dashboard Inventario Lomarosa
 Genera dashboard HTML completo con análisis de ventas históricas
 """
 
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+import plotly.io as pio
+
 import config
 
+try:
+    import orjson
+    ORJSON_DISPONIBLE = True
+except ImportError:
+    ORJSON_DISPONIBLE = False
+
+
+def figure_json(fig):
+    """
+    Serializa data y layout de una figura a JSON
+
+    Con orjson se codifica el dict público de la figura (to_plotly_json); si
+    orjson no está instalado o la figura tiene un tipo que no soporta, se usa
+    el serializador de plotly.
+    """
+    if ORJSON_DISPONIBLE:
+        try:
+            return orjson.dumps(
+                fig.to_plotly_json(),
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ).decode('utf-8')
+        except TypeError:
+            pass
+    return pio.to_json(fig, validate=False)
+
+
+def figure_div(fig, div_id, diferido=True):
+    """
+    div de una figura con su JSON
+
+    Args:
+        diferido: True deja el JSON sin parsear en un <script type="application/json">
+            y lo dibuja PLOTLY_DIFERIDO_JS al entrar en pantalla; False llama a
+            Plotly.newPlot al cargar (equivale a to_html sin plotly.js)
+    """
+    # Un '</script>' dentro de un texto de la figura no debe cerrar el bloque
+    figura = figure_json(fig).replace('</', '<\\/')
+    if diferido:
+        # Reserva la altura de la figura para que las secciones no se muevan al dibujarla
+        alto = f" min-height:{fig.layout.height}px;" if fig.layout.height else ""
+        return f"""<div id="{div_id}" class="plotly-graph-div plotly-diferido" style="height:100%; width:100%;{alto}"></div>
+        <script type="application/json" id="{div_id}-figura">{figura}</script>"""
+    return f"""<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+        <script type="text/javascript">
+            (function() {{
+                const figura = {figura};
+                Plotly.newPlot("{div_id}", figura.data, figura.layout, {{"responsive": true}});
+            }})();
+        </script>"""
+
+
+# Dibuja cada figura diferida cuando se acerca a la pantalla (IntersectionObserver);
+# recién ahí se parsea su JSON. Sin IntersectionObserver se dibujan todas al cargar.
+PLOTLY_DIFERIDO_JS = """
+        <script type="text/javascript">
+        (function() {
+            function dibujar(div) {
+                const datos = document.getElementById(div.id + '-figura');
+                if (!datos || div.dataset.dibujado) return;
+                div.dataset.dibujado = '1';
+                const figura = JSON.parse(datos.textContent);
+                Plotly.newPlot(div, figura.data, figura.layout, {responsive: true});
+            }
+
+            function iniciar() {
+                const divs = document.querySelectorAll('.plotly-diferido');
+                if (!('IntersectionObserver' in window)) {
+                    divs.forEach(dibujar);
+                    return;
+                }
+                const observador = new IntersectionObserver(function(entradas) {
+                    entradas.forEach(function(entrada) {
+                        if (entrada.isIntersecting) {
+                            observador.unobserve(entrada.target);
+                            dibujar(entrada.target);
+                        }
+                    });
+                }, {rootMargin: '200px 0px'});
+                divs.forEach(function(div) { observador.observe(div); });
+            }
+
+            if (document.readyState === 'loading') {
+                document.addEventListener('DOMContentLoaded', iniciar);
+            } else {
+                iniciar();
+            }
+        })();
+        </script>"""
+
+
+@functools.lru_cache(maxsize=None)
+def _leer_bundle(path):
+    if path:
+        return Path(path).read_text(encoding='utf-8')
+    from plotly.offline import get_plotlyjs
+    return get_plotlyjs()
+
+
+def plotly_script(modo=None):
+    """
+    Etiqueta <script> de plotly.js para el <head>
+
+    Args:
+        modo: 'cdn' o 'inline' (por defecto config.PLOTLY_JS). En 'inline' el
+            bundle (config.PLOTLY_JS_PATH o el del paquete plotly) se incrusta
+            completo para que el dashboard funcione sin conexión
+    """
+    modo = modo or config.PLOTLY_JS
+    if modo == 'inline':
+        return f'<script type="text/javascript">{_leer_bundle(config.PLOTLY_JS_PATH)}</script>'
+    return f'<script src="{config.PLOTLY_CDN_URL}"></script>'
+
 
 class HTMLGenerator:
     """Clase para generar el dashboard HTML"""
     
-    def __init__(self, visualizations, stats):
+    def __init__(self, visualizations, stats, titulo=None, plotly_js=None):
         self.viz = visualizations
         self.stats = stats
+        self.titulo = titulo or config.DASHBOARD_TITLE
+        self.plotly_js = plotly_js or config.PLOTLY_JS
     
 # En el método generate_html() de html_generator.py, agregar después de crear las visualizaciones:
 
@@ -29,7 +151,7 @@ class HTMLGenerator:
         # NUEVA LÍNEA: Generar análisis por ubicación
         try:
             ubicacion_fig, ubicacion_resumen_html = self.viz.create_analisis_por_ubicacion()
-            ubicacion_html = ubicacion_fig.to_html(include_plotlyjs=False, div_id='ubicacion-analysis')
+            ubicacion_html = figure_div(ubicacion_fig, 'ubicacion-analysis')
         except:
             ubicacion_html = ""
             ubicacion_resumen_html = ""
@@ -41,8 +163,8 @@ class HTMLGenerator:
         tabla_inventario_html = self.viz.create_tabla_inventario_completo()
         
         # Convertir figuras a HTML
-        kpi_html = kpi_fig.to_html(include_plotlyjs=False, div_id='kpi-cards')
-        dashboard_html = dashboard_fig.to_html(include_plotlyjs=False, div_id='dashboard-completo')
+        kpi_html = figure_div(kpi_fig, 'kpi-cards')
+        dashboard_html = figure_div(dashboard_fig, 'dashboard-completo')
         
         # Construir HTML completo (agregar la nueva sección después del dashboard completo)
         html_content = f"""<!DOCTYPE html>
@@ -50,8 +172,7 @@ class HTMLGenerator:
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{config.DASHBOARD_TITLE}</title>
-        <script src="https://cdn.plot.ly/plotly-2.26.0.min.js"></script>
+        <title>{self.titulo}</title>
         <style>
             * {{
                 margin: 0;
@@ -202,7 +323,7 @@ class HTMLGenerator:
         <div class="container">
             <!-- Header -->
             <div class="header">
-                <h1>📊 {config.DASHBOARD_TITLE}</h1>
+                <h1>📊 {self.titulo}</h1>
                 <p class="company-name">{config.COMPANY_NAME}</p>
                 <div class="update-info">🕒 Última actualización: {self.stats['fecha_actualizacion']}</div>
             </div>
@@ -269,6 +390,11 @@ class HTMLGenerator:
                 </p>
             </div>
         </div>
+        
+        <!-- plotly.js al final: el contenido se pinta antes de cargarlo y las
+             figuras se dibujan al entrar en pantalla -->
+        {plotly_script(self.plotly_js)}
+        {PLOTLY_DIFERIDO_JS}
     </body>
     </html>"""
         
@@ -283,5 +409,69 @@ class HTMLGenerator:
             return False
 
 
+
+def _render_planta(processor, output_path, titulo, plotly_js):
+    """
+    Trabajo ejecutado en el proceso hijo: genera el dashboard de una planta
+
+    plotly_js llega como argumento porque con spawn (Windows) el hijo vuelve a
+    importar config y no ve los cambios hechos en el proceso padre (--offline)
+
+    Returns:
+        (ok, segundos)
+    """
+    from visualizations import DashboardVisualizations
+
+    inicio = time.perf_counter()
+    viz = DashboardVisualizations(processor)
+    ok = HTMLGenerator(viz, processor.get_statistics(), titulo=titulo, plotly_js=plotly_js).generate_html(output_path)
+    return ok, time.perf_counter() - inicio
+
+
+def generate_plant_dashboards(plantas, output_dir=None, max_workers=None, plotly_js=None):
+    """
+    Genera un dashboard por planta en paralelo (un proceso por planta)
+
+    Args:
+        plantas: dict Local -> DataProcessor (ver DataProcessor.process_all_plants)
+        output_dir: Carpeta de salida (por defecto config.OUTPUT_DIR / 'plantas')
+        max_workers: Procesos a usar (por defecto uno por planta, hasta os.cpu_count())
+        plotly_js: 'cdn' o 'inline' (por defecto config.PLOTLY_JS del proceso actual)
+
+    Returns:
+        dict Local -> ruta del HTML generado (solo las plantas que se generaron bien)
+    """
+    from data_processor import slug_local
+
+    output_dir = Path(output_dir or Path(config.OUTPUT_DIR) / 'plantas')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if not plantas:
+        return {}
+
+    max_workers = max_workers or min(len(plantas), os.cpu_count() or 1)
+    plotly_js = plotly_js or config.PLOTLY_JS
+    inicio = time.perf_counter()
+    generados = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {}
+        for local, processor in plantas.items():
+            output_path = output_dir / f"{slug_local(local)}.html"
+            titulo = f"{config.DASHBOARD_TITLE} - {local}"
+            futuros[local] = (output_path, executor.submit(_render_planta, processor, output_path, titulo, plotly_js))
+        for local, (output_path, futuro) in futuros.items():
+            try:
+                ok, segundos = futuro.result()
+            except Exception as e:
+                print(f"❌ Error al generar el dashboard de {local}: {str(e)}")
+                continue
+            if ok:
+                generados[local] = output_path
+                print(f"   ⏱️ {local}: {segundos:.2f}s ({output_path.name})")
+
+    print(f"   ⏱️ {len(generados)} dashboards en {time.perf_counter() - inicio:.2f}s")
+    return generados
+
+
 if __name__ == "__main__":
     print("✅ Módulo generador HTML listo")
@@ -0,0 +1,145 @@
+"""
+Módulo de Renderizado de Tablas HTML - Dashboard Inventario Lomarosa
+Las filas se generan por columnas: cada columna se formatea completa de una
+vez (números, badges, colores) y una plantilla precompilada une los campos de
+cada fila. El HTML final se arma con un único ''.join, sin iterrows ni
+concatenaciones repetidas de strings.
+"""
+
+import string
+
+import numpy as np
+import pandas as pd
+
+
+class RowTemplate:
+    """Plantilla de fila con campos {nombre}, compilada una sola vez"""
+
+    def __init__(self, plantilla):
+        """
+        Args:
+            plantilla: Texto con campos {nombre} (las llaves literales van dobladas)
+        """
+        self.campos = []
+        partes = []
+        for literal, campo, formato, conversion in string.Formatter().parse(plantilla):
+            partes.append(literal.replace('{', '{{').replace('}', '}}'))
+            if campo is None:
+                continue
+            if formato or conversion:
+                raise ValueError(f"Campo '{campo}': el formato se aplica a la columna, no en la plantilla")
+            if campo not in self.campos:
+                self.campos.append(campo)
+            partes.append(f"{{{self.campos.index(campo)}}}")
+        self._formato = ''.join(partes).format
+
+    def render(self, **columnas):
+        """
+        Genera el HTML de todas las filas
+
+        Args:
+            **columnas: Una secuencia de textos por campo (todas del mismo largo)
+                o un texto fijo para todas las filas
+
+        Returns:
+            String con las filas concatenadas
+        """
+        largo = next((len(valores) for valores in columnas.values() if not isinstance(valores, str)), 1)
+        valores = [
+            [columnas[campo]] * largo if isinstance(columnas[campo], str) else _lista(columnas[campo])
+            for campo in self.campos
+        ]
+        return ''.join(map(self._formato, *valores))
+
+
+def _lista(valores):
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return valores.tolist()
+    if isinstance(valores, np.ndarray):
+        return valores.tolist()
+    return list(valores)
+
+
+def numeros(valores, decimales=2):
+    """Formatea una columna numérica con N decimales (igual que f'{x:.Nf}')"""
+    formato = f"{{:.{decimales}f}}".format
+    return list(map(formato, pd.Series(valores, dtype='float64').tolist()))
+
+
+def enteros(valores, nulo=0):
+    """Formatea una columna como enteros (trunca igual que int(x); los nulos valen nulo)"""
+    return list(map(str, pd.Series(valores).fillna(nulo).astype('int64').tolist()))
+
+
+def textos(valores):
+    """Convierte una columna a texto (igual que str(x); los nulos de Int64 quedan como <NA>)"""
+    return list(map(str, pd.Series(valores).astype(object).tolist()))
+
+
+def elegir(condiciones, opciones, por_defecto):
+    """
+    Elige un texto por fila según condiciones vectorizadas (como np.select)
+
+    Args:
+        condiciones: Lista de arrays booleanos, evaluados en orden
+        opciones: Texto fijo o lista de textos por fila para cada condición
+        por_defecto: Texto (o lista de textos) cuando no se cumple ninguna
+    """
+    largo = len(condiciones[0])
+    como_array = lambda valor: np.full(largo, valor, dtype=object) if isinstance(valor, str) else np.asarray(valor, dtype=object)
+    return np.select(
+        [np.asarray(c, dtype=bool) for c in condiciones],
+        [como_array(opcion) for opcion in opciones],
+        como_array(por_defecto)
+    ).tolist()
+
+
+if __name__ == "__main__":
+    import time
+
+    fila = RowTemplate(
+        '<tr style="background-color: {fondo};"><td>{codigo}</td><td>{producto}</td>'
+        '<td style="text-align: right;">{stock}</td><td>{estado}</td></tr>'
+    )
+    rng = np.random.default_rng(0)
+
+    def datos(n):
+        return pd.DataFrame({
+            'Codigo': np.arange(n),
+            'Producto': [f'PRODUCTO {i}' for i in range(n)],
+            'Stock_Actual': rng.random(n) * 500,
+            'Estado': rng.choice(['Bajo Promedio', 'Stock Adecuado'], n),
+        })
+
+    def renderizar(df):
+        return fila.render(
+            fondo=elegir([df['Estado'] == 'Bajo Promedio'], ['#ffe6e6'], '#e6f7e6'),
+            codigo=textos(df['Codigo']),
+            producto=df['Producto'],
+            stock=numeros(df['Stock_Actual']),
+            estado=df['Estado'],
+        )
+
+    # Referencia: iterrows + html += (cuadrática; se mide una vez con 10k filas)
+    df = datos(10_000)
+    inicio = time.perf_counter()
+    html_loop = ''
+    for _, row in df.iterrows():
+        fondo = '#ffe6e6' if row['Estado'] == 'Bajo Promedio' else '#e6f7e6'
+        html_loop += (
+            f'<tr style="background-color: {fondo};"><td>{row["Codigo"]}</td><td>{row["Producto"]}</td>'
+            f'<td style="text-align: right;">{row["Stock_Actual"]:.2f}</td><td>{row["Estado"]}</td></tr>'
+        )
+    segundos_loop = time.perf_counter() - inicio
+    assert renderizar(df) == html_loop
+    print(f"🐢 iterrows: {len(df):,} filas en {segundos_loop * 1000:.1f} ms")
+
+    for n in (1_000, 10_000, 100_000):
+        df = datos(n)
+        inicio = time.perf_counter()
+        renderizar(df)
+        segundos = time.perf_counter() - inicio
+        print(f"📋 {n:>7,} filas: {segundos * 1000:8.1f} ms")
+
+    assert enteros(pd.Series([1.9, np.nan, 3.0])) == ['1', '0', '3']
+    assert enteros(pd.array([2, None], dtype='Int64')) == ['2', '0']
@@ -107,6 +107,8 @@ def main():
     print(f"   • Productos sin stock: {stats['productos_sin_stock']}")
     print(f"   • Stock total: {stats['stock_total_kilos']:.2f} Kg")
     print(f"   • Productos críticos: {stats['productos_criticos']}")
+    memo = processor.memo_info()
+    print(f"   • Resultados reutilizados: {memo['hits']} ({memo['misses']} calculados)")
     print(f"\n📁 Archivo generado: {config.OUTPUT_HTML}")
     print(f"🕒 Fecha de generación: {stats['fecha_actualizacion']}")
     print("\n" + "=" * 70)
@@ -134,7 +136,92 @@ def main():
     return True
 
 
+def rebuild_dashboard(archivos=None):
+    """
+    Regenera el dashboard con el modo de lectura configurado
+    (config.HISTORICAL_MODE): el pipeline solo vuelve a ejecutar los pasos
+    cuyos archivos cambiaron y la caché Parquet evita re-parsear el resto
+    
+    Args:
+        archivos: Archivos que cambiaron (solo informativo)
+    """
+    inicio = datetime.now()
+    if archivos:
+        print(f"\n🔁 Regenerando dashboard por cambios en: {', '.join(archivos)}")
+    
+    processor = DataProcessor(config.EXCEL_PATH)
+    if not processor.process():
+        print("❌ ERROR: No se pudieron procesar los datos.")
+        return False
+    
+    viz = DashboardVisualizations(processor)
+    stats = processor.get_statistics()
+    if not HTMLGenerator(viz, stats).generate_html():
+        return False
+    
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"✅ Dashboard regenerado en {segundos:.1f}s")
+    return True
+
+
+def main_plantas():
+    """Genera un dashboard por planta (Local) a partir de una sola carga de datos"""
+    print_banner()
+    from html_generator import generate_plant_dashboards
+    
+    inicio = datetime.now()
+    processor = DataProcessor(config.EXCEL_PATH, historical_mode='pandas')
+    if not (processor.load_data() and processor.clean_data() and processor.load_historical_data()):
+        print("❌ ERROR: No se pudieron procesar los datos.")
+        return False
+    
+    plantas = processor.process_all_plants(config.LOCALES or None)
+    if not plantas:
+        print("❌ ERROR: No hay plantas con ventas para analizar.")
+        return False
+    
+    print("\nGenerando dashboards por planta...")
+    generados = generate_plant_dashboards(plantas, plotly_js=config.PLOTLY_JS)
+    
+    print("\n" + "=" * 70)
+    for local, output_path in generados.items():
+        print(f"📁 {local}: {output_path}")
+    segundos = (datetime.now() - inicio).total_seconds()
+    print(f"✅ {len(generados)} de {len(plantas)} dashboards generados en {segundos:.1f}s")
+    return len(generados) == len(plantas)
+
+
+def watch():
+    """Monitorea SharePoint y regenera el dashboard una vez por ráfaga de cambios"""
+    print_banner()
+    from sharepoint_loader import SharePointLoader
+    
+    loader = SharePointLoader()
+    
+    def al_detectar_cambios(archivos):
+        if loader.ctx is not None:
+            loader.download_files()
+        rebuild_dashboard(archivos)
+    
+    loader.monitor_changes(
+        al_detectar_cambios,
+        interval=config.WATCH_INTERVAL,
+        debounce=config.WATCH_DEBOUNCE
+    )
+
+
 if __name__ == "__main__":
+    # plotly.js incrustado en el HTML para abrirlo sin conexión
+    if '--offline' in sys.argv:
+        config.PLOTLY_JS = 'inline'
+    
+    if '--watch' in sys.argv:
+        watch()
+        sys.exit(0)
+    
+    if '--plantas' in sys.argv:
+        sys.exit(0 if main_plantas() else 1)
+    
     try:
         success = main()
         if not success:
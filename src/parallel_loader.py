@@ -0,0 +1,104 @@
+"""
+Módulo de Carga Concurrente - Dashboard Inventario Lomarosa
+Parsea el inventario y el consolidado en procesos separados y devuelve los
+DataFrames serializados como Arrow IPC, de modo que el tiempo total sea
+aproximadamente el de la carga más lenta y no la suma de ambas
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import config
+from parquet_cache import ParquetCache, from_arrow_table, read_excel_cached, to_arrow_table
+
+try:
+    import pyarrow as pa
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+
+def _to_ipc(df):
+    """Serializa un DataFrame como stream Arrow IPC"""
+    table = to_arrow_table(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _from_ipc(buffer):
+    """Reconstruye el DataFrame desde un stream Arrow IPC"""
+    with pa.ipc.open_stream(buffer) as reader:
+        return from_arrow_table(reader.read_all())
+
+
+def _leer_hoja(path, sheet_name, skiprows, usar_cache):
+    """
+    Trabajo ejecutado en el proceso hijo
+
+    Returns:
+        (payload, es_ipc, segundos)
+    """
+    inicio = time.perf_counter()
+    cache = ParquetCache() if usar_cache else None
+    df = read_excel_cached(cache, path, sheet_name=sheet_name, skiprows=skiprows)
+    segundos = time.perf_counter() - inicio
+
+    if PYARROW_DISPONIBLE:
+        return _to_ipc(df), True, segundos
+    return df, False, segundos
+
+
+def load_workbooks_parallel(tareas, usar_cache=None):
+    """
+    Carga varias hojas de Excel en paralelo
+
+    Args:
+        tareas: dict nombre -> (ruta, hoja, skiprows)
+        usar_cache: Usar la caché Parquet (por defecto config.USE_CACHE)
+
+    Returns:
+        (frames, tiempos): dict nombre -> DataFrame y dict nombre -> segundos
+    """
+    usar_cache = config.USE_CACHE if usar_cache is None else usar_cache
+    inicio = time.perf_counter()
+    frames = {}
+    tiempos = {}
+
+    if len(tareas) <= 1:
+        # Con una sola hoja no hay nada que solapar: evitar el costo de crear procesos
+        for nombre, (path, sheet_name, skiprows) in tareas.items():
+            inicio_hoja = time.perf_counter()
+            frames[nombre] = read_excel_cached(
+                ParquetCache() if usar_cache else None,
+                path, sheet_name=sheet_name, skiprows=skiprows
+            )
+            tiempos[nombre] = time.perf_counter() - inicio_hoja
+    else:
+        with ProcessPoolExecutor(max_workers=len(tareas)) as executor:
+            futuros = {
+                nombre: executor.submit(_leer_hoja, path, sheet_name, skiprows, usar_cache)
+                for nombre, (path, sheet_name, skiprows) in tareas.items()
+            }
+            for nombre, futuro in futuros.items():
+                payload, es_ipc, segundos = futuro.result()
+                frames[nombre] = _from_ipc(payload) if es_ipc else payload
+                tiempos[nombre] = segundos
+
+    total = time.perf_counter() - inicio
+    suma = sum(tiempos.values())
+    for nombre, segundos in tiempos.items():
+        print(f"   ⏱️ {nombre}: {segundos:.2f}s ({Path(tareas[nombre][0]).name})")
+    print(f"   ⏱️ Tiempo total en paralelo: {total:.2f}s (secuencial habría sido ~{suma:.2f}s)")
+    return frames, tiempos
+
+
+if __name__ == "__main__":
+    frames, tiempos = load_workbooks_parallel({
+        'inventario': (config.EXCEL_PATH, config.SHEET_NAME, config.SKIPROWS_INVENTARIO),
+        'consolidado': (config.CONSOLIDADO_PATH, config.CONSOLIDADO_SHEET, config.SKIPROWS_CONSOLIDADO),
+    }, usar_cache=False)
+    for nombre, df in frames.items():
+        print(f"✅ {nombre}: {len(df)} filas")
@@ -0,0 +1,319 @@
+"""
+Módulo de Caché Columnar - Dashboard Inventario Lomarosa
+Guarda los DataFrames leídos desde Excel como Parquet en data/processed/
+para no volver a parsear un libro que no ha cambiado
+"""
+
+import base64
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config
+from excel_reader import read_excel, select_engine
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+
+# Cambiar este número invalida todas las entradas existentes
+CACHE_VERSION = 2
+
+# Clave de los metadatos del esquema Arrow con lo necesario para reconstruir
+# exactamente el DataFrame original (nombres de columna y columnas mezcladas)
+METADATA_KEY = b'lomarosa'
+
+
+def file_fingerprint(path, with_hash=True):
+    """
+    Calcula la huella de un archivo: tamaño, mtime y (opcional) SHA-256
+
+    Args:
+        path: Ruta del archivo
+        with_hash: Si es True también calcula el hash del contenido
+    """
+    stat = os.stat(path)
+    fingerprint = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    if with_hash:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        fingerprint['sha256'] = sha.hexdigest()
+    return fingerprint
+
+
+class ParquetCache:
+    """Caché en disco de hojas de Excel ya parseadas"""
+
+    def __init__(self, cache_dir=None):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Carpeta donde se guardan los Parquet (por defecto config.PROCESSED_DIR)
+        """
+        self.cache_dir = Path(cache_dir or config.PROCESSED_DIR)
+        self.enabled = PYARROW_DISPONIBLE
+
+        if not self.enabled:
+            print("⚠️ pyarrow no está instalado. Caché Parquet desactivada.")
+
+    def _entry_name(self, path, sheet_name, skiprows, engine=None):
+        """
+        Nombre base de la entrada para un archivo/hoja/skiprows/motor
+
+        El motor forma parte de la clave porque calamine y openpyxl no
+        siempre devuelven los mismos tipos para una misma celda.
+        """
+        key = f"{Path(path).resolve()}|{sheet_name}|{skiprows}|{select_engine(engine)}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        return f"{Path(path).stem}_{digest}"
+
+    def _paths(self, path, sheet_name, skiprows, engine=None):
+        name = self._entry_name(path, sheet_name, skiprows, engine)
+        return self.cache_dir / f"{name}.parquet", self.cache_dir / f"{name}.json"
+
+    def _read_manifest(self, manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, path, sheet_name, skiprows=0, engine=None):
+        """
+        Devuelve el DataFrame cacheado si el archivo no ha cambiado, si no None
+
+        Primero compara tamaño y mtime (barato). Si difieren, compara el
+        hash del contenido: un archivo re-sincronizado por OneDrive con el
+        mismo contenido sigue siendo un acierto.
+        """
+        if not self.enabled:
+            return None
+
+        parquet_path, manifest_path = self._paths(path, sheet_name, skiprows, engine)
+        manifest = self._read_manifest(manifest_path)
+        if manifest is None or not parquet_path.exists():
+            return None
+        if manifest.get('version') != CACHE_VERSION:
+            return None
+
+        current = file_fingerprint(path, with_hash=False)
+        if current['size'] != manifest['size']:
+            return None
+
+        if current['mtime_ns'] != manifest['mtime_ns']:
+            current = file_fingerprint(path, with_hash=True)
+            if current['sha256'] != manifest['sha256']:
+                return None
+            # Mismo contenido con otra fecha: actualizar el manifiesto
+            manifest['mtime_ns'] = current['mtime_ns']
+            self._write_manifest(manifest_path, manifest)
+
+        try:
+            return from_arrow_table(pq.read_table(parquet_path))
+        except Exception as e:
+            print(f"⚠️ Caché corrupta para {Path(path).name}, se ignorará: {str(e)}")
+            return None
+
+    def put(self, path, sheet_name, skiprows, df, fingerprint=None, engine=None):
+        """
+        Guarda el DataFrame y la huella del archivo de origen
+
+        Args:
+            fingerprint: Huella tomada antes de leer el archivo. Si se omite se
+                calcula ahora (puede no coincidir si el archivo cambió mientras
+                se leía)
+        """
+        if not self.enabled:
+            return False
+
+        parquet_path, manifest_path = self._paths(path, sheet_name, skiprows, engine)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            table = to_arrow_table(df)
+
+            # Escribir a un temporal y renombrar para no dejar archivos a medias
+            tmp_path = parquet_path.with_suffix('.parquet.tmp')
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, parquet_path)
+
+            manifest = dict(fingerprint or file_fingerprint(path, with_hash=True))
+            manifest.update({
+                'version': CACHE_VERSION,
+                'source': str(path),
+                'sheet_name': sheet_name,
+                'skiprows': skiprows,
+                'engine': select_engine(engine),
+                'rows': len(df),
+            })
+            self._write_manifest(manifest_path, manifest)
+            return True
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la caché de {Path(path).name}: {str(e)}")
+            return False
+
+    def get_remote_manifest(self, name):
+        """
+        Devuelve el manifiesto (ETag / Last-Modified) de un archivo remoto
+        cacheado con put_remote, o None si no hay una copia utilizable
+        """
+        if not self.enabled:
+            return None
+        parquet_path = self.cache_dir / f"{name}.parquet"
+        manifest = self._read_manifest(self.cache_dir / f"{name}.json")
+        if manifest is None or manifest.get('version') != CACHE_VERSION or not parquet_path.exists():
+            return None
+        return manifest
+
+    def get_remote(self, name):
+        """Devuelve el DataFrame cacheado de un archivo remoto (sin validar)"""
+        if self.get_remote_manifest(name) is None:
+            return None
+        try:
+            return from_arrow_table(pq.read_table(self.cache_dir / f"{name}.parquet"))
+        except Exception as e:
+            print(f"⚠️ Caché corrupta para {name}, se ignorará: {str(e)}")
+            return None
+
+    def put_remote(self, name, df, metadata):
+        """
+        Guarda el DataFrame de un archivo remoto junto con sus validadores HTTP
+
+        Args:
+            name: Nombre de la entrada (p. ej. 'sharepoint_inventario')
+            df: DataFrame parseado
+            metadata: dict con 'etag', 'last_modified' y demás datos de la descarga
+        """
+        if not self.enabled:
+            return False
+
+        parquet_path = self.cache_dir / f"{name}.parquet"
+        manifest_path = self.cache_dir / f"{name}.json"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            table = to_arrow_table(df)
+            tmp_path = parquet_path.with_suffix('.parquet.tmp')
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, parquet_path)
+
+            manifest = dict(metadata)
+            manifest.update({'version': CACHE_VERSION, 'rows': len(df)})
+            self._write_manifest(manifest_path, manifest)
+            return True
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la caché de {name}: {str(e)}")
+            return False
+
+    def invalidate(self, path, sheet_name, skiprows=0, engine=None):
+        """Elimina la entrada de caché de un archivo/hoja"""
+        for entry in self._paths(path, sheet_name, skiprows, engine):
+            if entry.exists():
+                entry.unlink()
+
+    def _write_manifest(self, manifest_path, manifest):
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+
+def to_arrow_table(df):
+    """
+    Convierte un DataFrame a tabla Arrow sin perder información
+
+    Las columnas object con tipos mezclados que Arrow no puede representar
+    (p. ej. códigos con números y letras) se guardan serializadas valor por
+    valor, y los nombres de columna originales (que pueden no ser texto) van
+    en los metadatos del esquema. from_arrow_table deshace ambas cosas, de
+    modo que un acierto de caché es idéntico a parsear el Excel de nuevo.
+    """
+    df = df.copy(deep=False)
+    columnas = list(df.columns)
+    df.columns = [str(col) for col in columnas]
+    mixtas = []
+    nulos_nan = []
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = [pickle.dumps(valor) for valor in df[col].tolist()]
+            mixtas.append(col)
+            continue
+        # Arrow devuelve None para todo nulo; recordar si el original era NaN
+        nulos = df[col][df[col].isna()]
+        if len(nulos) and all(valor is not None for valor in nulos.tolist()):
+            nulos_nan.append(col)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({
+        'mixtas': mixtas,
+        'nulos_nan': nulos_nan,
+        'columnas': base64.b64encode(pickle.dumps(columnas)).decode('ascii'),
+    }).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+
+def from_arrow_table(table):
+    """Reconstruye el DataFrame guardado con to_arrow_table"""
+    df = table.to_pandas()
+    metadata = (table.schema.metadata or {}).get(METADATA_KEY)
+    if metadata is None:
+        return df
+
+    metadata = json.loads(metadata)
+    for col in metadata['mixtas']:
+        df[col] = pd.Series([pickle.loads(valor) for valor in df[col].tolist()], index=df.index, dtype=object)
+    for col in metadata['nulos_nan']:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    df.columns = pickle.loads(base64.b64decode(metadata['columnas']))
+    return df
+
+
+def read_excel_cached(cache, path, sheet_name, skiprows=0, engine=None):
+    """
+    Lee una hoja de Excel usando la caché si está disponible
+
+    Args:
+        cache: Instancia de ParquetCache o None para leer siempre el Excel
+        path: Ruta del libro
+        sheet_name: Nombre de la hoja
+        skiprows: Filas a saltar antes del encabezado
+        engine: Motor de Excel (None elige automáticamente)
+    """
+    fingerprint = None
+    if cache is not None and cache.enabled:
+        df = cache.get(path, sheet_name, skiprows, engine)
+        if df is not None:
+            print(f"⚡ {Path(path).name} [{sheet_name}] cargado desde caché Parquet")
+            return df
+        fingerprint = file_fingerprint(path, with_hash=True)
+
+    df = read_excel(path, sheet_name=sheet_name, skiprows=skiprows, engine=engine)
+
+    if fingerprint is not None:
+        cache.put(path, sheet_name, skiprows, df, fingerprint, engine)
+
+    return df
+
+
+if __name__ == "__main__":
+    cache = ParquetCache()
+    print(f"📁 Carpeta de caché: {cache.cache_dir}")
+    print(f"✅ Caché {'activa' if cache.enabled else 'desactivada'}")
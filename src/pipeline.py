@@ -0,0 +1,199 @@
+"""
+Módulo de Pipeline - Dashboard Inventario Lomarosa
+Pasos declarados como un grafo (DAG): cada paso guarda su salida bajo un
+hash de sus entradas (archivos de origen, valores de config relevantes, el
+código fuente del paso y las claves de los pasos de los que depende). Si el
+hash no cambió, el paso se omite y se reutiliza la salida guardada.
+
+Un paso omitido no ejecuta su función: cualquier estado que la función deje
+como efecto secundario (fuera de su salida) debe reponerse con restaurar.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+import config
+from parquet_cache import file_fingerprint
+
+
+# Cambiar este número invalida todas las salidas guardadas
+PIPELINE_VERSION = 1
+
+
+def huella_codigo(objetos):
+    """
+    Hash del código fuente de funciones, clases o módulos
+
+    Returns:
+        sha256 en hexadecimal, o None si alguno no tiene fuente disponible
+    """
+    sha = hashlib.sha256()
+    for objeto in objetos:
+        try:
+            sha.update(inspect.getsource(objeto).encode('utf-8'))
+        except (OSError, TypeError):
+            return None
+    return sha.hexdigest()
+
+
+class Step:
+    """Paso del pipeline"""
+
+    def __init__(self, nombre, funcion, dependencias=(), config=None, archivos=(), version=1,
+                 codigo=(), restaurar=None):
+        """
+        Args:
+            nombre: Nombre único del paso
+            funcion: Recibe las salidas de las dependencias (en orden) y devuelve
+                la salida del paso, o None si falló
+            dependencias: Nombres de los pasos cuya salida necesita
+            config: dict con los valores de configuración que afectan al paso
+            archivos: Archivos de origen; su contenido forma parte del hash.
+                None en la lista = origen sin huella (el paso no se guarda)
+            version: Subir al cambiar la lógica del paso de una forma que no
+                se refleje en el código fuente (p. ej. un archivo de reglas)
+            codigo: Funciones, clases o módulos de los que depende el paso; su
+                código fuente (y el de funcion) forma parte del hash
+            restaurar: Función que se llama al reutilizar una salida guardada,
+                con la salida y las de las dependencias, para reponer los
+                efectos secundarios de funcion
+        """
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = tuple(dependencias)
+        self.config = config or {}
+        self.archivos = tuple(archivos)
+        self.version = version
+        self.codigo = tuple(codigo)
+        self.restaurar = restaurar
+
+
+class Pipeline:
+    """Ejecuta pasos en orden topológico reutilizando las salidas guardadas"""
+
+    def __init__(self, pasos, cache_dir=None, usar_cache=True):
+        """
+        Args:
+            pasos: Lista de Step
+            cache_dir: Carpeta de salidas guardadas (por defecto data/processed/pipeline)
+            usar_cache: False ejecuta todos los pasos sin leer ni guardar salidas
+        """
+        self.pasos = {paso.nombre: paso for paso in pasos}
+        self.cache_dir = Path(cache_dir or Path(config.PROCESSED_DIR) / 'pipeline')
+        self.usar_cache = usar_cache
+        self.log = []
+
+    def _clave(self, paso, claves):
+        """Hash de las entradas del paso; None si alguna no tiene huella"""
+        if any(claves.get(dep) is None for dep in paso.dependencias):
+            return None
+
+        archivos = []
+        for archivo in paso.archivos:
+            if archivo is None or not os.path.exists(archivo):
+                return None
+            archivos.append(file_fingerprint(archivo, with_hash=True)['sha256'])
+
+        codigo = huella_codigo((paso.funcion,) + paso.codigo)
+        if codigo is None:
+            return None
+
+        entradas = {
+            'pipeline': PIPELINE_VERSION,
+            'paso': paso.nombre,
+            'version': paso.version,
+            'codigo': codigo,
+            'config': paso.config,
+            'archivos': archivos,
+            'dependencias': [claves[dep] for dep in paso.dependencias],
+        }
+        texto = json.dumps(entradas, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _cargar(self, paso, clave):
+        """Devuelve (salida, segundos_originales) o None si no hay salida guardada"""
+        meta_path = self.cache_dir / f"{paso.nombre}.json"
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('clave') != clave:
+                return None
+            with open(self.cache_dir / f"{paso.nombre}.pkl", 'rb') as f:
+                return pickle.load(f), meta.get('segundos', 0)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def _guardar(self, paso, clave, salida, segundos):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            pkl_path = self.cache_dir / f"{paso.nombre}.pkl"
+            tmp_path = pkl_path.with_suffix('.pkl.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(salida, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pkl_path)
+
+            meta_path = self.cache_dir / f"{paso.nombre}.json"
+            tmp_path = meta_path.with_suffix('.json.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'clave': clave, 'segundos': segundos}, f)
+            os.replace(tmp_path, meta_path)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la salida del paso '{paso.nombre}': {str(e)}")
+
+    def run(self):
+        """
+        Ejecuta el pipeline
+
+        Un paso cuya dependencia falló no se ejecuta.
+
+        Returns:
+            dict nombre -> salida (solo pasos exitosos)
+        """
+        orden = TopologicalSorter({nombre: paso.dependencias for nombre, paso in self.pasos.items()})
+        salidas = {}
+        claves = {}
+        self.log = []
+        inicio_total = time.perf_counter()
+
+        for nombre in orden.static_order():
+            paso = self.pasos[nombre]
+            if any(dep not in salidas for dep in paso.dependencias):
+                self.log.append({'paso': nombre, 'estado': 'bloqueado', 'segundos': 0, 'ahorro': 0})
+                continue
+
+            inicio = time.perf_counter()
+            clave = self._clave(paso, claves) if self.usar_cache else None
+            guardado = self._cargar(paso, clave) if clave else None
+
+            if guardado is not None:
+                salida, segundos_originales = guardado
+                if paso.restaurar is not None:
+                    paso.restaurar(salida, *[salidas[dep] for dep in paso.dependencias])
+                segundos = time.perf_counter() - inicio
+                ahorro = max(segundos_originales - segundos, 0)
+                print(f"⏭️ Paso '{nombre}' sin cambios: se reutiliza (~{ahorro:.2f}s ahorrados)")
+                self.log.append({'paso': nombre, 'estado': 'omitido', 'segundos': segundos, 'ahorro': ahorro})
+            else:
+                salida = paso.funcion(*[salidas[dep] for dep in paso.dependencias])
+                segundos = time.perf_counter() - inicio
+                if salida is None:
+                    self.log.append({'paso': nombre, 'estado': 'fallido', 'segundos': segundos, 'ahorro': 0})
+                    continue
+                if clave:
+                    self._guardar(paso, clave, salida, segundos)
+                self.log.append({'paso': nombre, 'estado': 'ejecutado', 'segundos': segundos, 'ahorro': 0})
+
+            salidas[nombre] = salida
+            claves[nombre] = clave
+
+        omitidos = [registro for registro in self.log if registro['estado'] == 'omitido']
+        ahorro = sum(registro['ahorro'] for registro in omitidos)
+        print(f"⏱️ Pipeline: {time.perf_counter() - inicio_total:.2f}s, "
+              f"{len(omitidos)} de {len(self.pasos)} pasos omitidos (~{ahorro:.2f}s ahorrados)")
+        return salidas
@@ -0,0 +1,138 @@
+"""
+Módulo de Dimensión de Productos - Dashboard Inventario Lomarosa
+Tabla persistente Codigo -> Producto, Macropieza y categoría guardada en
+data/processed/. Solo se recalculan los atributos de los códigos nuevos (o
+cuyo nombre o reglas cambiaron); la Macropieza ya conocida se conserva
+aunque sus ventas salgan del consolidado.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from categorizer import ProductCategorizer
+from parquet_cache import PYARROW_DISPONIBLE
+
+
+COLUMNAS = ['Producto', 'Macropieza', 'categoria_producto', 'version_reglas', 'fecha_alta']
+
+
+class ProductDimension:
+    """Dimensión de productos indexada por código entero"""
+
+    def __init__(self, path=None, categorizador=None):
+        """
+        Args:
+            path: Archivo Parquet de la tabla (por defecto data/processed/productos.parquet)
+            categorizador: ProductCategorizer para los productos nuevos
+        """
+        self.path = Path(path or Path(config.PROCESSED_DIR) / 'productos.parquet')
+        self.categorizador = categorizador or ProductCategorizer()
+        self.persistente = PYARROW_DISPONIBLE
+        self.tabla = self._load()
+
+    def _vacia(self):
+        return pd.DataFrame(columns=COLUMNAS, index=pd.Index([], dtype='Int64', name='Codigo'), dtype=object)
+
+    def _load(self):
+        if not self.persistente or not self.path.exists():
+            return self._vacia()
+        try:
+            tabla = pd.read_parquet(self.path)
+            tabla.index = tabla.index.astype('Int64')
+            return tabla[COLUMNAS].astype(object)
+        except Exception as e:
+            print(f"⚠️ No se pudo leer la dimensión de productos, se reconstruirá: {str(e)}")
+            return self._vacia()
+
+    def save(self):
+        """Guarda la tabla (escribe a un temporal y renombra)"""
+        if not self.persistente:
+            return False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.parquet.tmp')
+            self.tabla.to_parquet(tmp_path)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la dimensión de productos: {str(e)}")
+            return False
+
+    def update(self, codigos, productos=None, macropiezas=None):
+        """
+        Incorpora códigos nuevos y completa atributos faltantes
+
+        Args:
+            codigos: Serie de códigos (Int64)
+            productos: Serie de nombres alineada con codigos (opcional)
+            macropiezas: dict {código: Macropieza} calculado desde las ventas (opcional)
+
+        Returns:
+            Número de códigos agregados o modificados
+        """
+        codigos = pd.Series(codigos).astype('Int64').reset_index(drop=True)
+        nombres = None
+        if productos is not None:
+            nombres = pd.Series(pd.Series(productos).to_numpy(), index=pd.Index(codigos, name='Codigo'))
+            nombres = nombres[nombres.index.notna()]
+            nombres = nombres[~nombres.index.duplicated(keep='last')]
+
+        tabla = self.tabla
+        cambiados = set()
+
+        # Códigos nuevos
+        nuevos = pd.Index(codigos.dropna().unique(), dtype='Int64').difference(tabla.index)
+        if len(nuevos):
+            filas = pd.DataFrame(index=pd.Index(nuevos, name='Codigo'), columns=COLUMNAS, dtype=object)
+            filas['fecha_alta'] = date.today().isoformat()
+            tabla = pd.concat([tabla, filas]) if len(tabla) else filas
+            cambiados.update(nuevos)
+
+        # Nombres nuevos o distintos a los guardados
+        if nombres is not None:
+            actuales = tabla.loc[nombres.index, 'Producto']
+            distintos = nombres.index[(actuales.to_numpy() != nombres.to_numpy()) & nombres.notna().to_numpy()]
+            tabla.loc[distintos, 'Producto'] = nombres.loc[distintos].to_numpy()
+            tabla.loc[distintos, 'version_reglas'] = None
+            cambiados.update(distintos)
+
+        # Categorías pendientes (códigos nuevos, renombrados o reglas distintas)
+        pendientes = tabla.index[(tabla['version_reglas'] != self.categorizador.version) & tabla['Producto'].notna()]
+        if len(pendientes):
+            tabla.loc[pendientes, 'categoria_producto'] = self.categorizador.categorize(
+                tabla.loc[pendientes, 'Producto']
+            ).to_numpy()
+            tabla.loc[pendientes, 'version_reglas'] = self.categorizador.version
+            cambiados.update(pendientes)
+
+        # Macropiezas: solo se completan las que faltan
+        if macropiezas:
+            sin_macro = tabla.index[tabla['Macropieza'].isna()]
+            conocidas = pd.Series(sin_macro.map(macropiezas), index=sin_macro).dropna()
+            tabla.loc[conocidas.index, 'Macropieza'] = conocidas.to_numpy()
+            cambiados.update(conocidas.index)
+
+        self.tabla = tabla
+        if cambiados:
+            self.save()
+            print(f"🏷️ Dimensión de productos: {len(nuevos)} nuevos, {len(cambiados)} actualizados ({len(tabla)} en total)")
+        return len(cambiados)
+
+    def lookup(self, codigos, columna):
+        """Devuelve el atributo de cada código (NaN si no está en la tabla)"""
+        return pd.Series(codigos).astype('Int64').map(self.tabla[columna])
+
+    def macropiezas(self, codigos=None, default='Sin clasificar'):
+        """Lista ordenada de Macropiezas (opcionalmente solo de los códigos dados)"""
+        valores = self.tabla['Macropieza'] if codigos is None else self.lookup(codigos, 'Macropieza')
+        return sorted(valores.fillna(default).unique())
+
+
+if __name__ == "__main__":
+    dimension = ProductDimension()
+    print(f"🏷️ {len(dimension.tabla)} productos en {dimension.path}")
+    print(dimension.tabla.head(20).to_string())
@@ -0,0 +1,255 @@
+"""
+Módulo de Cubo Semanal de Ventas - Dashboard Inventario Lomarosa
+Matriz densa código x semana ISO (lunes a domingo) con los kilos vendidos.
+Se materializa una vez y se actualiza de forma incremental; los promedios y
+desviaciones de cualquier ventana (4, 8, 13, 52 semanas...) salen de un
+corte de las últimas columnas de la matriz.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Cambiar este número obliga a reconstruir el cubo guardado
+CUBE_VERSION = 1
+
+
+def inicio_semana(fechas):
+    """Lunes (datetime64[D]) de la semana ISO de cada fecha"""
+    dias = np.asarray(fechas, dtype='datetime64[D]')
+    # El 1970-01-01 fue jueves: (días + 3) % 7 es 0 los lunes
+    return dias - (dias.astype('int64') + 3) % 7
+
+
+class WeeklySalesCube:
+    """Kilos vendidos por código (filas) y semana (columnas)"""
+
+    def __init__(self):
+        self.codigos = np.empty(0, dtype='int64')
+        self.inicio = None
+        self.matriz = np.zeros((0, 0))
+        self.fecha_max = None
+
+    @property
+    def num_semanas(self):
+        return self.matriz.shape[1]
+
+    @property
+    def semanas(self):
+        """Lunes de cada columna de la matriz"""
+        if self.inicio is None:
+            return pd.DatetimeIndex([])
+        return pd.DatetimeIndex(self.inicio + np.arange(self.num_semanas) * np.timedelta64(7, 'D'))
+
+    def _ampliar(self, codigos, lunes):
+        """Agrega filas para códigos nuevos y columnas para semanas fuera del rango"""
+        nuevos = np.setdiff1d(codigos, self.codigos)
+        if len(nuevos):
+            todos = np.union1d(self.codigos, nuevos)
+            matriz = np.zeros((len(todos), self.num_semanas))
+            matriz[np.searchsorted(todos, self.codigos)] = self.matriz
+            self.codigos, self.matriz = todos, matriz
+
+        primera, ultima = lunes.min(), lunes.max()
+        if self.inicio is None:
+            self.inicio = primera
+            self.matriz = np.zeros((len(self.codigos), 0))
+        antes = max(int((self.inicio - primera).astype('int64')) // 7, 0)
+        fin = self.inicio + self.num_semanas * np.timedelta64(7, 'D')
+        despues = max(int((ultima - fin).astype('int64')) // 7 + 1, 0)
+        if antes or despues:
+            self.matriz = np.pad(self.matriz, ((0, 0), (antes, despues)))
+            self.inicio = self.inicio - antes * np.timedelta64(7, 'D')
+
+    def add_sales(self, codigos, fechas, kg):
+        """
+        Acumula ventas en el cubo (vectorizado)
+
+        Args:
+            codigos: Códigos enteros (los nulos se descartan)
+            fechas: Fechas de venta (las nulas se descartan)
+            kg: Kilos vendidos (los nulos cuentan como 0)
+
+        Returns:
+            Número de filas acumuladas
+        """
+        codigos = pd.Series(codigos).astype('Int64').reset_index(drop=True)
+        fechas = pd.to_datetime(pd.Series(fechas).reset_index(drop=True), errors='coerce')
+        kg = pd.to_numeric(pd.Series(kg).reset_index(drop=True), errors='coerce')
+
+        validas = (codigos.notna() & fechas.notna()).to_numpy()
+        if not validas.any():
+            return 0
+
+        codigos = codigos[validas].to_numpy(dtype='int64')
+        fechas = fechas[validas]
+        lunes = inicio_semana(fechas.to_numpy())
+        kilos = kg[validas].fillna(0).to_numpy(dtype=float)
+
+        self._ampliar(np.unique(codigos), lunes)
+        filas = np.searchsorted(self.codigos, codigos)
+        columnas = ((lunes - self.inicio).astype('int64') // 7)
+        plano = np.bincount(filas * self.num_semanas + columnas, weights=kilos, minlength=self.matriz.size)
+        self.matriz += plano.reshape(self.matriz.shape)
+
+        fecha_max = fechas.max()
+        if self.fecha_max is None or fecha_max > self.fecha_max:
+            self.fecha_max = fecha_max
+        return int(validas.sum())
+
+    def semanas_completas(self):
+        """
+        Matriz sin la semana en curso: si la última venta no fue domingo, la
+        última columna es una semana parcial que subestima las ventas
+        """
+        if self.fecha_max is not None and self.fecha_max.weekday() != 6 and self.num_semanas > 1:
+            return self.matriz[:, :-1]
+        return self.matriz
+
+    def window_stats(self, ventanas=None):
+        """
+        Promedio y desviación estándar semanal de las últimas N semanas
+
+        La ventana termina en la última semana completa (ver
+        semanas_completas); si el histórico tiene menos semanas que la
+        ventana se usan las disponibles.
+
+        Returns:
+            DataFrame con Cod y columnas Promedio_{N}s / Desv_{N}s por ventana
+        """
+        ventanas = ventanas or config.VENTANAS_SEMANALES
+        resultado = pd.DataFrame({'Cod': pd.array(self.codigos, dtype='Int64')})
+        matriz = self.semanas_completas()
+        for ventana in ventanas:
+            n = min(int(ventana), matriz.shape[1])
+            bloque = matriz[:, matriz.shape[1] - n:]
+            if n == 0:
+                promedio = desviacion = np.zeros(len(self.codigos))
+            else:
+                promedio = bloque.mean(axis=1)
+                desviacion = bloque.std(axis=1, ddof=1) if n > 1 else np.zeros(len(self.codigos))
+            resultado[f'Promedio_{ventana}s'] = promedio
+            resultado[f'Desv_{ventana}s'] = desviacion
+        return resultado
+
+    def to_frame(self):
+        """Matriz como DataFrame (índice Cod, columnas = lunes de cada semana)"""
+        return pd.DataFrame(self.matriz, index=pd.Index(self.codigos, name='Cod'), columns=self.semanas)
+
+    def save(self, path, control=None):
+        """Guarda el cubo en un .npz (escribe a un temporal y renombra)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'version': CUBE_VERSION,
+            'inicio': str(self.inicio) if self.inicio is not None else None,
+            'fecha_max': self.fecha_max.isoformat() if self.fecha_max is not None else None,
+            'control': control,
+        }
+        tmp_path = path.with_suffix('.npz.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, codigos=self.codigos, matriz=self.matriz, meta=np.array(json.dumps(meta)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga un cubo guardado
+
+        Returns:
+            (cubo, control) o (None, None) si no existe o es de otra versión
+        """
+        try:
+            with np.load(path) as datos:
+                meta = json.loads(str(datos['meta']))
+                if meta.get('version') != CUBE_VERSION:
+                    return None, None
+                cubo = cls()
+                cubo.codigos = datos['codigos']
+                cubo.matriz = datos['matriz']
+        except (OSError, ValueError, KeyError):
+            return None, None
+        if meta['inicio']:
+            cubo.inicio = np.datetime64(meta['inicio'], 'D')
+        if meta['fecha_max']:
+            cubo.fecha_max = pd.Timestamp(meta['fecha_max'])
+        return cubo, meta.get('control')
+
+
+def _huella_filas(codigos, fechas, kg):
+    """Suma de hashes por fila: no depende del orden de las filas"""
+    filas = pd.DataFrame({'cod': codigos, 'fecha': fechas, 'kg': kg}).reset_index(drop=True)
+    return str(int(pd.util.hash_pandas_object(filas, index=False).sum()))
+
+
+def update_cube(codigos, fechas, kg, clave='', path=None):
+    """
+    Actualiza el cubo guardado con las ventas posteriores a su última fecha
+
+    Si las filas hasta esa fecha ya no coinciden con las acumuladas (edición,
+    borrado o filas nuevas con fecha antigua) o cambió la clave (p. ej. los
+    filtros de Doc/Local), el cubo se reconstruye desde cero.
+
+    Args:
+        codigos, fechas, kg: Ventas ya filtradas (Series alineadas)
+        clave: Identificador de los filtros aplicados
+        path: Archivo del cubo (por defecto data/processed/ventas_semanales.npz)
+
+    Returns:
+        (cubo, filas_nuevas, reconstruido)
+    """
+    path = Path(path or Path(config.PROCESSED_DIR) / 'ventas_semanales.npz')
+    codigos = pd.Series(codigos).astype('Int64').reset_index(drop=True)
+    fechas = pd.to_datetime(pd.Series(fechas).reset_index(drop=True), errors='coerce')
+    kg = pd.to_numeric(pd.Series(kg).reset_index(drop=True), errors='coerce')
+
+    cubo, control = WeeklySalesCube.load(path)
+    if cubo is not None and control and control.get('clave') == clave and cubo.fecha_max is not None:
+        previas = (fechas <= cubo.fecha_max).to_numpy()
+        if _huella_filas(codigos[previas], fechas[previas], kg[previas]) == control.get('huella'):
+            nuevas = ~previas
+            filas_nuevas = cubo.add_sales(codigos[nuevas], fechas[nuevas], kg[nuevas])
+            if filas_nuevas:
+                previas = (fechas <= cubo.fecha_max).to_numpy()
+                cubo.save(path, {'clave': clave, 'huella': _huella_filas(codigos[previas], fechas[previas], kg[previas])})
+            return cubo, filas_nuevas, False
+
+    cubo = WeeklySalesCube()
+    filas = cubo.add_sales(codigos, fechas, kg)
+    previas = (fechas <= cubo.fecha_max).to_numpy() if cubo.fecha_max is not None else fechas.notna().to_numpy()
+    cubo.save(path, {'clave': clave, 'huella': _huella_filas(codigos[previas], fechas[previas], kg[previas])})
+    return cubo, filas, True
+
+
+if __name__ == "__main__":
+    import time
+
+    n_codigos, n_filas = 2000, 1_000_000
+    rng = np.random.default_rng(0)
+    codigos = pd.Series(rng.integers(1, n_codigos + 1, n_filas))
+    fechas = pd.Series(pd.Timestamp('2022-01-03') + pd.to_timedelta(rng.integers(0, 3 * 365, n_filas), unit='D'))
+    kg = pd.Series(rng.random(n_filas) * 50)
+
+    inicio = time.perf_counter()
+    cubo = WeeklySalesCube()
+    cubo.add_sales(codigos, fechas, kg)
+    print(f"🧊 Cubo {cubo.matriz.shape[0]} códigos x {cubo.num_semanas} semanas en {time.perf_counter() - inicio:.3f}s")
+
+    inicio = time.perf_counter()
+    estadisticas = cubo.window_stats((4, 8, 13, 52))
+    print(f"⏱️ Ventanas 4/8/13/52 para {len(estadisticas)} SKUs en {time.perf_counter() - inicio:.4f}s")
+
+    # Referencia con groupby por semana
+    semanal = kg.groupby([codigos, inicio_semana(fechas.to_numpy())]).sum().unstack(fill_value=0)
+    semanal = semanal.reindex(columns=cubo.semanas.values.astype('datetime64[D]'), fill_value=0)
+    assert np.allclose(semanal.to_numpy(), cubo.matriz)
+    completas = semanal.iloc[:, :-1] if fechas.max().weekday() != 6 else semanal
+    assert np.allclose(completas.iloc[:, -13:].mean(axis=1), estadisticas['Promedio_13s'])
+    assert np.allclose(completas.iloc[:, -13:].std(axis=1), estadisticas['Desv_13s'])
+    print("✅ Coincide con groupby por semana")
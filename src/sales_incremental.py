@@ -0,0 +1,159 @@
+"""
+Módulo de Procesamiento Incremental del Consolidado - Dashboard Inventario Lomarosa
+El consolidado solo crece por abajo: se guarda una marca de agua (filas
+procesadas, fecha máxima y hash de las filas) junto con los totales por
+código, y en la siguiente ejecución solo se acumulan las filas nuevas.
+Si alguna fila anterior fue editada se reconstruye todo desde cero.
+
+La hoja se lee con read_excel_cached (calamine + caché Parquet) y el prefijo
+ya procesado se verifica con un hash vectorizado, así que una ejecución sin
+filas nuevas cuesta lo mismo que leer la caché.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from parquet_cache import ParquetCache, read_excel_cached
+from sales_stream import COLUMNAS_VENTAS, SalesAggregator
+
+
+# Cambiar este número obliga a una reconstrucción completa
+STATE_VERSION = 3
+
+
+class IncrementalSalesState:
+    """Estado persistente de la agregación incremental de ventas"""
+
+    def __init__(self, state_path=None):
+        """
+        Args:
+            state_path: Archivo JSON del estado (por defecto en config.PROCESSED_DIR)
+        """
+        self.state_path = Path(state_path or Path(config.PROCESSED_DIR) / 'ventas_incremental.json')
+
+    def load(self):
+        """Devuelve el estado guardado o None si no existe o es ilegible"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') != STATE_VERSION:
+            return None
+        return state
+
+    def save(self, source, aggregator, row_count, huella):
+        """Guarda la marca de agua y los totales acumulados"""
+        state = {
+            'version': STATE_VERSION,
+            'source': str(Path(source).name),
+            'row_count': row_count,
+            'fecha_max': aggregator.fecha_max.isoformat() if aggregator.fecha_max else None,
+            'huella': huella,
+            'agregados': aggregator.to_state(),
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def clear(self):
+        """Borra el estado para forzar una reconstrucción completa"""
+        if self.state_path.exists():
+            self.state_path.unlink()
+
+
+def _leer_ventas(path, sheet_name, header_row, cache):
+    """Hoja del consolidado proyectada a COLUMNAS_VENTAS (mismo orden que iter_sales_rows)"""
+    df = read_excel_cached(cache, path, sheet_name=sheet_name, skiprows=header_row - 1)
+    df.columns = [str(col).strip() for col in df.columns]
+    faltantes = [col for col in COLUMNAS_VENTAS if col not in df.columns]
+    if faltantes:
+        raise KeyError(f"Columnas no encontradas en el consolidado: {faltantes}")
+    return df[list(COLUMNAS_VENTAS)]
+
+
+def _huella(ventas, filas):
+    """Hash de las primeras N filas (depende del orden de las filas)"""
+    hashes = pd.util.hash_pandas_object(ventas.iloc[:filas], index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def _acumular(ventas, aggregator):
+    """Pasa las filas al acumulador con los nulos como None (igual que openpyxl)"""
+    if ventas.empty:
+        return
+    valores = ventas.astype(object)
+    valores = valores.where(ventas.notna(), None)
+    for fila in valores.itertuples(index=False, name=None):
+        aggregator.add(*fila)
+
+
+def update_sales(path=None, sheet_name=None, header_row=1, state=None, cache=None):
+    """
+    Actualiza los totales de ventas procesando solo las filas nuevas
+
+    Args:
+        path: Ruta de consolidado.xlsx (por defecto config.CONSOLIDADO_PATH)
+        sheet_name: Hoja a leer (por defecto config.CONSOLIDADO_SHEET)
+        header_row: Fila (1-based) donde está el encabezado
+        state: IncrementalSalesState a usar; se crea uno por defecto si es None
+        cache: ParquetCache para leer la hoja (por defecto una nueva si config.USE_CACHE)
+
+    Returns:
+        (SalesAggregator, filas_nuevas, reconstruido)
+    """
+    path = path or config.CONSOLIDADO_PATH
+    sheet_name = sheet_name or config.CONSOLIDADO_SHEET
+    state = state or IncrementalSalesState()
+    if cache is None and config.USE_CACHE:
+        cache = ParquetCache()
+    guardado = state.load()
+    ventas = _leer_ventas(path, sheet_name, header_row, cache)
+
+    motivo = None
+    if guardado is None:
+        motivo = "no hay estado previo"
+    elif guardado['source'] != Path(path).name:
+        motivo = "cambió el archivo de origen"
+    elif (guardado['agregados']['doc_tipo'] != config.FILTRO_DOC_TIPO.strip().upper() or
+          guardado['agregados']['local'] != config.FILTRO_LOCAL.strip().upper()):
+        motivo = "cambiaron los filtros"
+
+    if motivo is None:
+        watermark = guardado['row_count']
+        if len(ventas) < watermark:
+            # Se borraron filas: el consolidado no es un simple agregado por abajo
+            motivo = "se eliminaron filas ya procesadas"
+        elif _huella(ventas, watermark) != guardado['huella']:
+            motivo = "se modificaron filas ya procesadas"
+
+    if motivo is None:
+        aggregator = SalesAggregator.from_state(guardado['agregados'])
+        _acumular(ventas.iloc[watermark:], aggregator)
+        if len(ventas) > watermark:
+            state.save(path, aggregator, len(ventas), _huella(ventas, len(ventas)))
+        print(f"⚡ Incremental: {len(ventas) - watermark} filas nuevas (marca de agua en {watermark})")
+        return aggregator, len(ventas) - watermark, False
+
+    print(f"♻️ Reconstrucción completa del histórico: {motivo}")
+    aggregator = SalesAggregator()
+    _acumular(ventas, aggregator)
+    state.save(path, aggregator, len(ventas), _huella(ventas, len(ventas)))
+    return aggregator, len(ventas), True
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    ventas, nuevas, reconstruido = update_sales()
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {nuevas} filas procesadas ({'completo' if reconstruido else 'incremental'}) en {duracion:.2f}s")
+    print(f"📊 {len(ventas.totales)} productos")
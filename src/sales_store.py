@@ -0,0 +1,214 @@
+"""
+Módulo de Almacén Analítico de Ventas - Dashboard Inventario Lomarosa
+Ingiere el consolidado una sola vez en una base SQLite local (indexada por
+Cod, Fecha y Local) y resuelve los promedios y el mapa de Macropiezas con
+consultas SQL que devuelven solo el resultado por SKU
+"""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from excel_reader import read_excel
+from parquet_cache import file_fingerprint
+from sales_stream import COLUMNAS_VENTAS, COL_DOC, COL_LOCAL, COL_MACROPIEZA
+
+
+# Cambiar este número obliga a re-ingerir el consolidado
+STORE_VERSION = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ventas (
+    doc TEXT,
+    local TEXT,
+    fecha TEXT,
+    cod INTEGER,
+    kg REAL,
+    macropieza TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ventas_cod ON ventas (cod);
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+CREATE INDEX IF NOT EXISTS idx_ventas_local_doc ON ventas (local, doc);
+CREATE TABLE IF NOT EXISTS metadata (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+class SalesStore:
+    """Base SQLite con el histórico de ventas normalizado"""
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: Archivo de la base (por defecto data/processed/ventas.sqlite)
+        """
+        self.db_path = Path(db_path or Path(config.PROCESSED_DIR) / 'ventas.sqlite')
+
+    def _connect(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(ESQUEMA)
+        return conn
+
+    def _huella(self, path):
+        huella = file_fingerprint(path, with_hash=True)
+        return f"{STORE_VERSION}|{Path(path).name}|{huella['size']}|{huella['sha256']}"
+
+    def is_current(self, path):
+        """Indica si la base ya contiene la versión actual del consolidado"""
+        if not self.db_path.exists():
+            return False
+        with closing(self._connect()) as conn:
+            fila = conn.execute("SELECT valor FROM metadata WHERE clave = 'huella'").fetchone()
+        return fila is not None and fila[0] == self._huella(path)
+
+    def ingest(self, path=None, sheet_name=None, skiprows=None):
+        """
+        Carga el consolidado en la base si cambió desde la última ingesta
+
+        Returns:
+            True si se re-ingirió, False si la base ya estaba al día
+        """
+        path = path or config.CONSOLIDADO_PATH
+        sheet_name = sheet_name or config.CONSOLIDADO_SHEET
+        skiprows = config.SKIPROWS_CONSOLIDADO if skiprows is None else skiprows
+
+        huella = self._huella(path)
+        if self.is_current(path):
+            return False
+
+        print(f"🗄️ Ingiriendo {Path(path).name} en {self.db_path.name}...")
+        df = read_excel(
+            path,
+            sheet_name=sheet_name,
+            skiprows=skiprows,
+            usecols=lambda col: str(col).strip() in COLUMNAS_VENTAS
+        )
+        df.columns = df.columns.str.strip()
+        faltantes = [col for col in COLUMNAS_VENTAS if col not in df.columns]
+        if faltantes:
+            raise KeyError(f"Columnas no encontradas en el consolidado: {faltantes}")
+
+        fechas = pd.to_datetime(df[config.COL_FECHA], errors='coerce')
+        registros = pd.DataFrame({
+            'doc': df[COL_DOC].astype(str).str.strip().str.upper(),
+            'local': df[COL_LOCAL].astype(str).str.strip().str.upper(),
+            'fecha': fechas.dt.strftime('%Y-%m-%dT%H:%M:%S'),
+            'cod': pd.to_numeric(df[config.COL_COD_HISTORICO], errors='coerce'),
+            'kg': pd.to_numeric(df[config.COL_KG_VENDIDOS], errors='coerce'),
+            'macropieza': df[COL_MACROPIEZA],
+        })
+        # Solo códigos enteros, igual que astype('Int64') en el modo pandas
+        registros.loc[registros['cod'] % 1 != 0, 'cod'] = None
+        registros = registros.astype(object).where(registros.notna(), None)
+        registros['cod'] = [int(cod) if cod is not None else None for cod in registros['cod']]
+
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM ventas")
+                conn.executemany(
+                    "INSERT INTO ventas (doc, local, fecha, cod, kg, macropieza) VALUES (?, ?, ?, ?, ?, ?)",
+                    registros.itertuples(index=False, name=None)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO metadata (clave, valor) VALUES ('huella', ?)",
+                    (huella,)
+                )
+            conn.execute("ANALYZE")
+
+        print(f"✅ {len(registros)} registros ingeridos")
+        return True
+
+    def promedios(self, doc_tipo=None, local=None):
+        """
+        Calcula los promedios semanales por código con SQL
+
+        Returns:
+            (promedios, fecha_min, fecha_max, num_registros) con las mismas
+            columnas que DataProcessor.process_historical_sales
+        """
+        doc_tipo = (doc_tipo or config.FILTRO_DOC_TIPO).strip().upper()
+        local = (local or config.FILTRO_LOCAL).strip().upper()
+
+        with closing(self._connect()) as conn:
+            num_registros = conn.execute(
+                "SELECT COUNT(*) FROM ventas WHERE local = ? AND doc = ?",
+                (local, doc_tipo)
+            ).fetchone()[0]
+            fecha_min, fecha_max = conn.execute(
+                "SELECT MIN(fecha), MAX(fecha) FROM ventas "
+                "WHERE local = ? AND doc = ? AND cod IS NOT NULL",
+                (local, doc_tipo)
+            ).fetchone()
+            promedios = pd.read_sql_query(
+                "SELECT cod AS Cod, TOTAL(kg) AS Total_Vendido, COUNT(kg) AS Num_Ventas "
+                "FROM ventas WHERE local = ? AND doc = ? AND cod IS NOT NULL "
+                "GROUP BY cod ORDER BY cod",
+                conn,
+                params=(local, doc_tipo)
+            )
+
+        if fecha_min is None:
+            return promedios, None, None, num_registros
+
+        fecha_min = datetime.fromisoformat(fecha_min)
+        fecha_max = datetime.fromisoformat(fecha_max)
+        num_semanas = (fecha_max - fecha_min).days / 7
+
+        promedios['Cod'] = promedios['Cod'].astype('Int64')
+        promedios['Total_Vendido'] = promedios['Total_Vendido'].astype(float)
+        promedios['Num_Ventas'] = promedios['Num_Ventas'].astype('int64')
+        promedios['Promedio_Semanal'] = promedios['Total_Vendido'] / num_semanas
+        return promedios, fecha_min, fecha_max, num_registros
+
+    def semanal(self, doc_tipo=None, local=None):
+        """
+        Kilos vendidos por código y semana (lunes de la semana ISO)
+
+        Returns:
+            DataFrame con columnas Cod, Semana, Kg
+        """
+        doc_tipo = (doc_tipo or config.FILTRO_DOC_TIPO).strip().upper()
+        local = (local or config.FILTRO_LOCAL).strip().upper()
+
+        # date(fecha, '-6 days', 'weekday 1') es el lunes de la semana de fecha
+        with closing(self._connect()) as conn:
+            semanal = pd.read_sql_query(
+                "SELECT cod AS Cod, date(fecha, '-6 days', 'weekday 1') AS Semana, TOTAL(kg) AS Kg "
+                "FROM ventas WHERE local = ? AND doc = ? AND cod IS NOT NULL AND fecha IS NOT NULL "
+                "GROUP BY cod, Semana",
+                conn,
+                params=(local, doc_tipo)
+            )
+        semanal['Semana'] = pd.to_datetime(semanal['Semana'])
+        return semanal
+
+    def macropiezas(self):
+        """Devuelve {Cod: primera Macropieza no vacía} sobre todo el histórico"""
+        with closing(self._connect()) as conn:
+            filas = conn.execute(
+                "SELECT cod, macropieza FROM ventas WHERE rowid IN ("
+                "  SELECT MIN(rowid) FROM ventas"
+                "  WHERE cod IS NOT NULL AND macropieza IS NOT NULL GROUP BY cod"
+                ")"
+            ).fetchall()
+        return dict(filas)
+
+
+if __name__ == "__main__":
+    import time
+
+    store = SalesStore()
+    inicio = time.perf_counter()
+    store.ingest()
+    print(f"⏱️ Ingesta: {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    promedios, fecha_min, fecha_max, _ = store.promedios()
+    print(f"⏱️ Agregación SQL: {time.perf_counter() - inicio:.3f}s ({len(promedios)} productos)")
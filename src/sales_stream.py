@@ -0,0 +1,262 @@
+"""
+Módulo de Lectura en Streaming del Consolidado - Dashboard Inventario Lomarosa
+Lee solo las columnas necesarias con openpyxl en modo read-only, aplica los
+filtros de config fila por fila y acumula directamente por código (Cod),
+sin construir el DataFrame completo del histórico
+"""
+
+import math
+from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import config
+from sales_cube import WeeklySalesCube
+
+
+# Columnas del consolidado que usa el análisis de ventas
+COL_DOC = 'Doc'
+COL_LOCAL = 'Local'
+COL_MACROPIEZA = 'Macropieza'
+
+COLUMNAS_VENTAS = (
+    COL_DOC,
+    COL_LOCAL,
+    config.COL_FECHA,
+    config.COL_COD_HISTORICO,
+    config.COL_KG_VENDIDOS,
+    COL_MACROPIEZA,
+)
+
+
+def normalizar_texto(valor):
+    """Equivalente a astype(str).str.strip().str.upper() para un valor suelto"""
+    if valor is None:
+        return 'NAN'
+    return str(valor).strip().upper()
+
+
+def normalizar_codigo(valor):
+    """
+    Convierte un código a entero como pd.to_numeric(errors='coerce').astype('Int64')
+
+    Returns:
+        int o None si el valor no es un código numérico entero
+    """
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(numero) or not numero.is_integer():
+        return None
+    return int(numero)
+
+
+def normalizar_kg(valor):
+    """Convierte los kilos a float; None si no es numérico (NaN en pandas)"""
+    if valor is None or isinstance(valor, bool):
+        return None
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(numero) else numero
+
+
+class SalesAggregator:
+    """Acumula ventas por código con memoria proporcional al número de SKUs"""
+
+    def __init__(self, doc_tipo=None, local=None):
+        """
+        Args:
+            doc_tipo: Tipo de documento a conservar (por defecto config.FILTRO_DOC_TIPO)
+            local: Local a conservar (por defecto config.FILTRO_LOCAL)
+        """
+        self.doc_tipo = (doc_tipo or config.FILTRO_DOC_TIPO).strip().upper()
+        self.local = (local or config.FILTRO_LOCAL).strip().upper()
+
+        # Cod -> [kg_total, num_ventas]
+        self.totales = {}
+        # Cod -> primera Macropieza no vacía (sobre todas las filas, sin filtrar)
+        self.macropiezas = {}
+        # (Cod, ordinal del lunes de la semana) -> kg, para el cubo semanal
+        self.semanal = {}
+        self.fecha_min = None
+        self.fecha_max = None
+        self.filas_leidas = 0
+        self.filas_filtradas = 0
+
+    def add(self, doc, local, fecha, cod, kg, macropieza):
+        """Incorpora una fila del consolidado"""
+        self.filas_leidas += 1
+        codigo = normalizar_codigo(cod)
+
+        if codigo is not None and codigo not in self.macropiezas and macropieza is not None:
+            self.macropiezas[codigo] = macropieza
+
+        if normalizar_texto(doc) != self.doc_tipo or normalizar_texto(local) != self.local:
+            return
+        self.filas_filtradas += 1
+
+        if codigo is None:
+            return
+
+        acumulado = self.totales.get(codigo)
+        if acumulado is None:
+            acumulado = self.totales[codigo] = [0.0, 0]
+
+        kilos = normalizar_kg(kg)
+        if kilos is not None:
+            acumulado[0] += kilos
+            acumulado[1] += 1
+
+        if isinstance(fecha, datetime):
+            if self.fecha_min is None or fecha < self.fecha_min:
+                self.fecha_min = fecha
+            if self.fecha_max is None or fecha > self.fecha_max:
+                self.fecha_max = fecha
+            clave = (codigo, fecha.toordinal() - fecha.weekday())
+            self.semanal[clave] = self.semanal.get(clave, 0.0) + (kilos or 0.0)
+
+    def to_state(self):
+        """Serializa los acumulados a un dict apto para JSON"""
+        return {
+            'doc_tipo': self.doc_tipo,
+            'local': self.local,
+            'totales': {str(cod): valores for cod, valores in self.totales.items()},
+            'macropiezas': {str(cod): str(macro) for cod, macro in self.macropiezas.items()},
+            'semanal': [[cod, lunes, kg] for (cod, lunes), kg in self.semanal.items()],
+            'fecha_min': self.fecha_min.isoformat() if self.fecha_min else None,
+            'fecha_max': self.fecha_max.isoformat() if self.fecha_max else None,
+            'filas_leidas': self.filas_leidas,
+            'filas_filtradas': self.filas_filtradas,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Reconstruye un acumulador guardado con to_state()"""
+        aggregator = cls(state['doc_tipo'], state['local'])
+        aggregator.totales = {int(cod): list(valores) for cod, valores in state['totales'].items()}
+        aggregator.macropiezas = {int(cod): macro for cod, macro in state['macropiezas'].items()}
+        aggregator.semanal = {(int(cod), int(lunes)): kg for cod, lunes, kg in state.get('semanal', [])}
+        if state['fecha_min']:
+            aggregator.fecha_min = datetime.fromisoformat(state['fecha_min'])
+        if state['fecha_max']:
+            aggregator.fecha_max = datetime.fromisoformat(state['fecha_max'])
+        aggregator.filas_leidas = state['filas_leidas']
+        aggregator.filas_filtradas = state['filas_filtradas']
+        return aggregator
+
+    @property
+    def num_semanas(self):
+        """Semanas entre la primera y la última venta filtrada"""
+        if self.fecha_min is None or self.fecha_max is None:
+            return 0
+        return (self.fecha_max - self.fecha_min).days / 7
+
+    def to_cube(self):
+        """Construye el cubo semanal (WeeklySalesCube) con las ventas acumuladas"""
+        cubo = WeeklySalesCube()
+        if self.semanal:
+            claves = np.array(list(self.semanal.keys()), dtype='int64')
+            # Ordinal 1 = 0001-01-01
+            lunes = np.datetime64('0001-01-01', 'D') + (claves[:, 1] - 1)
+            cubo.add_sales(claves[:, 0], lunes, list(self.semanal.values()))
+            cubo.fecha_max = pd.Timestamp(self.fecha_max)
+        return cubo
+
+    def to_promedios(self):
+        """
+        Devuelve los promedios con las mismas columnas que
+        DataProcessor.process_historical_sales: Cod, Total_Vendido,
+        Num_Ventas, Promedio_Semanal
+        """
+        codigos = sorted(self.totales)
+        promedios = pd.DataFrame({
+            'Cod': pd.array(codigos, dtype='Int64'),
+            'Total_Vendido': [self.totales[c][0] for c in codigos],
+            'Num_Ventas': [self.totales[c][1] for c in codigos],
+        })
+        promedios['Total_Vendido'] = promedios['Total_Vendido'].astype(float)
+        promedios['Num_Ventas'] = promedios['Num_Ventas'].astype('int64')
+        promedios['Promedio_Semanal'] = promedios['Total_Vendido'] / self.num_semanas
+        return promedios
+
+
+def _indices_columnas(encabezado, columnas):
+    """Ubica las columnas requeridas en la fila de encabezado"""
+    nombres = [str(valor).strip() if valor is not None else '' for valor in encabezado]
+    faltantes = [col for col in columnas if col not in nombres]
+    if faltantes:
+        raise KeyError(f"Columnas no encontradas en el consolidado: {faltantes}")
+    return [nombres.index(col) for col in columnas]
+
+
+def iter_sales_rows(path, sheet_name=None, header_row=1):
+    """
+    Genera las filas del consolidado proyectadas a COLUMNAS_VENTAS
+
+    Args:
+        path: Ruta de consolidado.xlsx
+        sheet_name: Hoja a leer (por defecto config.CONSOLIDADO_SHEET)
+        header_row: Fila (1-based) donde está el encabezado
+
+    Yields:
+        Tuplas (Doc, Local, Fecha, Cod, Kg totales2, Macropieza)
+    """
+    sheet_name = sheet_name or config.CONSOLIDADO_SHEET
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        filas = ws.iter_rows(min_row=header_row, values_only=True)
+
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+
+        indices = _indices_columnas(encabezado, COLUMNAS_VENTAS)
+        proyectar = itemgetter(*indices)
+        ancho = max(indices) + 1
+        relleno = (None,) * ancho
+
+        for fila in filas:
+            if len(fila) < ancho:
+                fila = tuple(fila) + relleno[len(fila):]
+            yield proyectar(fila)
+    finally:
+        wb.close()
+
+
+def stream_sales(path, sheet_name=None, header_row=1, aggregator=None):
+    """
+    Recorre el consolidado en modo read-only y acumula las ventas
+
+    Args:
+        path: Ruta de consolidado.xlsx
+        sheet_name: Hoja a leer (por defecto config.CONSOLIDADO_SHEET)
+        header_row: Fila (1-based) donde está el encabezado
+        aggregator: SalesAggregator a alimentar; se crea uno si es None
+
+    Returns:
+        SalesAggregator con los totales por código
+    """
+    aggregator = aggregator or SalesAggregator()
+    for fila in iter_sales_rows(path, sheet_name, header_row):
+        aggregator.add(*fila)
+    return aggregator
+
+
+if __name__ == "__main__":
+    import time
+
+    inicio = time.perf_counter()
+    resultado = stream_sales(config.CONSOLIDADO_PATH)
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {resultado.filas_leidas} filas leídas, {resultado.filas_filtradas} tras filtros")
+    print(f"📊 {len(resultado.totales)} productos en {duracion:.2f}s")
@@ -0,0 +1,125 @@
+"""
+Módulo de Esquema de Tipos - Dashboard Inventario Lomarosa
+Declara los tipos compactos del consolidado (categorías para texto de baja
+cardinalidad, Int32 para códigos, float32 para kilos y datetime64 para
+fechas) y los aplica al cargar, junto con un reporte de memoria
+"""
+
+import numpy as np
+import pandas as pd
+
+import config
+
+
+# Tipos declarados para las columnas del consolidado que usa el análisis
+ESQUEMA_CONSOLIDADO = {
+    'Doc': 'category',
+    'Local': 'category',
+    'Macropieza': 'category',
+    config.COL_COD_HISTORICO: 'Int32',
+    config.COL_KG_VENDIDOS: 'float32',
+    config.COL_FECHA: 'datetime64[ns]',
+}
+
+# Columnas de texto que se comparan contra los filtros de config: se guardan
+# ya normalizadas (sin espacios y en mayúsculas)
+COLUMNAS_NORMALIZADAS = ('Doc', 'Local')
+
+# Otras columnas de texto se convierten a categoría si tienen menos de este
+# porcentaje de valores distintos
+UMBRAL_CATEGORIA = 0.5
+
+
+def normalize_text(serie):
+    """
+    Equivalente a astype(str).str.strip().str.upper() que trabaja sobre las
+    categorías en lugar de sobre cada fila cuando la serie es categórica
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(str).str.strip().str.upper()
+        unicas, inversa = np.unique(np.asarray(categorias), return_inverse=True)
+        codigos = serie.cat.codes.to_numpy()
+        nuevos = np.where(codigos >= 0, inversa[codigos], -1)
+        return pd.Series(pd.Categorical.from_codes(nuevos, unicas), index=serie.index, name=serie.name)
+    return serie.astype(str).str.strip().str.upper()
+
+
+def _a_entero(serie, dtype):
+    """Convierte a entero nullable; los valores no enteros quedan como <NA>"""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    numeros = numeros.where(numeros % 1 == 0)
+    info = np.iinfo(dtype.lower())
+    if numeros.notna().any() and (numeros.max() > info.max or numeros.min() < info.min):
+        dtype = 'Int64'
+    return numeros.astype(dtype)
+
+
+def apply_schema(df, esquema=None, normalizar=COLUMNAS_NORMALIZADAS):
+    """
+    Aplica el esquema de tipos columna por columna (sin copiar el DataFrame)
+
+    Args:
+        df: DataFrame recién cargado
+        esquema: dict columna -> tipo (por defecto ESQUEMA_CONSOLIDADO)
+        normalizar: Columnas de texto a normalizar antes de convertir
+
+    Returns:
+        El mismo DataFrame con los tipos compactos
+    """
+    esquema = ESQUEMA_CONSOLIDADO if esquema is None else esquema
+
+    for col, dtype in esquema.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'category':
+            serie = df[col].astype('category')
+            df[col] = normalize_text(serie) if col in normalizar else serie
+        elif dtype in ('Int8', 'Int16', 'Int32', 'Int64'):
+            df[col] = _a_entero(df[col], dtype)
+        elif dtype.startswith('datetime64'):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+
+    # Texto restante de baja cardinalidad
+    for col in df.columns:
+        if col in esquema or df[col].dtype != object or len(df) == 0:
+            continue
+        if df[col].nunique(dropna=True) / len(df) < UMBRAL_CATEGORIA:
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def memory_report(antes, despues, titulo="DataFrame"):
+    """
+    Imprime el uso de memoria por columna antes y después del esquema
+
+    Returns:
+        (bytes_antes, bytes_despues)
+    """
+    mem_antes = antes.memory_usage(deep=True, index=False)
+    mem_despues = despues.memory_usage(deep=True, index=False)
+    total_antes = int(mem_antes.sum())
+    total_despues = int(mem_despues.sum())
+
+    print(f"💾 Memoria de {titulo} ({len(antes)} filas)")
+    print(f"   {'Columna':<20} {'Antes':>10} {'Después':>10}  Tipo")
+    for col in antes.columns:
+        print(f"   {str(col):<20} {mem_antes[col] / 1e6:>8.2f}MB {mem_despues[col] / 1e6:>8.2f}MB  "
+              f"{antes[col].dtype} -> {despues[col].dtype}")
+    ahorro = (1 - total_despues / total_antes) * 100 if total_antes else 0
+    print(f"   {'TOTAL':<20} {total_antes / 1e6:>8.2f}MB {total_despues / 1e6:>8.2f}MB  (-{ahorro:.0f}%)")
+    return total_antes, total_despues
+
+
+if __name__ == "__main__":
+    from excel_reader import read_excel
+
+    original = read_excel(
+        config.CONSOLIDADO_PATH,
+        sheet_name=config.CONSOLIDADO_SHEET,
+        skiprows=config.SKIPROWS_CONSOLIDADO
+    )
+    compacto = apply_schema(original.copy())
+    memory_report(original, compacto, titulo=config.CONSOLIDADO_PATH.name)
@@ -1,21 +1,61 @@
 """
 Módulo para cargar archivos desde SharePoint - Dashboard Inventario Lomarosa
+
+Variables de entorno (.env):
+    SHAREPOINT_SITE_URL, SHAREPOINT_CLIENT_ID, SHAREPOINT_CLIENT_SECRET
+        Credenciales para sincronizar la carpeta de inventarios
+    SHAREPOINT_SYNC_WORKERS
+        Descargas simultáneas al sincronizar la carpeta (por defecto 4)
+    SHAREPOINT_DELTA_URL, SHAREPOINT_TENANT_ID
+        Feed de cambios usado por monitor_changes (ver change_watcher.py)
+    SHAREPOINT_INVENTARIO_URL, SHAREPOINT_CONSOLIDADO_URL
+        Enlaces compartidos de descarga directa de cada libro, usados por
+        load_excel_from_sharepoint
 """
 
+import hashlib
 import os
-from office365.runtime.auth.client_credential import ClientCredential
-from office365.sharepoint.client_context import ClientContext
-from office365.sharepoint.files.file import File
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
 from datetime import datetime
 import json
 from pathlib import Path
 from dotenv import load_dotenv
+import requests
+
+try:
+    from office365.runtime.auth.client_credential import ClientCredential
+    from office365.sharepoint.client_context import ClientContext
+    OFFICE365_DISPONIBLE = True
+except ImportError:
+    OFFICE365_DISPONIBLE = False
+
+from change_watcher import ChangeWatcher, DeltaChangeFeed, GraphTokenProvider
+from excel_reader import read_excel
+from parquet_cache import ParquetCache
+
+# Tamaño de cada bloque leído de la respuesta HTTP
+CHUNK_SIZE = 1024 * 1024
+
+# Segundos de espera para conectar / leer
+HTTP_TIMEOUT = (10, 120)
+
 
 class SharePointLoader:
     """Clase para gestionar la carga de archivos desde SharePoint"""
     
-    def __init__(self):
-        """Inicializa la conexión con SharePoint usando credenciales del archivo .env"""
+    def __init__(self, file_urls=None, session=None, cache=None):
+        """
+        Inicializa la conexión con SharePoint usando credenciales del archivo .env
+        
+        Args:
+            file_urls: dict tipo de archivo -> URL de descarga (por defecto
+                SHAREPOINT_INVENTARIO_URL / SHAREPOINT_CONSOLIDADO_URL)
+            session: requests.Session a usar para las descargas
+            cache: ParquetCache donde se guardan los libros parseados y sus ETag
+        """
         load_dotenv()
         
         # Credenciales de SharePoint
@@ -23,6 +63,17 @@ class SharePointLoader:
         self.client_id = os.getenv('SHAREPOINT_CLIENT_ID')
         self.client_secret = os.getenv('SHAREPOINT_CLIENT_SECRET')
         
+        # Enlaces compartidos por tipo de archivo
+        if file_urls is None:
+            file_urls = {
+                'inventario': os.getenv('SHAREPOINT_INVENTARIO_URL'),
+                'consolidado': os.getenv('SHAREPOINT_CONSOLIDADO_URL'),
+            }
+        self.file_urls = {tipo: url for tipo, url in file_urls.items() if url}
+        self.session = session or requests.Session()
+        self.cache = cache or ParquetCache()
+        self._thread_local = threading.local()
+        
         # Configuración de rutas
         self.folder_relative_url = os.getenv('SHAREPOINT_FOLDER_URL', '/Documentos compartidos/Inventarios')
         self.local_download_path = Path('data/raw')
@@ -31,10 +82,11 @@ class SharePointLoader:
         self.local_download_path.mkdir(parents=True, exist_ok=True)
         
         # Inicializar contexto de SharePoint
-        if all([self.site_url, self.client_id, self.client_secret]):
+        self.ctx = None
+        if all([self.site_url, self.client_id, self.client_secret]) and OFFICE365_DISPONIBLE:
             self.ctx = self._get_context()
-        else:
-            raise ValueError("Faltan credenciales de SharePoint en el archivo .env")
+        elif not self.file_urls:
+            raise ValueError("Faltan credenciales o enlaces de SharePoint en el archivo .env")
     
     def _get_context(self):
         """Crea el contexto de autenticación para SharePoint"""
@@ -46,8 +98,129 @@ class SharePointLoader:
             print(f"❌ Error al crear contexto de SharePoint: {str(e)}")
             return None
     
-    def download_files(self):
-        """Descarga los archivos de inventario desde SharePoint"""
+    def _fetch(self, url, manifest=None):
+        """
+        Descarga un archivo en memoria con una petición condicional
+        
+        Args:
+            url: URL de descarga
+            manifest: Validadores de la copia cacheada ('etag', 'last_modified')
+        
+        Returns:
+            (BytesIO, metadatos) o (None, manifest) si el servidor respondió 304
+        """
+        headers = {}
+        if manifest:
+            if manifest.get('etag'):
+                headers['If-None-Match'] = manifest['etag']
+            if manifest.get('last_modified'):
+                headers['If-Modified-Since'] = manifest['last_modified']
+        
+        with self.session.get(url, headers=headers, stream=True, timeout=HTTP_TIMEOUT) as response:
+            if response.status_code == 304:
+                return None, manifest
+            response.raise_for_status()
+            
+            buffer = BytesIO()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                buffer.write(chunk)
+            buffer.seek(0)
+            
+            metadata = {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': buffer.getbuffer().nbytes,
+                'downloaded_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            return buffer, metadata
+    
+    def load_excel_from_sharepoint(self, file_type, sheet_name=0, skiprows=None):
+        """
+        Carga un libro desde su enlace de SharePoint sin escribirlo en disco
+        
+        Si hay una copia parseada con ETag/Last-Modified, la petición es
+        condicional: cuando el archivo no cambió el servidor responde 304 y
+        se usa la copia en caché sin descargar el contenido.
+        
+        Args:
+            file_type: 'inventario' o 'consolidado'
+            sheet_name: Hoja a leer
+            skiprows: Filas a saltar antes del encabezado
+        
+        Returns:
+            DataFrame con la hoja leída
+        """
+        url = self.file_urls.get(file_type)
+        if not url:
+            raise ValueError(f"No hay enlace de SharePoint configurado para '{file_type}'")
+        
+        # La URL forma parte del nombre: cambiar el enlace no debe reutilizar la copia anterior
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+        nombre = f"sharepoint_{file_type}_{sheet_name}_{skiprows or 0}_{url_hash}"
+        manifest = self.cache.get_remote_manifest(nombre)
+        
+        buffer, metadata = self._fetch(url, manifest)
+        if buffer is None:
+            df = self.cache.get_remote(nombre)
+            if df is not None:
+                print(f"⚡ {file_type}: sin cambios en SharePoint (304), usando copia en caché")
+                return df
+            # La caché desapareció entre la consulta y la lectura: descargar completo
+            buffer, metadata = self._fetch(url)
+        
+        print(f"📥 {file_type}: {metadata['size'] / 1e6:.2f} MB descargados en memoria")
+        df = read_excel(buffer, sheet_name=sheet_name, skiprows=skiprows)
+        
+        if metadata.get('etag') or metadata.get('last_modified'):
+            self.cache.put_remote(nombre, df, metadata)
+        return df
+    
+    def _thread_context(self):
+        """
+        Contexto de SharePoint propio del hilo actual: ClientContext acumula
+        las consultas pendientes y no se puede compartir entre hilos
+        """
+        ctx = getattr(self._thread_local, 'ctx', None)
+        if ctx is None:
+            ctx = self._get_context()
+            self._thread_local.ctx = ctx
+        return ctx
+    
+    def _download_file(self, server_relative_url, local_path, chunk_size=CHUNK_SIZE):
+        """
+        Descarga un archivo a disco por bloques: primero a un temporal y
+        luego se renombra, para no dejar nunca un .xlsx a medio escribir
+        
+        Returns:
+            (bytes_descargados, segundos)
+        """
+        tmp_path = local_path.with_name(local_path.name + '.part')
+        inicio = time.perf_counter()
+        try:
+            ctx = self._thread_context()
+            with open(tmp_path, 'wb') as local_file:
+                remote_file = ctx.web.get_file_by_server_relative_url(server_relative_url)
+                remote_file.download_session(local_file, chunk_size=chunk_size).execute_query()
+            os.replace(tmp_path, local_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return local_path.stat().st_size, time.perf_counter() - inicio
+    
+    def download_files(self, max_workers=None):
+        """
+        Descarga los archivos de inventario modificados desde SharePoint
+        
+        Args:
+            max_workers: Descargas simultáneas (por defecto SHAREPOINT_SYNC_WORKERS o 4)
+        """
+        if self.ctx is None:
+            print("❌ No hay credenciales de SharePoint para acceder a la carpeta")
+            return []
+        
+        max_workers = max_workers or int(os.getenv('SHAREPOINT_SYNC_WORKERS', '4'))
+        
         try:
             # Obtener lista de archivos en la carpeta
             folder = self.ctx.web.get_folder_by_server_relative_url(self.folder_relative_url)
@@ -55,7 +228,7 @@ class SharePointLoader:
             self.ctx.load(files)
             self.ctx.execute_query()
             
-            files_downloaded = []
+            pendientes = {}
             for file in files:
                 if file.name.endswith('.xlsx'):
                     local_path = self.local_download_path / file.name
@@ -68,13 +241,36 @@ class SharePointLoader:
                         should_download = sharepoint_modified > local_modified
                     
                     if should_download:
-                        print(f"📥 Descargando {file.name}...")
-                        with open(local_path, "wb") as local_file:
-                            file_content = File.open_binary(self.ctx, file.serverRelativeUrl)
-                            local_file.write(file_content.content)
-                        files_downloaded.append(file.name)
-                        print(f"✅ Archivo guardado en {local_path}")
+                        pendientes[file.name] = (file.serverRelativeUrl, local_path)
             
+            if not pendientes:
+                print("✅ Todos los archivos están actualizados")
+                return []
+            
+            print(f"📥 Descargando {len(pendientes)} archivos ({min(max_workers, len(pendientes))} en paralelo)...")
+            inicio = time.perf_counter()
+            files_downloaded = []
+            total_bytes = 0
+            
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futuros = {
+                    executor.submit(self._download_file, url, local_path): nombre
+                    for nombre, (url, local_path) in pendientes.items()
+                }
+                for futuro in as_completed(futuros):
+                    nombre = futuros[futuro]
+                    try:
+                        num_bytes, segundos = futuro.result()
+                    except Exception as e:
+                        print(f"❌ Error al descargar {nombre}: {str(e)}")
+                        continue
+                    total_bytes += num_bytes
+                    velocidad = num_bytes / segundos / 1e6 if segundos > 0 else 0
+                    print(f"✅ {nombre}: {num_bytes / 1e6:.2f} MB en {segundos:.1f}s ({velocidad:.2f} MB/s)")
+                    files_downloaded.append(nombre)
+            
+            duracion = time.perf_counter() - inicio
+            print(f"📦 Sincronización: {total_bytes / 1e6:.2f} MB en {duracion:.1f}s")
             return files_downloaded
             
         except Exception as e:
@@ -83,6 +279,10 @@ class SharePointLoader:
     
     def get_last_modified_info(self):
         """Obtiene información de última modificación de los archivos"""
+        if self.ctx is None:
+            print("❌ No hay credenciales de SharePoint para acceder a la carpeta")
+            return {}
+        
         try:
             folder = self.ctx.web.get_folder_by_server_relative_url(self.folder_relative_url)
             files = folder.files
@@ -102,27 +302,38 @@ class SharePointLoader:
             print(f"❌ Error al obtener información de archivos: {str(e)}")
             return {}
     
-    def monitor_changes(self, callback=None):
-        """Monitorea cambios en los archivos de SharePoint"""
+    def change_feed(self):
+        """Crea el feed de cambios delta de la carpeta (SHAREPOINT_DELTA_URL)"""
+        delta_url = os.getenv('SHAREPOINT_DELTA_URL')
+        if not delta_url:
+            raise ValueError("Falta SHAREPOINT_DELTA_URL en el archivo .env")
+        
+        token_provider = None
+        tenant_id = os.getenv('SHAREPOINT_TENANT_ID')
+        if tenant_id and self.client_id and self.client_secret:
+            token_provider = GraphTokenProvider(tenant_id, self.client_id, self.client_secret, self.session)
+        return DeltaChangeFeed(delta_url, session=self.session, token_provider=token_provider)
+    
+    def monitor_changes(self, callback=None, interval=30, debounce=90, feed=None):
+        """
+        Monitorea cambios en los archivos de SharePoint con el feed delta
+        
+        Args:
+            callback: Función que recibe la lista de archivos cambiados en
+                cada ráfaga (una sola llamada por ráfaga de guardados)
+            interval: Segundos entre consultas al feed
+            debounce: Segundos sin cambios nuevos antes de llamar al callback
+            feed: Feed de cambios a usar (por defecto change_feed())
+        """
         try:
-            last_check = {}
-            while True:
-                current_info = self.get_last_modified_info()
-                
-                # Detectar cambios
-                for filename, info in current_info.items():
-                    if filename not in last_check or last_check[filename]['last_modified'] != info['last_modified']:
-                        print(f"🔄 Detectado cambio en {filename}")
-                        if callback:
-                            callback(filename)
-                
-                last_check = current_info
-                time.sleep(300)  # Revisar cada 5 minutos
-                
-        except KeyboardInterrupt:
-            print("\n⏹️ Monitoreo detenido")
+            feed = feed or self.change_feed()
         except Exception as e:
             print(f"❌ Error en monitoreo: {str(e)}")
+            return
+        
+        watcher = ChangeWatcher(feed, callback or (lambda archivos: None), interval=interval, debounce=debounce)
+        print(f"👀 Monitoreando cambios cada {interval}s (agrupando ráfagas de {debounce}s)...")
+        watcher.run()
 
 if __name__ == "__main__":
     # Ejemplo de uso
@@ -0,0 +1,181 @@
+"""
+Módulo de Historial de Inventario - Dashboard Inventario Lomarosa
+Guarda una foto compacta del inventario (fecha, Codigo, Stock_Actual,
+Estado, Semanas_Stock) en cada ejecución, particionada por fecha en
+data/processed/snapshots/fecha=AAAA-MM-DD/. Las consultas por rango de
+fechas solo abren las particiones del rango.
+"""
+
+import os
+import shutil
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_DISPONIBLE = True
+except ImportError:
+    PYARROW_DISPONIBLE = False
+
+
+COLUMNAS_SNAPSHOT = ['Codigo', 'Stock_Actual', 'Estado', 'Semanas_Stock']
+
+if PYARROW_DISPONIBLE:
+    # Esquema fijo de cada foto: aunque un día no tenga Estado ni
+    # Semanas_Stock (solo inventario), todas las particiones se leen igual
+    ESQUEMA_SNAPSHOT = pa.schema([
+        ('Codigo', pa.int64()),
+        ('Stock_Actual', pa.float64()),
+        ('Estado', pa.dictionary(pa.int32(), pa.string())),
+        ('Semanas_Stock', pa.float64()),
+    ])
+    # La fecha sale del nombre de la carpeta (fecha=AAAA-MM-DD), como texto
+    PARTICION_FECHA = pa.schema([('fecha', pa.string())])
+
+
+def _fecha_iso(fecha):
+    return pd.Timestamp(fecha).date().isoformat() if fecha is not None else None
+
+
+class SnapshotStore:
+    """Historial de fotos diarias del inventario en Parquet particionado"""
+
+    def __init__(self, base_dir=None):
+        """
+        Args:
+            base_dir: Carpeta raíz de las particiones (por defecto data/processed/snapshots)
+        """
+        self.base_dir = Path(base_dir or Path(config.PROCESSED_DIR) / 'snapshots')
+        self.enabled = PYARROW_DISPONIBLE
+
+        if not self.enabled:
+            print("⚠️ pyarrow no está instalado. Historial de inventario desactivado.")
+
+    def _particion(self, fecha):
+        return self.base_dir / f"fecha={_fecha_iso(fecha)}"
+
+    def append(self, df, fecha=None):
+        """
+        Guarda la foto del día (reemplaza la del mismo día si ya existía)
+
+        Args:
+            df: DataFrame con Codigo y Stock_Actual (Estado y Semanas_Stock opcionales)
+            fecha: Fecha de la foto (por defecto hoy)
+
+        Returns:
+            Número de filas guardadas (0 si está desactivado)
+        """
+        if not self.enabled:
+            return 0
+
+        fecha = fecha or date.today()
+        foto = pd.DataFrame({
+            'Codigo': pd.to_numeric(df['Codigo'], errors='coerce').astype('Int64'),
+            'Stock_Actual': pd.to_numeric(df['Stock_Actual'], errors='coerce').astype('float64'),
+            'Estado': (df['Estado'] if 'Estado' in df.columns else pd.Series(None, index=df.index, dtype=object)).astype('category'),
+            'Semanas_Stock': pd.to_numeric(df.get('Semanas_Stock', pd.Series(float('nan'), index=df.index)), errors='coerce').astype('float64'),
+        }).reset_index(drop=True)
+
+        particion = self._particion(fecha)
+        tmp_dir = particion.with_name(particion.name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        pq.write_table(pa.Table.from_pandas(foto, schema=ESQUEMA_SNAPSHOT, preserve_index=False), tmp_dir / 'part-0.parquet')
+
+        # Reemplazo de la partición completa (la anterior se borra después del renombrado)
+        viejo_dir = particion.with_name(particion.name + '.old')
+        shutil.rmtree(viejo_dir, ignore_errors=True)
+        if particion.exists():
+            os.replace(particion, viejo_dir)
+        os.replace(tmp_dir, particion)
+        shutil.rmtree(viejo_dir, ignore_errors=True)
+        return len(foto)
+
+    def dates(self):
+        """Fechas con foto guardada, ordenadas"""
+        if not self.base_dir.exists():
+            return []
+        return sorted(
+            p.name.split('=', 1)[1] for p in self.base_dir.iterdir()
+            if p.is_dir() and p.name.startswith('fecha=') and '.' not in p.name
+        )
+
+    def read(self, desde=None, hasta=None, codigos=None, columnas=None):
+        """
+        Lee las fotos de un rango de fechas (inclusive)
+
+        Solo se abren las particiones del rango, todas en un único escaneo
+        del dataset; el filtro por código se aplica al leer los archivos.
+
+        Args:
+            desde, hasta: Límites del rango (None = sin límite)
+            codigos: Lista de códigos a leer (None = todos)
+            columnas: Columnas de COLUMNAS_SNAPSHOT a leer (None = todas)
+
+        Returns:
+            DataFrame con la columna fecha (datetime) y las columnas pedidas
+        """
+        columnas = list(columnas or COLUMNAS_SNAPSHOT)
+        if 'Codigo' not in columnas:
+            columnas.insert(0, 'Codigo')
+        vacio = pd.DataFrame(columns=['fecha'] + columnas)
+        if not self.enabled or not self.dates():
+            return vacio
+
+        particiones = [
+            self._particion(fecha) for fecha in self.dates()
+            if (desde is None or fecha >= _fecha_iso(desde)) and (hasta is None or fecha <= _fecha_iso(hasta))
+        ]
+        if not particiones:
+            return vacio
+
+        dataset = ds.dataset(
+            [str(p / 'part-0.parquet') for p in particiones],
+            format='parquet',
+            schema=ESQUEMA_SNAPSHOT.append(PARTICION_FECHA.field('fecha')),
+            partitioning=ds.partitioning(PARTICION_FECHA, flavor='hive'),
+            partition_base_dir=str(self.base_dir),
+        )
+        filtro = ds.field('Codigo').isin([int(c) for c in codigos]) if codigos is not None else None
+
+        fotos = dataset.to_table(columns=['fecha'] + columnas, filter=filtro).to_pandas()
+        fotos['fecha'] = pd.to_datetime(fotos['fecha'], format='%Y-%m-%d')
+        fotos['Codigo'] = fotos['Codigo'].astype('Int64')
+        return fotos
+
+    def stock_evolution(self, codigo, desde=None, hasta=None):
+        """Serie de Stock_Actual por fecha de un producto"""
+        fotos = self.read(desde, hasta, codigos=[codigo], columnas=['Stock_Actual'])
+        return fotos.set_index('fecha')['Stock_Actual']
+
+
+if __name__ == "__main__":
+    import time
+
+    import numpy as np
+
+    store = SnapshotStore(Path(config.PROCESSED_DIR) / 'snapshots_demo')
+    rng = np.random.default_rng(0)
+    n = 5000
+    for dia in pd.date_range('2025-01-01', periods=365):
+        store.append(pd.DataFrame({
+            'Codigo': np.arange(n),
+            'Stock_Actual': rng.random(n) * 500,
+            'Estado': rng.choice(['Stock Adecuado', 'Bajo Promedio'], n),
+            'Semanas_Stock': rng.random(n) * 10,
+        }), fecha=dia)
+
+    inicio = time.perf_counter()
+    mes = store.read('2025-06-01', '2025-06-30')
+    print(f"📅 Junio: {len(mes)} filas en {time.perf_counter() - inicio:.3f}s")
+
+    inicio = time.perf_counter()
+    serie = store.stock_evolution(42)
+    print(f"📈 Evolución de un SKU en 365 días: {len(serie)} puntos en {time.perf_counter() - inicio:.3f}s")
+    shutil.rmtree(store.base_dir)
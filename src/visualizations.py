@@ -4,12 +4,16 @@ Réplica exacta del notebook con análisis de ventas históricas
 ACTUALIZADO: Ahora incluye análisis mejorado por Macropiezas + métodos originales
 """
 
+import json
+
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import config
+from coverage import semanas_cobertura, estado_cobertura
+from html_table import RowTemplate, numeros, enteros, textos, elegir
 
 class DashboardVisualizations:
     """Clase para generar visualizaciones del dashboard"""
@@ -325,8 +329,7 @@ class DashboardVisualizations:
                 x=1
             ),
             font=dict(family="Arial", size=11, color=colors['text']),
-            margin=dict(t=120, b=60, l=40, r=40),
-            barmode='group'
+            margin=dict(t=120, b=60, l=40, r=40)
         )
         
         # === ACTUALIZAR EJES ===
@@ -577,16 +580,16 @@ class DashboardVisualizations:
                 <strong style="color:#856404;">Productos sin ventas registradas:</strong>
                 <ul style="margin-top:10px; color:#856404;">
             """
-            for _, row in productos_sin_movimiento.iterrows():
-                stock_actual = row['Stock_Actual']
-                producto = row['Producto']
-                codigo = row.get('Codigo', 'N/A')
-                productos_sin_mov_html += f"""
+            productos_sin_mov_html += RowTemplate("""
                     <li style="margin:5px 0;">
                         <strong>{producto}</strong> (Código: {codigo})
-                        <span style="color:#6c757d;"> - Stock actual: {stock_actual:.2f} kg</span>
+                        <span style="color:#6c757d;"> - Stock actual: {stock_actual} kg</span>
                     </li>
-                """
+                """).render(
+                producto=textos(productos_sin_movimiento['Producto']),
+                codigo=textos(productos_sin_movimiento['Codigo']) if 'Codigo' in productos_sin_movimiento.columns else 'N/A',
+                stock_actual=numeros(productos_sin_movimiento['Stock_Actual'], 2)
+            )
             productos_sin_mov_html += """
                 </ul>
             </div>
@@ -604,14 +607,17 @@ class DashboardVisualizations:
                 <strong style="color:#721C24;">Top productos que requieren reposición urgente:</strong>
                 <ol style="margin-top:10px; color:#721C24;">
             """
-            for idx, (_, row) in enumerate(top_deficit.head(5).iterrows(), 1):
-                deficit = abs(row['Diferencia'])
-                productos_criticos_detalle += f"""
+            top = top_deficit.head(5)
+            productos_criticos_detalle += RowTemplate("""
                     <li style="margin:5px 0;">
-                        {row['Producto']}: Stock {row['Stock_Actual']:.1f} kg 
-                        <span style="color:#dc3545;">(Déficit: {deficit:.1f} kg)</span>
+                        {producto}: Stock {stock} kg
+                        <span style="color:#dc3545;">(Déficit: {deficit} kg)</span>
                     </li>
-                """
+                """).render(
+                producto=textos(top['Producto']),
+                stock=numeros(top['Stock_Actual'], 1),
+                deficit=numeros(top['Diferencia'].abs(), 1)
+            )
             productos_criticos_detalle += """
                 </ol>
             </div>
@@ -624,14 +630,17 @@ class DashboardVisualizations:
                 <strong style="color:#155724;">Top productos con sobrestock:</strong>
                 <ol style="margin-top:10px; color:#155724;">
             """
-            for idx, (_, row) in enumerate(top_sobrestock.head(5).iterrows(), 1):
-                exceso = row['Diferencia']
-                productos_sobrestock_detalle += f"""
+            top = top_sobrestock.head(5)
+            productos_sobrestock_detalle += RowTemplate("""
                     <li style="margin:5px 0;">
-                        {row['Producto']}: Stock {row['Stock_Actual']:.1f} kg 
-                        <span style="color:#28a745;">(Exceso: {exceso:.1f} kg)</span>
+                        {producto}: Stock {stock} kg
+                        <span style="color:#28a745;">(Exceso: {exceso} kg)</span>
                     </li>
-                """
+                """).render(
+                producto=textos(top['Producto']),
+                stock=numeros(top['Stock_Actual'], 1),
+                exceso=numeros(top['Diferencia'], 1)
+            )
             productos_sobrestock_detalle += """
                 </ol>
             </div>
@@ -729,7 +738,10 @@ class DashboardVisualizations:
             return "<p style='text-align:center; color:#2ca02c; font-size:18px; padding:40px;'>✅ No hay productos críticos en este momento</p>"
         
         # Obtener lista única de Macropiezas
-        macropiezas_unicas = sorted(self.analisis['Macropieza'].unique())
+        if getattr(self.processor, 'productos', None) is not None:
+            macropiezas_unicas = self.processor.productos.macropiezas(self.analisis['Codigo'])
+        else:
+            macropiezas_unicas = sorted(self.analisis['Macropieza'].unique())
         
         html = f"""
         <div style='margin:20px 0;'>
@@ -771,17 +783,19 @@ class DashboardVisualizations:
         """
         
         # Generar checkboxes de Macropiezas
-        for macropieza in macropiezas_unicas:
-            safe_id = macropieza.replace(' ', '_').replace('/', '_')
-            html += f"""
+        macropiezas_unicas = pd.Series(list(macropiezas_unicas), dtype=object)
+        html += RowTemplate("""
                             <div class="macropieza-checkbox-item" style="margin-bottom: 5px;">
                                 <label style="cursor: pointer;">
                                     <input type="checkbox" id="macro_{safe_id}" value="{macropieza}" checked onchange="updateMacropiezaSelectAll()">
                                     {macropieza}
                                 </label>
                             </div>
-            """
-        
+            """).render(
+            safe_id=macropiezas_unicas.str.replace(' ', '_', regex=False).str.replace('/', '_', regex=False),
+            macropieza=macropiezas_unicas
+        )
+
         html += """
                         </div>
                         
@@ -820,20 +834,24 @@ class DashboardVisualizations:
                     <tbody>
         """
         
-        for _, row in productos_criticos.iterrows():
-            deficit = abs(row['Diferencia'])
-            macropieza = row.get('Macropieza', 'Sin clasificar')
-            html += f"""
+        html += RowTemplate("""
                         <tr style='background-color:#ffe6e6;' class="critico-row" data-macropieza="{macropieza}">
                             <td style='padding:10px; border:1px solid #ddd; font-weight:500;'>{macropieza}</td>
-                            <td style='padding:10px; border:1px solid #ddd;'>{row['Producto']}</td>
-                            <td style='padding:10px; text-align:right; border:1px solid #ddd; font-weight:bold;'>{row['Stock_Actual']:.2f} kg</td>
-                            <td style='padding:10px; text-align:right; border:1px solid #ddd;'>{row['Promedio_Semanal']:.2f} kg</td>
-                            <td style='padding:10px; text-align:right; border:1px solid #ddd; color:#d62728; font-weight:bold;'>{deficit:.2f} kg</td>
-                            <td style='padding:10px; text-align:right; border:1px solid #ddd;'>{int(row['Num_Ventas'])}</td>
+                            <td style='padding:10px; border:1px solid #ddd;'>{producto}</td>
+                            <td style='padding:10px; text-align:right; border:1px solid #ddd; font-weight:bold;'>{stock} kg</td>
+                            <td style='padding:10px; text-align:right; border:1px solid #ddd;'>{promedio} kg</td>
+                            <td style='padding:10px; text-align:right; border:1px solid #ddd; color:#d62728; font-weight:bold;'>{deficit} kg</td>
+                            <td style='padding:10px; text-align:right; border:1px solid #ddd;'>{num_ventas}</td>
                         </tr>
-            """
-        
+            """).render(
+            macropieza=textos(productos_criticos['Macropieza']) if 'Macropieza' in productos_criticos.columns else 'Sin clasificar',
+            producto=textos(productos_criticos['Producto']),
+            stock=numeros(productos_criticos['Stock_Actual'], 2),
+            promedio=numeros(productos_criticos['Promedio_Semanal'], 2),
+            deficit=numeros(productos_criticos['Diferencia'].abs(), 2),
+            num_ventas=enteros(productos_criticos['Num_Ventas'])
+        )
+
         html += """
                     </tbody>
                 </table>
@@ -950,7 +968,13 @@ class DashboardVisualizations:
         return html
 
     def create_tabla_inventario_completo(self):
-        """Crea tabla HTML interactiva con filtro multiselección tipo Excel"""
+        """
+        Crea tabla HTML interactiva con filtro multiselección tipo Excel
+
+        Los datos van una sola vez como JSON por columnas y el navegador solo
+        crea las filas visibles (scroll virtual); ordenar y filtrar trabaja
+        sobre arrays tipados sin tocar las filas del DOM.
+        """
         if self.analisis is None:
             df = self.df
             tiene_historico = False
@@ -1043,10 +1067,10 @@ class DashboardVisualizations:
                     </div>
                 </div>
                 
-                <!-- TABLA -->
-                <div style="overflow-x: auto;">
+                <!-- TABLA (scroll virtual) -->
+                <div id="inventarioScroll" style="overflow: auto; max-height: 600px;">
                     <table id="inventarioTable" style="width: 100%; border-collapse: collapse; font-size: 14px;">
-                        <thead>
+                        <thead style="position: sticky; top: 0; z-index: 1;">
                             <tr style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">
                                 <th onclick="sortTable(0)" style="padding: 15px; text-align: left; cursor: pointer; user-select: none; border: 1px solid #ddd;">
                                     Código ⬍
@@ -1078,67 +1102,11 @@ class DashboardVisualizations:
                                 </th>
             """
         
-        html += """
+        html += f"""
                             </tr>
                         </thead>
-                        <tbody>
-        """
-        
-        # Agregar filas de datos
-        for idx, row in df_tabla.iterrows():
-            # Color de fila según estado
-            if tiene_historico:
-                bg_color = '#ffe6e6' if row['Estado'] == 'Bajo Promedio' else '#e6f7e6'
-                estado_badge_color = '#E74C3C' if row['Estado'] == 'Bajo Promedio' else '#2ECC71'
-                diferencia = row['Diferencia']
-                diferencia_color = '#d62728' if diferencia < 0 else '#2ca02c'
-            else:
-                bg_color = '#ffffff'
-                estado_badge_color = '#3498DB'
-            
-            html += f"""
-                            <tr style="background-color: {bg_color}; border-bottom: 1px solid #ddd;" class="table-row">
-                                <td style="padding: 12px; border: 1px solid #ddd;">{row['Codigo']}</td>
-                                <td style="padding: 12px; border: 1px solid #ddd; font-weight: 500;">{row['Producto']}</td>
-                                <td style="padding: 12px; text-align: right; border: 1px solid #ddd; font-weight: bold;">{row['Stock_Actual']:.2f}</td>
-            """
-            
-            if tiene_historico:
-                # Calcular badge de semanas de stock
-                semanas_stock = row['Semanas_Stock']
-                if semanas_stock == -999:  # Error
-                    semanas_html = '<span style="background: #34495E; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">⚠️ Error</span>'
-                elif semanas_stock == -1:  # Agotado
-                    semanas_html = '<span style="background: #C0392B; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">🚫 Agotado</span>'
-                elif semanas_stock == -2:  # Sin datos
-                    semanas_html = '<span style="background: #95A5A6; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">∞ Sin datos</span>'
-                elif semanas_stock < 1:  # Crítico
-                    semanas_html = f'<span style="background: #E74C3C; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">🚨 {semanas_stock:.1f} sem</span>'
-                elif semanas_stock < 2:  # Advertencia
-                    semanas_html = f'<span style="background: #F39C12; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">⚠️ {semanas_stock:.1f} sem</span>'
-                else:  # OK
-                    semanas_html = f'<span style="background: #2ECC71; color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;">✅ {semanas_stock:.1f} sem</span>'
-                
-                html += f"""
-                                <td style="padding: 12px; text-align: right; border: 1px solid #ddd;">{row['Promedio_Semanal']:.2f}</td>
-                                <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">
-                                    {semanas_html}
-                                </td>
-                                <td style="padding: 12px; text-align: right; border: 1px solid #ddd; color: {diferencia_color}; font-weight: bold;">{diferencia:.2f}</td>
-                                <td style="padding: 12px; text-align: right; border: 1px solid #ddd;">{int(row['Num_Ventas'])}</td>
-                                <td style="padding: 12px; text-align: center; border: 1px solid #ddd;">
-                                    <span style="background: {estado_badge_color}; color: white; padding: 5px 12px; border-radius: 15px; font-size: 12px; font-weight: bold;">
-                                        {row['Estado']}
-                                    </span>
-                                </td>
-                """
-            
-            html += """
-                            </tr>
-            """
-        
-        html += f"""
-                        </tbody>
+                        <!-- Solo las filas visibles; el resto se dibuja al hacer scroll -->
+                        <tbody id="inventarioBody"></tbody>
                     </table>
                 </div>
                 
@@ -1150,36 +1118,132 @@ class DashboardVisualizations:
             </div>
         </div>
         
+        <script type="application/json" id="inventarioData">{self._datos_tabla_inventario(df_tabla, tiene_historico)}</script>
+        
         <script>
-        // Variables globales
-        let allProducts = [];
-        let selectedProducts = new Set();
+        // Datos por columnas: números en arrays tipados, textos como índices
+        // a listas de valores únicos. Ordenar y filtrar solo mueve índices.
+        const inventario = JSON.parse(document.getElementById('inventarioData').textContent);
+        const conHistorico = {'true' if tiene_historico else 'false'};
+        const totalFilas = inventario.producto.length;
+        const columnasTabla = ['codigo', 'producto', 'stock', 'promedio', 'semanas', 'diferencia', 'ventas', 'estado'];
+        const FILAS_EXTRA = 10;
+        let altoFila = 48;
 
-        // Inicializar cuando cargue la página
-        document.addEventListener('DOMContentLoaded', function() {{
-            initProductFilter();
+        function aFloat64(valores) {{
+            const arr = new Float64Array(valores.length);
+            for (let i = 0; i < valores.length; i++) {{
+                arr[i] = valores[i] === null ? NaN : valores[i];
+            }}
+            return arr;
+        }}
+
+        const productoIdx = Uint32Array.from(inventario.producto);
+        const estadoIdx = conHistorico ? Int32Array.from(inventario.estado) : null;
+        const valoresOrden = {{ producto: Float64Array.from(productoIdx) }};  // productos ya vienen ordenados
+        ['codigo', 'stock', 'promedio', 'semanas', 'diferencia', 'ventas'].forEach(col => {{
+            if (inventario[col]) valoresOrden[col] = aFloat64(inventario[col]);
         }});
+        if (conHistorico) {{
+            const rangoEstado = inventario.estados.map(e => inventario.estados.slice().sort().indexOf(e));
+            valoresOrden.estado = Float64Array.from(estadoIdx, e => rangoEstado[e]);
+        }}
+        const productosMayus = inventario.productos.map(p => p.toUpperCase());
 
-        // Inicializar filtro de productos
-        function initProductFilter() {{
-            const table = document.getElementById('inventarioTable');
-            const rows = table.getElementsByTagName('tr');
-            
-            for (let i = 1; i < rows.length; i++) {{
-                const productCell = rows[i].getElementsByTagName('td')[1];
-                if (productCell) {{
-                    const productName = productCell.textContent.trim();
-                    if (!allProducts.includes(productName)) {{
-                        allProducts.push(productName);
-                        selectedProducts.add(productName);
-                    }}
-                }}
+        let orden = Uint32Array.from({{ length: totalFilas }}, (_, i) => i);
+        let visibles = orden;
+        let columnaOrden = -1;
+        let direccionOrden = 1;
+
+        // Variables globales del filtro de productos
+        let allProducts = inventario.productos.slice();
+        let selectedProducts = new Set(allProducts);
+        const indiceProducto = new Map(allProducts.map((p, i) => [p, i]));
+        const productoSeleccionado = new Uint8Array(allProducts.length).fill(1);
+
+        const contenedor = document.getElementById('inventarioScroll');
+        const cuerpo = document.getElementById('inventarioBody');
+
+        function escaparHTML(texto) {{
+            return String(texto).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+        }}
+
+        function numero(valor, decimales) {{
+            return valor === null ? 'nan' : valor.toFixed(decimales);
+        }}
+
+        function badgeSemanas(semanas) {{
+            const estilo = 'color: white; padding: 5px 10px; border-radius: 10px; font-weight: bold; font-size: 11px;';
+            if (semanas === -999) return `<span style="background: #34495E; ${{estilo}}">⚠️ Error</span>`;
+            if (semanas === -1) return `<span style="background: #C0392B; ${{estilo}}">🚫 Agotado</span>`;
+            if (semanas === -2) return `<span style="background: #95A5A6; ${{estilo}}">∞ Sin datos</span>`;
+            if (semanas !== null && semanas < 1) return `<span style="background: #E74C3C; ${{estilo}}">🚨 ${{numero(semanas, 1)}} sem</span>`;
+            if (semanas !== null && semanas < 2) return `<span style="background: #F39C12; ${{estilo}}">⚠️ ${{numero(semanas, 1)}} sem</span>`;
+            return `<span style="background: #2ECC71; ${{estilo}}">✅ ${{numero(semanas, 1)}} sem</span>`;
+        }}
+
+        function filaHTML(i) {{
+            const celda = 'padding: 12px; border: 1px solid #ddd; white-space: nowrap;';
+            const codigo = inventario.codigo[i] === null ? '' : inventario.codigo[i];
+            if (!conHistorico) {{
+                return `<tr style="height: ${{altoFila}}px; background-color: #ffffff; border-bottom: 1px solid #ddd;" class="table-row">`
+                    + `<td style="${{celda}}">${{codigo}}</td>`
+                    + `<td style="${{celda}} font-weight: 500;">${{escaparHTML(inventario.productos[productoIdx[i]])}}</td>`
+                    + `<td style="${{celda}} text-align: right; font-weight: bold;">${{numero(inventario.stock[i], 2)}}</td></tr>`;
+            }}
+            const estado = inventario.estados[estadoIdx[i]];
+            const bajo = estado === 'Bajo Promedio';
+            const diferencia = inventario.diferencia[i];
+            return `<tr style="height: ${{altoFila}}px; background-color: ${{bajo ? '#ffe6e6' : '#e6f7e6'}}; border-bottom: 1px solid #ddd;" class="table-row">`
+                + `<td style="${{celda}}">${{codigo}}</td>`
+                + `<td style="${{celda}} font-weight: 500;">${{escaparHTML(inventario.productos[productoIdx[i]])}}</td>`
+                + `<td style="${{celda}} text-align: right; font-weight: bold;">${{numero(inventario.stock[i], 2)}}</td>`
+                + `<td style="${{celda}} text-align: right;">${{numero(inventario.promedio[i], 2)}}</td>`
+                + `<td style="${{celda}} text-align: center;">${{badgeSemanas(inventario.semanas[i])}}</td>`
+                + `<td style="${{celda}} text-align: right; color: ${{diferencia !== null && diferencia < 0 ? '#d62728' : '#2ca02c'}}; font-weight: bold;">${{numero(diferencia, 2)}}</td>`
+                + `<td style="${{celda}} text-align: right;">${{inventario.ventas[i]}}</td>`
+                + `<td style="${{celda}} text-align: center;"><span style="background: ${{bajo ? '#E74C3C' : '#2ECC71'}}; color: white; padding: 5px 12px; border-radius: 15px; font-size: 12px; font-weight: bold;">${{escaparHTML(estado)}}</span></td></tr>`;
+        }}
+
+        // Dibuja solo las filas que caen en la ventana de scroll (más un margen)
+        function renderVisible() {{
+            const alto = contenedor.clientHeight || 600;
+            const ultima = Math.min(visibles.length, Math.ceil((contenedor.scrollTop + alto) / altoFila) + FILAS_EXTRA);
+            const primera = Math.min(Math.max(0, Math.floor(contenedor.scrollTop / altoFila) - FILAS_EXTRA), ultima);
+            const columnas = conHistorico ? 8 : 3;
+            const espacio = px => px > 0 ? `<tr style="height: ${{px}}px;"><td colspan="${{columnas}}" style="padding: 0; border: none;"></td></tr>` : '';
+
+            const filas = [];
+            for (let k = primera; k < ultima; k++) {{
+                filas.push(filaHTML(visibles[k]));
+            }}
+            cuerpo.innerHTML = espacio(primera * altoFila) + filas.join('') + espacio((visibles.length - ultima) * altoFila);
+
+            // Ajustar la altura de fila a la real la primera vez que se dibuja
+            const muestra = cuerpo.querySelector('.table-row');
+            if (muestra && muestra.offsetHeight > 0 && Math.abs(muestra.offsetHeight - altoFila) > 1) {{
+                altoFila = muestra.offsetHeight;
+                renderVisible();
             }}
-            
-            allProducts.sort();
-            renderProductCheckboxes();
         }}
 
+        let renderPendiente = false;
+        contenedor.addEventListener('scroll', function() {{
+            if (!renderPendiente) {{
+                renderPendiente = true;
+                requestAnimationFrame(() => {{
+                    renderPendiente = false;
+                    renderVisible();
+                }});
+            }}
+        }});
+
+        // Inicializar cuando cargue la página
+        document.addEventListener('DOMContentLoaded', function() {{
+            renderProductCheckboxes();
+            renderVisible();
+        }});
+
         function renderProductCheckboxes() {{
             const container = document.getElementById('productCheckboxList');
             container.innerHTML = '';
@@ -1262,6 +1326,9 @@ class DashboardVisualizations:
             const checkboxes = document.querySelectorAll('#productCheckboxList input[type="checkbox"]:checked');
             checkboxes.forEach(cb => selectedProducts.add(cb.value));
             
+            productoSeleccionado.fill(0);
+            selectedProducts.forEach(p => productoSeleccionado[indiceProducto.get(p)] = 1);
+            
             const button = document.getElementById('productFilterBtn');
             if (selectedProducts.size === allProducts.length) {{
                 button.textContent = '🏷️ Filtrar por Producto ▼';
@@ -1276,95 +1343,94 @@ class DashboardVisualizations:
         document.getElementById('searchInput').addEventListener('keyup', filterTable);
         document.getElementById('estadoFilter').addEventListener('change', filterTable);
 
+        // Filtra sobre los índices ya ordenados: la búsqueda se evalúa una vez
+        // por producto único y el estado se compara como entero
         function filterTable() {{
             const searchValue = document.getElementById('searchInput').value.toUpperCase();
             const estadoValue = document.getElementById('estadoFilter').value;
-            const table = document.getElementById('inventarioTable');
-            const tr = table.getElementsByTagName('tr');
-            let visibleCount = 0;
+            const estadoBuscado = conHistorico && estadoValue !== '' ? inventario.estados.indexOf(estadoValue) : null;
             
-            for (let i = 1; i < tr.length; i++) {{
-                const tdProducto = tr[i].getElementsByTagName('td')[1];
-                const tdEstado = tr[i].getElementsByTagName('td')[tr[i].getElementsByTagName('td').length - 1];
-                
-                if (tdProducto && tdEstado) {{
-                    const productoText = tdProducto.textContent || tdProducto.innerText;
-                    const estadoText = tdEstado.textContent || tdEstado.innerText;
-                    
-                    const matchSearch = productoText.toUpperCase().indexOf(searchValue) > -1;
-                    const matchEstado = estadoValue === '' || estadoText.indexOf(estadoValue) > -1;
-                    const matchProduct = selectedProducts.has(productoText.trim());
-                    
-                    if (matchSearch && matchEstado && matchProduct) {{
-                        tr[i].style.display = '';
-                        visibleCount++;
-                    }} else {{
-                        tr[i].style.display = 'none';
-                    }}
+            const productoOk = new Uint8Array(allProducts.length);
+            for (let p = 0; p < allProducts.length; p++) {{
+                productoOk[p] = productoSeleccionado[p] && productosMayus[p].indexOf(searchValue) > -1 ? 1 : 0;
+            }}
+            
+            const resultado = new Uint32Array(totalFilas);
+            let visibleCount = 0;
+            for (let k = 0; k < totalFilas; k++) {{
+                const i = orden[k];
+                if (productoOk[productoIdx[i]] && (estadoBuscado === null || estadoIdx[i] === estadoBuscado)) {{
+                    resultado[visibleCount++] = i;
                 }}
             }}
+            visibles = resultado.subarray(0, visibleCount);
             
             document.getElementById('filteredCount').textContent = 
-                visibleCount !== {len(df_tabla)} ? `Mostrando: ${{visibleCount}} productos` : '';
+                visibleCount !== totalFilas ? `Mostrando: ${{visibleCount}} productos` : '';
+            contenedor.scrollTop = 0;
+            renderVisible();
         }}
 
+        // Primer click ordena ascendente, el siguiente en la misma columna descendente
         function sortTable(columnIndex) {{
-            const table = document.getElementById('inventarioTable');
-            let switching = true;
-            let shouldSwitch, i;
-            let dir = 'asc';
-            let switchcount = 0;
-            
-            while (switching) {{
-                switching = false;
-                const rows = table.rows;
-                
-                for (i = 1; i < (rows.length - 1); i++) {{
-                    shouldSwitch = false;
-                    const x = rows[i].getElementsByTagName('TD')[columnIndex];
-                    const y = rows[i + 1].getElementsByTagName('TD')[columnIndex];
-                    
-                    let xContent = x.textContent || x.innerText;
-                    let yContent = y.textContent || y.innerText;
-                    
-                    const xNum = parseFloat(xContent.replace(/[^0-9.-]/g, ''));
-                    const yNum = parseFloat(yContent.replace(/[^0-9.-]/g, ''));
-                    
-                    if (!isNaN(xNum) && !isNaN(yNum)) {{
-                        xContent = xNum;
-                        yContent = yNum;
-                    }}
-                    
-                    if (dir === 'asc') {{
-                        if (xContent > yContent) {{
-                            shouldSwitch = true;
-                            break;
-                        }}
-                    }} else if (dir === 'desc') {{
-                        if (xContent < yContent) {{
-                            shouldSwitch = true;
-                            break;
-                        }}
-                    }}
-                }}
-                
-                if (shouldSwitch) {{
-                    rows[i].parentNode.insertBefore(rows[i + 1], rows[i]);
-                    switching = true;
-                    switchcount++;
-                }} else {{
-                    if (switchcount === 0 && dir === 'asc') {{
-                        dir = 'desc';
-                        switching = true;
-                    }}
-                }}
-            }}
+            const valores = valoresOrden[columnasTabla[columnIndex]];
+            if (!valores) return;
+            direccionOrden = columnIndex === columnaOrden ? -direccionOrden : 1;
+            columnaOrden = columnIndex;
+            const dir = direccionOrden;
+            
+            // Los vacíos (NaN) quedan siempre al final
+            orden.sort((a, b) => {{
+                const x = valores[a], y = valores[b];
+                if (x !== x) return y !== y ? a - b : 1;
+                if (y !== y) return -1;
+                return (x - y) * dir || a - b;
+            }});
+            filterTable();
         }}
         </script>
         """
         
         return html
     
+    def _datos_tabla_inventario(self, df_tabla, tiene_historico):
+        """
+        Serializa la tabla de inventario como JSON por columnas
+
+        Producto y Estado van como índices a su lista de valores únicos
+        (productos ordenados alfabéticamente); los vacíos numéricos van como null.
+        """
+        def numeros_json(serie, decimales=None):
+            valores = pd.to_numeric(serie, errors='coerce').astype('float64')
+            if decimales is not None:
+                valores = valores.round(decimales)
+            return valores.astype(object).where(valores.notna(), None).tolist()
+
+        codigos = pd.to_numeric(df_tabla['Codigo'], errors='coerce').astype('Int64')
+        productos = df_tabla['Producto'].astype(str)
+        codigos_producto, productos_unicos = pd.factorize(productos, sort=True)
+        datos = {
+            'codigo': codigos.astype(object).where(codigos.notna(), None).tolist(),
+            'productos': productos_unicos.tolist(),
+            'producto': codigos_producto.tolist(),
+            'stock': numeros_json(df_tabla['Stock_Actual'], 2),
+        }
+
+        if tiene_historico:
+            codigos_estado, estados = pd.factorize(df_tabla['Estado'].fillna('').astype(str))
+            datos.update({
+                'promedio': numeros_json(df_tabla['Promedio_Semanal'], 2),
+                'semanas': numeros_json(df_tabla['Semanas_Stock']),
+                'diferencia': numeros_json(df_tabla['Diferencia'], 2),
+                'ventas': pd.to_numeric(df_tabla['Num_Ventas'], errors='coerce').fillna(0).astype('int64').tolist(),
+                'estados': estados.tolist(),
+                'estado': codigos_estado.tolist(),
+            })
+
+        texto = json.dumps(datos, ensure_ascii=False, separators=(',', ':'))
+        # Evita que un '</script>' dentro de un nombre cierre el bloque
+        return texto.replace('</', '<\\/')
+
 
     def create_analisis_por_ubicacion(self):
         """
@@ -1393,35 +1459,15 @@ class DashboardVisualizations:
             
             print(f"  ✅ Productos duplicados: {len(analisis)} → {len(analisis_combinado)}")
             
-            # === FUNCIÓN PARA CALCULAR ESTADO ===
-            def calcular_estado(row):
-                if pd.isna(row['Promedio_Semanal']) or row['Promedio_Semanal'] == 0:
-                    return 'Sin Ventas'
-                
-                semanas_stock = row['Stock_Actual'] / row['Promedio_Semanal'] if row['Promedio_Semanal'] > 0 else float('inf')
-                
-                if row['Cava'] == 'CAVA 1':  # Congelado
-                    if semanas_stock >= 4:
-                        return 'Sobre Stock'
-                    elif semanas_stock > 0:
-                        return 'Stock Adecuado'
-                    else:
-                        return 'Stock Bajo'
-                else:  # CAVA 2 (Refrigeración)
-                    if semanas_stock >= 0.4:
-                        return 'Sobre Stock'
-                    elif semanas_stock > 0:
-                        return 'Stock Adecuado'
-                    else:
-                        return 'Stock Bajo'
-            
             # === PREPARAR DATOS PARA LA TABLA ===
+            # CAVA 1 (congelado) tiene sobre stock desde 4 semanas, CAVA 2 (refrigeración) desde 0.4
             tabla_stock = analisis_combinado.copy()
-            tabla_stock['Semanas_de_Stock'] = tabla_stock.apply(
-                lambda row: row['Stock_Actual'] / row['Promedio_Semanal'] if row['Promedio_Semanal'] > 0 else float('inf'),
-                axis=1
+            tabla_stock['Semanas_de_Stock'] = semanas_cobertura(tabla_stock['Stock_Actual'], tabla_stock['Promedio_Semanal'])
+            tabla_stock['Estado'] = estado_cobertura(
+                tabla_stock['Stock_Actual'],
+                tabla_stock['Promedio_Semanal'],
+                np.where(tabla_stock['Cava'] == 'CAVA 1', 4, 0.4)
             )
-            tabla_stock['Estado'] = tabla_stock.apply(calcular_estado, axis=1)
             
             # Ordenar la tabla por Cava y Stock Actual
             tabla_stock = tabla_stock.sort_values(['Cava', 'Stock_Actual'], ascending=[True, False])
@@ -1471,17 +1517,13 @@ class DashboardVisualizations:
             </style>
             """
             
-            # === FUNCIÓN PARA OBTENER CLASE CSS ===
-            def get_row_class(estado):
-                if estado == 'Sobre Stock':
-                    return 'sobre-stock'
-                elif estado == 'Stock Bajo':
-                    return 'stock-bajo'
-                elif estado == 'Stock Adecuado':
-                    return 'stock-adecuado'
-                else:
-                    return 'sin-ventas'
-            
+            # === CLASE CSS POR ESTADO ===
+            clases_estado = {
+                'Sobre Stock': 'sobre-stock',
+                'Stock Bajo': 'stock-bajo',
+                'Stock Adecuado': 'stock-adecuado',
+            }
+
             # === CREAR HTML DE LA TABLA ===
             html_rows = []
             headers = ['Código', 'Producto', 'Ubicación', 'Stock Actual (kg)', 'Prom. Ventas/Sem (kg)', 'Semanas de Stock', 'Estado']
@@ -1491,36 +1533,30 @@ class DashboardVisualizations:
                 html_rows.append(f"<th>{header}</th>")
             html_rows.append("</tr></thead>")
             
-            cava_actual = None
             html_rows.append("<tbody>")
-            
-            for _, row in tabla_stock.iterrows():
-                if cava_actual != row['Cava']:
-                    cava_actual = row['Cava']
-                    tipo_almacen = "Congelado" if cava_actual == 'CAVA 1' else "Refrigeración"
-                    html_rows.append(f'<tr><td colspan="7" class="cava-header">{tipo_almacen} ({cava_actual})</td></tr>')
-                
-                row_class = get_row_class(row['Estado'])
-                html_rows.append(f"<tr class='{row_class}'>")
-                
-                codigo = row.get('Codigo', 'N/A')
-                producto = row['Producto']
-                tipo_almacen = "Congelado" if row['Cava'] == 'CAVA 1' else "Refrigeración"
-                ubicacion = f"{tipo_almacen} ({row['Cava']})"
-                stock_actual = f"{row['Stock_Actual']:.1f}"
-                promedio = f"{row['Promedio_Semanal']:.1f}"
-                semanas = 'Sin datos' if row['Semanas_de_Stock'] == float('inf') else f"{row['Semanas_de_Stock']:.1f}"
-                estado = row['Estado']
-                
-                html_rows.append(f"<td>{codigo}</td>")
-                html_rows.append(f"<td>{producto}</td>")
-                html_rows.append(f"<td>{ubicacion}</td>")
-                html_rows.append(f"<td>{stock_actual}</td>")
-                html_rows.append(f"<td>{promedio}</td>")
-                html_rows.append(f"<td>{semanas}</td>")
-                html_rows.append(f"<td>{estado}</td>")
-                html_rows.append("</tr>")
-            
+
+            # Ubicación de cada fila; al cambiar de cava se antepone su encabezado
+            cava = tabla_stock['Cava']
+            tipo_almacen = np.where(cava == 'CAVA 1', 'Congelado', 'Refrigeración').astype(object)
+            ubicacion = tipo_almacen + ' (' + cava.to_numpy(dtype=object) + ')'
+            cambio_cava = (cava != cava.shift()).to_numpy()
+            semanas = tabla_stock['Semanas_de_Stock'].to_numpy(dtype=float)
+
+            html_rows.append(RowTemplate(
+                "{encabezado}<tr class='{row_class}'><td>{codigo}</td><td>{producto}</td><td>{ubicacion}</td>"
+                "<td>{stock_actual}</td><td>{promedio}</td><td>{semanas}</td><td>{estado}</td></tr>"
+            ).render(
+                encabezado=elegir([cambio_cava], ['<tr><td colspan="7" class="cava-header">' + ubicacion + '</td></tr>'], ''),
+                row_class=tabla_stock['Estado'].map(clases_estado).fillna('sin-ventas'),
+                codigo=textos(tabla_stock['Codigo']) if 'Codigo' in tabla_stock.columns else 'N/A',
+                producto=textos(tabla_stock['Producto']),
+                ubicacion=ubicacion,
+                stock_actual=numeros(tabla_stock['Stock_Actual'], 1),
+                promedio=numeros(tabla_stock['Promedio_Semanal'], 1),
+                semanas=elegir([semanas == np.inf], ['Sin datos'], numeros(semanas, 1)),
+                estado=textos(tabla_stock['Estado'])
+            ))
+
             html_rows.append("</tbody>")
             
             html_table = f"""
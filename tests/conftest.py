@@ -0,0 +1,10 @@
+"""
+Configuración común de las pruebas: los módulos de src/ se importan
+directamente (import config, import sharepoint_loader, ...) igual que
+cuando se ejecuta src/main.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
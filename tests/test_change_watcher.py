@@ -0,0 +1,126 @@
+"""
+Pruebas de ChangeWatcher + DeltaChangeFeed contra un servidor HTTP local
+que simula la consulta delta de Microsoft Graph. El reloj y la espera del
+watcher se reemplazan por un reloj falso para no dormir de verdad.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from change_watcher import ChangeWatcher, DeltaChangeFeed
+
+
+class _GraphFalso:
+    """
+    Servidor delta mínimo: token=latest devuelve el cursor actual y cada
+    deltaLink devuelve los archivos modificados desde ese cursor
+    """
+
+    def __init__(self):
+        self.cambios = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                consulta = parse_qs(urlparse(self.path).query)
+                if 'cursor' in consulta:
+                    desde = int(consulta['cursor'][0])
+                    valores = [{'name': nombre, 'file': {}} for nombre in servidor.cambios[desde:]]
+                else:
+                    valores = []
+                cuerpo = json.dumps({
+                    'value': valores,
+                    '@odata.deltaLink': servidor.url(f"/delta?cursor={len(servidor.cambios)}"),
+                }).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, ruta):
+        return f"http://127.0.0.1:{self.httpd.server_port}{ruta}"
+
+    def cerrar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Reloj:
+    """Reloj falso: sleep() solo avanza el tiempo"""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+    def sleep(self, segundos):
+        self.ahora += segundos
+
+
+@pytest.fixture
+def graph():
+    servidor = _GraphFalso()
+    yield servidor
+    servidor.cerrar()
+
+
+def _watcher(graph, tmp_path, callback):
+    feed = DeltaChangeFeed(
+        graph.url('/delta'),
+        session=requests.Session(),
+        state_path=tmp_path / 'delta.json',
+    )
+    reloj = _Reloj()
+    watcher = ChangeWatcher(feed, callback, interval=30, debounce=90, clock=reloj, sleep=reloj.sleep)
+    return watcher
+
+
+def test_rafaga_se_entrega_una_vez(graph, tmp_path):
+    llamadas = []
+    watcher = _watcher(graph, tmp_path, llamadas.append)
+
+    watcher.run(max_iterations=1)          # Obtiene el token inicial
+    graph.cambios += ['INVENTARIO.xlsx', 'notas.txt']
+    watcher.run(max_iterations=1)
+    graph.cambios += ['consolidado.xlsx']
+    watcher.run(max_iterations=6)
+
+    assert llamadas == [['INVENTARIO.xlsx', 'consolidado.xlsx']]
+
+
+def test_error_en_callback_no_detiene_el_monitoreo(graph, tmp_path):
+    llamadas = []
+
+    def callback(archivos):
+        llamadas.append(archivos)
+        if len(llamadas) == 1:
+            raise PermissionError("El archivo está abierto en Excel")
+
+    watcher = _watcher(graph, tmp_path, callback)
+    watcher.run(max_iterations=1)
+    graph.cambios += ['INVENTARIO.xlsx']
+    watcher.run(max_iterations=5)
+
+    # El primer intento falló y los archivos volvieron a pendientes
+    assert llamadas == [['INVENTARIO.xlsx']]
+    assert watcher.pendientes == {'INVENTARIO.xlsx'}
+
+    # La siguiente ráfaga los reintenta junto con los cambios nuevos
+    graph.cambios += ['consolidado.xlsx']
+    watcher.run(max_iterations=5)
+
+    assert llamadas[-1] == ['INVENTARIO.xlsx', 'consolidado.xlsx']
+    assert watcher.pendientes == set()
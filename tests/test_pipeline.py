@@ -0,0 +1,93 @@
+"""
+Pruebas del Pipeline: reutilización de salidas guardadas, restaurar,
+cambios de config y pasos bloqueados por una dependencia fallida
+"""
+
+from pipeline import Pipeline, Step
+
+
+def _estados(pipeline):
+    return {registro['paso']: registro['estado'] for registro in pipeline.log}
+
+
+def _pasos(llamadas, restaurados, factor=2, falla_base=False):
+    def base():
+        llamadas.append('base')
+        return None if falla_base else [1, 2, 3]
+
+    def doble(valores):
+        llamadas.append('doble')
+        return [valor * factor for valor in valores]
+
+    def restaurar_doble(salida, valores):
+        restaurados.append((salida, valores))
+
+    return [
+        Step('base', base),
+        Step('doble', doble, dependencias=['base'], config={'factor': factor}, restaurar=restaurar_doble),
+    ]
+
+
+def test_segunda_ejecucion_reutiliza_y_restaura(tmp_path):
+    llamadas, restaurados = [], []
+
+    primera = Pipeline(_pasos(llamadas, restaurados), cache_dir=tmp_path)
+    assert primera.run() == {'base': [1, 2, 3], 'doble': [2, 4, 6]}
+    assert _estados(primera) == {'base': 'ejecutado', 'doble': 'ejecutado'}
+    assert restaurados == []
+
+    segunda = Pipeline(_pasos(llamadas, restaurados), cache_dir=tmp_path)
+    assert segunda.run() == {'base': [1, 2, 3], 'doble': [2, 4, 6]}
+    assert _estados(segunda) == {'base': 'omitido', 'doble': 'omitido'}
+    assert llamadas == ['base', 'doble']
+    assert restaurados == [([2, 4, 6], [1, 2, 3])]
+
+
+def test_cambio_de_config_vuelve_a_ejecutar(tmp_path):
+    llamadas, restaurados = [], []
+    Pipeline(_pasos(llamadas, restaurados), cache_dir=tmp_path).run()
+
+    pipeline = Pipeline(_pasos(llamadas, restaurados, factor=3), cache_dir=tmp_path)
+    assert pipeline.run()['doble'] == [3, 6, 9]
+    assert _estados(pipeline) == {'base': 'omitido', 'doble': 'ejecutado'}
+
+
+def test_archivo_sin_huella_no_se_guarda(tmp_path):
+    llamadas = []
+
+    def leer():
+        llamadas.append('leer')
+        return 'datos'
+
+    for _ in range(2):
+        pipeline = Pipeline([Step('leer', leer, archivos=[None])], cache_dir=tmp_path / 'cache')
+        pipeline.run()
+        assert _estados(pipeline) == {'leer': 'ejecutado'}
+    assert llamadas == ['leer', 'leer']
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_cambio_de_archivo_vuelve_a_ejecutar(tmp_path):
+    origen = tmp_path / 'origen.txt'
+    origen.write_text('v1')
+
+    def leer():
+        return origen.read_text()
+
+    def pasos():
+        return [Step('leer', leer, archivos=[str(origen)])]
+
+    Pipeline(pasos(), cache_dir=tmp_path / 'cache').run()
+    origen.write_text('v2')
+    pipeline = Pipeline(pasos(), cache_dir=tmp_path / 'cache')
+    assert pipeline.run() == {'leer': 'v2'}
+    assert _estados(pipeline) == {'leer': 'ejecutado'}
+
+
+def test_dependencia_fallida_bloquea(tmp_path):
+    llamadas, restaurados = [], []
+    pipeline = Pipeline(_pasos(llamadas, restaurados, falla_base=True), cache_dir=tmp_path)
+
+    assert pipeline.run() == {}
+    assert _estados(pipeline) == {'base': 'fallido', 'doble': 'bloqueado'}
+    assert llamadas == ['base']
@@ -0,0 +1,97 @@
+"""
+Pruebas de update_sales: agregar filas al final solo acumula las nuevas y
+editar una fila ya procesada obliga a reconstruir; en ambos casos el
+resultado es igual a recorrer el consolidado completo con stream_sales
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import config
+from parquet_cache import ParquetCache
+from sales_incremental import IncrementalSalesState, update_sales
+from sales_stream import stream_sales
+
+
+def _filas(desde, hasta):
+    return [
+        {
+            'Doc': config.FILTRO_DOC_TIPO if i % 4 else 'NOTA CREDITO',
+            'Local': config.FILTRO_LOCAL if i % 5 else 'OTRO LOCAL',
+            'Fecha': datetime(2025, 1, 6) + pd.Timedelta(days=i),
+            'Cod': 100 + i % 7,
+            'Kg totales2': 1.5 * i,
+            'Macropieza': f'MACRO {i % 3}' if i % 6 else None,
+        }
+        for i in range(desde, hasta)
+    ]
+
+
+def _guardar(path, filas):
+    pd.DataFrame(filas).to_excel(path, index=False, sheet_name=config.CONSOLIDADO_SHEET)
+
+
+def _comparar(resultado, path):
+    esperado = stream_sales(path).to_state()
+    obtenido = resultado.to_state()
+    assert obtenido['totales'].keys() == esperado['totales'].keys()
+    for cod, (kg, ventas) in esperado['totales'].items():
+        assert obtenido['totales'][cod][0] == pytest.approx(kg)
+        assert obtenido['totales'][cod][1] == ventas
+    semanal = {(cod, lunes): kg for cod, lunes, kg in obtenido['semanal']}
+    assert semanal == pytest.approx({(cod, lunes): kg for cod, lunes, kg in esperado['semanal']})
+    for clave in ('macropiezas', 'fecha_min', 'fecha_max', 'filas_leidas', 'filas_filtradas'):
+        assert obtenido[clave] == esperado[clave]
+
+
+@pytest.fixture
+def entorno(tmp_path):
+    return {
+        'path': tmp_path / 'consolidado.xlsx',
+        'state': IncrementalSalesState(tmp_path / 'ventas_incremental.json'),
+        'cache': ParquetCache(tmp_path / 'cache'),
+    }
+
+
+def _actualizar(entorno):
+    return update_sales(entorno['path'], state=entorno['state'], cache=entorno['cache'])
+
+
+def test_agregar_filas_solo_acumula_las_nuevas(entorno):
+    _guardar(entorno['path'], _filas(0, 40))
+    _, filas, reconstruido = _actualizar(entorno)
+    assert (filas, reconstruido) == (40, True)
+
+    _guardar(entorno['path'], _filas(0, 55))
+    ventas, filas, reconstruido = _actualizar(entorno)
+    assert (filas, reconstruido) == (15, False)
+    _comparar(ventas, entorno['path'])
+
+    # Sin cambios: no hay filas nuevas ni reconstrucción
+    ventas, filas, reconstruido = _actualizar(entorno)
+    assert (filas, reconstruido) == (0, False)
+    _comparar(ventas, entorno['path'])
+
+
+def test_fila_editada_reconstruye_todo(entorno):
+    filas = _filas(0, 40)
+    _guardar(entorno['path'], filas)
+    _actualizar(entorno)
+
+    filas[3]['Kg totales2'] = 999.0
+    _guardar(entorno['path'], filas + _filas(40, 45))
+    ventas, num_filas, reconstruido = _actualizar(entorno)
+    assert (num_filas, reconstruido) == (45, True)
+    _comparar(ventas, entorno['path'])
+
+
+def test_filas_eliminadas_reconstruye_todo(entorno):
+    _guardar(entorno['path'], _filas(0, 40))
+    _actualizar(entorno)
+
+    _guardar(entorno['path'], _filas(0, 30))
+    ventas, num_filas, reconstruido = _actualizar(entorno)
+    assert (num_filas, reconstruido) == (30, True)
+    _comparar(ventas, entorno['path'])
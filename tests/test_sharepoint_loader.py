@@ -0,0 +1,119 @@
+"""
+Pruebas de load_excel_from_sharepoint contra un servidor HTTP local que
+simula el enlace de descarga de SharePoint (ETag + respuestas 304)
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pandas as pd
+import pytest
+import requests
+
+from parquet_cache import ParquetCache
+from sharepoint_loader import SharePointLoader
+
+
+def _libro(df):
+    buffer = BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+class _SharePointFalso:
+    """Servidor local que sirve un libro por ruta y responde 304 si el ETag coincide"""
+
+    def __init__(self):
+        self.archivos = {}
+        self.peticiones = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                contenido, etag = servidor.archivos[self.path]
+                servidor.peticiones.append((self.path, self.headers.get('If-None-Match')))
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(contenido)))
+                self.end_headers()
+                self.wfile.write(contenido)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.hilo.start()
+
+    def url(self, ruta):
+        return f"http://127.0.0.1:{self.httpd.server_port}{ruta}"
+
+    def cerrar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def servidor():
+    servidor = _SharePointFalso()
+    yield servidor
+    servidor.cerrar()
+
+
+@pytest.fixture
+def loader_para(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for variable in ('SHAREPOINT_SITE_URL', 'SHAREPOINT_CLIENT_ID', 'SHAREPOINT_CLIENT_SECRET'):
+        monkeypatch.setenv(variable, '')
+
+    def crear(file_urls):
+        return SharePointLoader(
+            file_urls=file_urls,
+            session=requests.Session(),
+            cache=ParquetCache(tmp_path / 'cache'),
+        )
+    return crear
+
+
+def test_descarga_cachea_y_luego_usa_304(servidor, loader_para):
+    df = pd.DataFrame({'Codigo': [1, 2, 3], 'Stock': [10.5, 0.0, 7.25]})
+    servidor.archivos['/inventario.xlsx'] = (_libro(df), '"v1"')
+    loader = loader_para({'inventario': servidor.url('/inventario.xlsx')})
+
+    primera = loader.load_excel_from_sharepoint('inventario')
+    segunda = loader.load_excel_from_sharepoint('inventario')
+
+    pd.testing.assert_frame_equal(primera, df)
+    pd.testing.assert_frame_equal(segunda, df)
+    assert servidor.peticiones == [('/inventario.xlsx', None), ('/inventario.xlsx', '"v1"')]
+
+
+def test_archivo_modificado_se_descarga_de_nuevo(servidor, loader_para):
+    servidor.archivos['/inventario.xlsx'] = (_libro(pd.DataFrame({'Codigo': [1]})), '"v1"')
+    loader = loader_para({'inventario': servidor.url('/inventario.xlsx')})
+    loader.load_excel_from_sharepoint('inventario')
+
+    nuevo = pd.DataFrame({'Codigo': [1, 2]})
+    servidor.archivos['/inventario.xlsx'] = (_libro(nuevo), '"v2"')
+
+    pd.testing.assert_frame_equal(loader.load_excel_from_sharepoint('inventario'), nuevo)
+
+
+def test_cambiar_la_url_no_reutiliza_la_cache(servidor, loader_para):
+    viejo = pd.DataFrame({'Codigo': [1]})
+    nuevo = pd.DataFrame({'Codigo': [2]})
+    # Mismo ETag en ambos enlaces: solo la URL distingue las entradas de caché
+    servidor.archivos['/viejo.xlsx'] = (_libro(viejo), '"v1"')
+    servidor.archivos['/nuevo.xlsx'] = (_libro(nuevo), '"v1"')
+
+    loader_para({'inventario': servidor.url('/viejo.xlsx')}).load_excel_from_sharepoint('inventario')
+    df = loader_para({'inventario': servidor.url('/nuevo.xlsx')}).load_excel_from_sharepoint('inventario')
+
+    pd.testing.assert_frame_equal(df, nuevo)
+    assert servidor.peticiones[-1] == ('/nuevo.xlsx', None)